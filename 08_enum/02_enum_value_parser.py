@@ -0,0 +1,166 @@
+
+import random
+import timeit
+import unicodedata
+
+from enum import Enum, unique
+from functools import lru_cache
+from typing import Generic, Iterable, Mapping, Optional, TypeVar, Union
+
+
+# ------------------------------------------------------------------------------
+# same as 01_enum.py:  @unique, without the BECHAMEL / VELOUTE duplicates
+# ------------------------------------------------------------------------------
+
+@unique
+class MotherSauce(Enum):
+    BÉCHAMEL = "Béchamel"
+    VELOUTÉ = "Velouté"
+    ESPAGNOLE = "Espagnole"
+    TOMATO = "Tomato"
+    HOLLANDAISE = "Hollandaise"
+
+
+# ------------------------------------------------------------------------------
+# MotherSauce("Alabama White BBQ Sauce") raises ValueError:
+#   on a bad row the caller pays for the failed lookup, the exception and except.
+# parser:  precomputed table  folded string -> member
+#   folded = accents removed (NFKD, combining marks dropped), casefold(), single spaces
+#   "BECHAMEL", "béchamel", " Bechamel " all give MotherSauce.BÉCHAMEL
+#   the accent variants are handled by folding, the enum stays @unique.
+#   a miss returns a sentinel (MISSING by default), nothing is raised.
+# ------------------------------------------------------------------------------
+
+class _Missing:
+    def __repr__(self) -> str:
+        return 'MISSING'
+
+    def __bool__(self) -> bool:
+        return False
+
+
+MISSING = _Missing()
+
+E = TypeVar('E', bound=Enum)
+
+
+def fold(text: str) -> str:
+    decomposed = unicodedata.normalize('NFKD', text)
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(stripped.replace('_', ' ').casefold().split())
+
+
+class EnumParser(Generic[E]):
+
+    def __init__(self, enum: type[E], aliases: Optional[Mapping[str, E]] = None,
+                 default: object = MISSING, cache_size: int = 4096):
+        self.enum = enum
+        self.default = default
+
+        # exact strings:  one dict lookup, no folding
+        self._exact: dict[str, E] = {}
+        # folded strings
+        self._table: dict[str, E] = {}
+        entries = [(m.value, m) for m in enum if isinstance(m.value, str)]
+        entries += [(name, m) for name, m in enum.__members__.items()]
+        entries += list((aliases or {}).items())
+        for text, member in entries:
+            key = fold(text)
+            if self._table.setdefault(key, member) is not member:
+                raise ValueError(f'{text!r} is ambiguous: {self._table[key]!r} and {member!r}')
+            self._exact.setdefault(text, member)
+
+        self._lookup = lru_cache(maxsize=cache_size)(self._lookup_folded)
+
+    # not a str (None, 3, nan from a CSV / JSON column):  a miss, not an error
+    def _lookup_folded(self, text: str) -> Union[E, object]:
+        if not isinstance(text, str):
+            return self.default
+        return self._table.get(fold(text), self.default)
+
+    def parse(self, text: str) -> Union[E, object]:
+        try:
+            member = self._exact.get(text)
+            return self._lookup(text) if member is None else member
+        except TypeError:
+            # unhashable (list, dict):  neither dict nor lru_cache can take it
+            return self.default
+
+    def parse_many(self, strings: Iterable[str]) -> list[Union[E, object]]:
+        if not isinstance(strings, (list, tuple)):
+            strings = list(strings)
+        exact = self._exact.get
+        lookup = self._lookup
+        try:
+            return [lookup(s) if (m := exact(s)) is None else m for s in strings]
+        except TypeError:
+            return [self.parse(s) for s in strings]
+
+
+# ----------
+parse_sauce = EnumParser(MotherSauce, aliases={'White Sauce': MotherSauce.BÉCHAMEL,
+                                               'Brown Sauce': MotherSauce.ESPAGNOLE})
+
+assert parse_sauce.parse("Hollandaise") is MotherSauce.HOLLANDAISE
+
+# case / accent / spacing / name or value
+assert parse_sauce.parse("BECHAMEL") is MotherSauce.BÉCHAMEL
+assert parse_sauce.parse("béchamel") is MotherSauce.BÉCHAMEL
+assert parse_sauce.parse(" Veloute ") is MotherSauce.VELOUTÉ
+assert parse_sauce.parse("VELOUTÉ") is MotherSauce.VELOUTÉ
+assert parse_sauce.parse("brown  sauce") is MotherSauce.ESPAGNOLE
+
+# miss:  no exception
+assert parse_sauce.parse("Alabama White BBQ Sauce") is MISSING
+assert not parse_sauce.parse("Alabama White BBQ Sauce")
+
+assert parse_sauce.parse_many(["Tomato", "tomato", "Ketchup"]) == [MotherSauce.TOMATO, MotherSauce.TOMATO, MISSING]
+
+# own sentinel
+assert EnumParser(MotherSauce, default=None).parse("Ketchup") is None
+
+# not a str:  a miss too
+for value in (None, 3, float('nan'), ['Tomato']):
+    assert parse_sauce.parse(value) is MISSING
+assert parse_sauce.parse_many(["Tomato", None, 3, float('nan'), {}]) == [MotherSauce.TOMATO] + [MISSING] * 4
+assert parse_sauce.parse_many(iter(["tomato", None])) == [MotherSauce.TOMATO, MISSING]
+
+# an alias may not point to two members
+try:
+    EnumParser(MotherSauce, aliases={'Bechamel': MotherSauce.TOMATO})
+    assert False
+except ValueError as e:
+    pass
+
+
+# ------------------------------------------------------------------------------
+# benchmark:  1M incoming strings (exact hits and misses)
+#   MotherSauce(s) in try/except  vs  parse_many()
+#   (both accept exact values only here, so the results are comparable)
+# ------------------------------------------------------------------------------
+
+def parse_with_constructor(strings: list[str]) -> list[Optional[MotherSauce]]:
+    parsed = []
+    for s in strings:
+        try:
+            parsed.append(MotherSauce(s))
+        except ValueError:
+            parsed.append(None)
+    return parsed
+
+
+def benchmark(n_rows: int = 1_000_000) -> None:
+    rng = random.Random(0)
+    hits = [m.value for m in MotherSauce]
+    misses = [f"BBQ Sauce {i}" for i in range(20)]
+
+    for miss_ratio in (0.0, 0.1, 0.5):
+        strings = [rng.choice(misses) if rng.random() < miss_ratio else rng.choice(hits)
+                   for _ in range(n_rows)]
+        constructor = min(timeit.repeat(lambda: parse_with_constructor(strings), number=1, repeat=3))
+        parser = min(timeit.repeat(lambda: parse_sauce.parse_many(strings), number=1, repeat=3))
+        print(f'misses {miss_ratio:>4.0%}:  try/except {constructor * 1e3:>8.1f} ms   '
+              f'parse_many {parser * 1e3:>8.1f} ms ({n_rows:,} rows)')
+
+
+benchmark()
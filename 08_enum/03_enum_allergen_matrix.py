@@ -0,0 +1,133 @@
+
+import random
+import timeit
+
+from enum import auto, Flag
+from functools import reduce
+from operator import or_
+from typing import Iterable, Sequence, Union
+
+import numpy as np
+
+
+# ------------------------------------------------------------------------------
+# same as 01_enum.py
+# ------------------------------------------------------------------------------
+
+class Allergen(Flag):
+    FISH = auto()
+    SHELLFISH = auto()
+    TREE_NUTS = auto()
+    PEANUTS = auto()
+    GLUTEN = auto()
+    SOY = auto()
+    DAIRY = auto()
+    SEAFOOD = FISH | SHELLFISH
+    ALL_NUTS = TREE_NUTS | PEANUTS
+
+
+# ------------------------------------------------------------------------------
+# allergen matrix:  one uint8 mask per dish (7 flags fit in a byte)
+#   a query is a few whole-array bit operations, no Allergen object per dish.
+#   Allergen is converted to / from int only at the edges.
+# ------------------------------------------------------------------------------
+
+MASK_DTYPE = np.uint8
+
+# every flag set:  0b1111111
+ALL_MASK = (~Allergen(0)).value
+
+AllergenLike = Union[Allergen, Iterable[Allergen]]
+
+
+def to_mask(allergens: AllergenLike) -> int:
+    if isinstance(allergens, Allergen):
+        return allergens.value
+    return reduce(or_, (a.value for a in allergens), 0)
+
+
+class AllergenMatrix:
+
+    def __init__(self, masks: Union[np.ndarray, Sequence[int]] = ()):
+        self.masks = np.asarray(masks, dtype=MASK_DTYPE)
+
+    @classmethod
+    def from_allergens(cls, dishes: Iterable[AllergenLike]) -> 'AllergenMatrix':
+        return cls(np.fromiter((to_mask(d) for d in dishes), dtype=MASK_DTYPE))
+
+    def __len__(self) -> int:
+        return len(self.masks)
+
+    def __getitem__(self, index: int) -> Allergen:
+        return Allergen(int(self.masks[index]))
+
+    def to_allergens(self) -> list[Allergen]:
+        # 128 possible masks:  one Allergen per distinct mask, not per dish
+        members = [Allergen(m) for m in range(ALL_MASK + 1)]
+        return [members[m] for m in self.masks.tolist()]
+
+    # ----------
+    # boolean masks over dishes
+    def contains_any(self, allergens: AllergenLike) -> np.ndarray:
+        return (self.masks & to_mask(allergens)) != 0
+
+    def contains_all(self, allergens: AllergenLike) -> np.ndarray:
+        mask = to_mask(allergens)
+        return (self.masks & mask) == mask
+
+    def free_of(self, allergens: AllergenLike) -> np.ndarray:
+        return (self.masks & to_mask(allergens)) == 0
+
+    # indices of dishes containing every `include` allergen and none of `exclude`
+    def query(self, include: AllergenLike = (), exclude: AllergenLike = ()) -> np.ndarray:
+        return np.flatnonzero(self.contains_all(include) & self.free_of(exclude))
+
+
+# ----------
+menu = [Allergen.FISH | Allergen.GLUTEN,
+        Allergen.PEANUTS,
+        Allergen.DAIRY | Allergen.GLUTEN,
+        Allergen.SHELLFISH | Allergen.SOY,
+        Allergen(0)]
+
+matrix = AllergenMatrix.from_allergens(menu)
+
+assert ALL_MASK == 127
+assert len(matrix) == 5
+assert matrix[0] == Allergen.FISH | Allergen.GLUTEN
+assert matrix.to_allergens() == menu
+
+assert matrix.query(exclude=Allergen.SEAFOOD | Allergen.ALL_NUTS).tolist() == [2, 4]
+assert matrix.query(exclude=[Allergen.SEAFOOD, Allergen.ALL_NUTS]).tolist() == [2, 4]
+assert matrix.query(include=Allergen.GLUTEN, exclude=Allergen.FISH).tolist() == [2]
+assert matrix.contains_any(Allergen.SEAFOOD).tolist() == [True, False, False, True, False]
+
+# empty include / exclude:  every dish
+assert matrix.query().tolist() == [0, 1, 2, 3, 4]
+
+
+# ------------------------------------------------------------------------------
+# benchmark:  "free of SEAFOOD and ALL_NUTS" over 100k dishes
+#   Flag & in a Python loop  vs  AllergenMatrix
+# ------------------------------------------------------------------------------
+
+def benchmark(n_dishes: int = 100_000) -> None:
+    rng = random.Random(0)
+    dishes = [Allergen(rng.randrange(128)) for _ in range(n_dishes)]
+    matrix = AllergenMatrix.from_allergens(dishes)
+    unsafe = Allergen.SEAFOOD | Allergen.ALL_NUTS
+
+    def loop() -> list[int]:
+        return [i for i, d in enumerate(dishes) if not d & unsafe]
+
+    def vectorized() -> np.ndarray:
+        return matrix.query(exclude=unsafe)
+
+    assert loop() == vectorized().tolist()
+
+    for label, func in (('Flag loop', loop), ('AllergenMatrix', vectorized)):
+        seconds = min(timeit.repeat(func, number=10, repeat=3)) / 10
+        print(f'{label:<16} {seconds * 1e3:>8.3f} ms/query ({n_dishes:,} dishes)')
+
+
+benchmark()
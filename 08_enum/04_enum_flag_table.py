@@ -0,0 +1,163 @@
+
+import timeit
+
+from enum import auto, Flag
+from typing import Iterator, NamedTuple, Optional, TypeVar
+
+
+# ------------------------------------------------------------------------------
+# same as 01_enum.py
+# ------------------------------------------------------------------------------
+
+class Allergen(Flag):
+    FISH = auto()
+    SHELLFISH = auto()
+    TREE_NUTS = auto()
+    PEANUTS = auto()
+    GLUTEN = auto()
+    SOY = auto()
+    DAIRY = auto()
+    SEAFOOD = FISH | SHELLFISH
+    ALL_NUTS = TREE_NUTS | PEANUTS
+
+
+# ------------------------------------------------------------------------------
+# flag table
+#   7 flags -> only 128 masks. @tabulate (a class decorator like @unique) builds,
+#   once, for every mask:  the instance, its members, canonical name, repr and label.
+#   TabulatedFlag reads iteration / |, &, ^ / repr / label from the table,
+#   stock Flag decomposes the value again on every call.
+#   (`in` is one int operation and ~ is cached by Flag itself, both kept as is)
+#   (EnumType puts Flag.__or__ etc. back on every subclass that does not define
+#   them itself, so @tabulate installs the tabulated operators on the class)
+# ------------------------------------------------------------------------------
+
+class FlagEntry(NamedTuple):
+    instance: Flag
+    members: tuple[Flag, ...]
+    name: Optional[str]
+    repr: str
+    label: str
+
+
+class TabulatedFlag(Flag):
+
+    def __iter__(self) -> Iterator['TabulatedFlag']:
+        return iter(self._table_[self._value_].members)
+
+    def __len__(self) -> int:
+        return len(self._table_[self._value_].members)
+
+    def __or__(self, other: 'TabulatedFlag') -> 'TabulatedFlag':
+        if not isinstance(other, type(self)):
+            return NotImplemented
+        return self._instances_[self._value_ | other._value_]
+
+    def __and__(self, other: 'TabulatedFlag') -> 'TabulatedFlag':
+        if not isinstance(other, type(self)):
+            return NotImplemented
+        return self._instances_[self._value_ & other._value_]
+
+    def __xor__(self, other: 'TabulatedFlag') -> 'TabulatedFlag':
+        if not isinstance(other, type(self)):
+            return NotImplemented
+        return self._instances_[self._value_ ^ other._value_]
+
+    __ror__ = __or__
+    __rand__ = __and__
+    __rxor__ = __xor__
+
+    def __repr__(self) -> str:
+        return self._table_[self._value_].repr
+
+    @property
+    def label(self) -> str:
+        return self._table_[self._value_].label
+
+
+F = TypeVar('F', bound=TabulatedFlag)
+
+
+def tabulate(cls: type[F]) -> type[F]:
+    all_value = Flag.__invert__(cls(0))._value_
+    table = []
+    for value in range(all_value + 1):
+        instance = cls(value)
+        members = tuple(Flag.__iter__(instance))
+        table.append(FlagEntry(instance=instance,
+                               members=members,
+                               name=instance.name,
+                               repr=Flag.__repr__(instance),
+                               label=', '.join(m.name.replace('_', ' ').capitalize() for m in members)))
+    cls._table_ = tuple(table)
+    cls._instances_ = tuple(entry.instance for entry in table)
+    for name in ('__or__', '__and__', '__xor__', '__ror__', '__rand__', '__rxor__'):
+        setattr(cls, name, getattr(TabulatedFlag, name))
+    return cls
+
+
+# ----------
+@tabulate
+class TabulatedAllergen(TabulatedFlag):
+    FISH = auto()
+    SHELLFISH = auto()
+    TREE_NUTS = auto()
+    PEANUTS = auto()
+    GLUTEN = auto()
+    SOY = auto()
+    DAIRY = auto()
+    SEAFOOD = FISH | SHELLFISH
+    ALL_NUTS = TREE_NUTS | PEANUTS
+
+
+assert len(TabulatedAllergen._table_) == 128
+
+allergens = TabulatedAllergen.FISH | TabulatedAllergen.SHELLFISH
+
+# same as stock Flag
+assert repr(allergens) == "<TabulatedAllergen.SEAFOOD: 3>"
+assert allergens is TabulatedAllergen.SEAFOOD
+assert allergens & TabulatedAllergen.FISH
+assert TabulatedAllergen.FISH in allergens
+assert list(allergens) == [TabulatedAllergen.FISH, TabulatedAllergen.SHELLFISH]
+
+# every mask agrees with stock Flag
+for value in range(128):
+    stock, tabulated = Allergen(value), TabulatedAllergen(value)
+    assert [m.name for m in stock] == [m.name for m in tabulated]
+    assert repr(stock).replace('Allergen', 'TabulatedAllergen', 1) == repr(tabulated)
+    assert stock.name == tabulated.name
+    assert (~stock).value == (~tabulated).value
+    assert (stock ^ Allergen.SEAFOOD).value == (tabulated ^ TabulatedAllergen.SEAFOOD).value
+
+assert TabulatedAllergen.__or__ is TabulatedFlag.__or__
+
+assert (TabulatedAllergen.ALL_NUTS | TabulatedAllergen.GLUTEN).label == 'Tree nuts, Peanuts, Gluten'
+assert TabulatedAllergen(0).label == ''
+assert len(TabulatedAllergen.SEAFOOD) == 2
+
+
+# ------------------------------------------------------------------------------
+# micro-benchmark:  stock Flag vs TabulatedFlag
+# ------------------------------------------------------------------------------
+
+def benchmark(number: int = 200_000) -> None:
+    cases = (
+        ('list(flag)', 'list(flag)'),
+        ('member in flag', 'member in flag'),
+        ('repr(flag)', 'repr(flag)'),
+        ('flag | other', 'flag | other'),
+        ('~flag', '~flag'),
+    )
+    stock = {'flag': Allergen.SEAFOOD | Allergen.GLUTEN, 'member': Allergen.FISH, 'other': Allergen.SOY}
+    tabulated = {'flag': TabulatedAllergen.SEAFOOD | TabulatedAllergen.GLUTEN,
+                 'member': TabulatedAllergen.FISH, 'other': TabulatedAllergen.SOY}
+
+    print(f"{'':<16} {'Flag ns':>10} {'tabulated ns':>14}")
+    for label, stmt in cases:
+        t_stock = min(timeit.repeat(stmt, globals=stock, number=number, repeat=3)) / number
+        t_tabulated = min(timeit.repeat(stmt, globals=tabulated, number=number, repeat=3)) / number
+        print(f'{label:<16} {t_stock * 1e9:>10.0f} {t_tabulated * 1e9:>14.0f}')
+
+
+benchmark()
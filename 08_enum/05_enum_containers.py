@@ -0,0 +1,458 @@
+
+import random
+import timeit
+import weakref
+
+from collections import Counter
+from collections.abc import Iterable, Iterator, Mapping, MutableMapping, MutableSet
+from enum import auto, Enum, Flag
+from operator import attrgetter
+from typing import Any, Generic, NamedTuple, Optional, TypeVar, Union
+
+
+# ------------------------------------------------------------------------------
+# same as 01_enum.py / 09_dataclass/01_dataclass.py
+# ------------------------------------------------------------------------------
+
+class MotherSauce(Enum):
+    BÉCHAMEL = "Béchamel"
+    VELOUTÉ = "Velouté"
+    ESPAGNOLE = "Espagnole"
+    TOMATO = "Tomato"
+    HOLLANDAISE = "Hollandaise"
+
+
+class Broth(Enum):
+    VEGETABLE = auto()
+    CHICKEN = auto()
+    BEEF = auto()
+    FISH = auto()
+
+
+class ImperialMeasure(Enum):
+    TEASPOON = auto()
+    TABLESPOON = auto()
+    CUP = auto()
+
+
+class Allergen(Flag):
+    FISH = auto()
+    SHELLFISH = auto()
+    TREE_NUTS = auto()
+    PEANUTS = auto()
+    GLUTEN = auto()
+    SOY = auto()
+    DAIRY = auto()
+    SEAFOOD = FISH | SHELLFISH
+    ALL_NUTS = TREE_NUTS | PEANUTS
+
+
+# ------------------------------------------------------------------------------
+# ordinal:  position of a member in list(enum)
+#   one table per enum, built once:  member name -> ordinal.
+#   Enum.__hash__ is a Python call (hash(self._name_)), looking up _name_
+#   directly is a str dict lookup with the hash cached on the str.
+#   (the containers check the enum class first:  names repeat across enums)
+#   the members themselves are not touched.
+#   for a Flag only the canonical members (FISH, SHELLFISH, ...) have an ordinal,
+#   composites like SEAFOOD are expanded by EnumSet.
+#
+#   the win is in bulk and whole-set operations (counts(), contains_many(), |, &).
+#   per element, m in s / counts[m] += 1 through a Python method still lose to
+#   the C dict / set:  Broth 1M rows, tally ~390 vs ~335 ms, contains ~210 vs
+#   ~180 ms (see benchmark()). use a plain dict / set for per-element work.
+# ------------------------------------------------------------------------------
+
+E = TypeVar('E', bound=Enum)
+V = TypeVar('V')
+
+_EMPTY = object()
+
+
+class OrdinalTable(NamedTuple):
+    members: tuple
+    index: dict[str, int]
+
+
+# weak:  a table does not keep an enum class alive
+_ordinal_tables: 'weakref.WeakKeyDictionary[type, OrdinalTable]' = weakref.WeakKeyDictionary()
+
+
+def ordinal_table(enum: type[E]) -> OrdinalTable:
+    table = _ordinal_tables.get(enum)
+    if table is None:
+        found = tuple(enum)
+        table = _ordinal_tables[enum] = OrdinalTable(found, {m._name_: i for i, m in enumerate(found)})
+    return table
+
+
+def members(enum: type[E]) -> tuple[E, ...]:
+    return ordinal_table(enum).members
+
+
+_get_name = attrgetter('_name_')
+
+
+# bulk:  type check, name and table lookup of every member in C
+def ordinals(enum: type[E], iterable: Iterable[E]) -> list[int]:
+    items = iterable if isinstance(iterable, (list, tuple)) else list(iterable)
+    if not set(map(type, items)) <= {enum}:
+        raise KeyError(next(m for m in items if m.__class__ is not enum))
+    index = ordinal_table(enum).index
+    try:
+        return list(map(index.__getitem__, map(_get_name, items)))
+    except KeyError:
+        raise KeyError(next(m for m in items if m._name_ not in index)) from None
+
+
+# ------------------------------------------------------------------------------
+# EnumMap:  dict-compatible, values in a list indexed by ordinal
+# ------------------------------------------------------------------------------
+
+class EnumMap(MutableMapping, Generic[E, V]):
+    __slots__ = ('_enum', '_members', '_index', '_values', '_len')
+
+    def __init__(self, enum: type[E], items: Union[Mapping[E, V], Iterable[tuple[E, V]]] = ()):
+        self._enum = enum
+        self._members, self._index = ordinal_table(enum)
+        self._values: list[Any] = [_EMPTY] * len(self._members)
+        self._len = 0
+        self.update(items)
+
+    # same as dict.fromkeys(iterable, value):  EnumMap.fromkeys(MotherSauce, 0) is
+    # every member, as for a dict. the enum is taken from the keys, or `enum`
+    # when there may be none.
+    @classmethod
+    def fromkeys(cls, iterable: Iterable[E], value: V = None, *,
+                 enum: Optional[type[E]] = None) -> 'EnumMap[E, V]':
+        if isinstance(iterable, type) and issubclass(iterable, Enum):
+            enum_map = cls(iterable)
+            enum_map._values = [value] * len(enum_map._members)
+            enum_map._len = len(enum_map._members)
+            return enum_map
+
+        keys = list(iterable)
+        if enum is None:
+            if not keys:
+                raise ValueError('EnumMap.fromkeys() with no keys needs enum=')
+            enum = keys[0].__class__
+        enum_map = cls(enum)
+        values = enum_map._values
+        for i in ordinals(enum, keys):
+            values[i] = value
+        enum_map._len = len(values) - values.count(_EMPTY)
+        return enum_map
+
+    # bulk tally:  Counter of int ordinals, counted in C
+    @classmethod
+    def counts(cls, enum: type[E], iterable: Iterable[E]) -> 'EnumMap[E, int]':
+        counter = Counter(ordinals(enum, iterable))
+        enum_map = cls(enum)
+        enum_map._values = [counter[i] for i in range(len(enum_map._members))]
+        enum_map._len = len(enum_map._members)
+        return enum_map
+
+    # None:  not a canonical member of this enum
+    def _ordinal(self, key: Any) -> Optional[int]:
+        if key.__class__ is not self._enum:
+            return None
+        return self._index.get(key._name_)
+
+    # ----------
+    # hot path inlined:  no helper call per access
+    def __getitem__(self, key: E) -> V:
+        if key.__class__ is not self._enum:
+            raise KeyError(key)
+        try:
+            value = self._values[self._index[key._name_]]
+        except KeyError:
+            raise KeyError(key) from None
+        if value is _EMPTY:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: E, value: V) -> None:
+        if key.__class__ is not self._enum:
+            raise KeyError(key)
+        try:
+            i = self._index[key._name_]
+        except KeyError:
+            raise KeyError(key) from None
+        values = self._values
+        if values[i] is _EMPTY:
+            self._len += 1
+        values[i] = value
+
+    def __delitem__(self, key: E) -> None:
+        i = self._ordinal(key)
+        if i is None or self._values[i] is _EMPTY:
+            raise KeyError(key)
+        self._values[i] = _EMPTY
+        self._len -= 1
+
+    def __contains__(self, key: Any) -> bool:
+        i = self._ordinal(key)
+        return i is not None and self._values[i] is not _EMPTY
+
+    def get(self, key: E, default: Optional[V] = None) -> Optional[V]:
+        i = self._ordinal(key)
+        if i is None:
+            return default
+        value = self._values[i]
+        return default if value is _EMPTY else value
+
+    # definition order, like a dict filled in definition order
+    def __iter__(self) -> Iterator[E]:
+        return (m for m, v in zip(self._members, self._values) if v is not _EMPTY)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __repr__(self) -> str:
+        return f'EnumMap({self._enum.__name__}, {dict(self.items())!r})'
+
+    def copy(self) -> 'EnumMap[E, V]':
+        enum_map = EnumMap(self._enum)
+        enum_map._values = self._values.copy()
+        enum_map._len = self._len
+        return enum_map
+
+
+# ------------------------------------------------------------------------------
+# EnumSet:  set-compatible, an int bit mask (bit i = ordinal i)
+#   |, &, -, ^ between EnumSets of the same enum are one int operation,
+#   len() is int.bit_count().
+# ------------------------------------------------------------------------------
+
+class EnumSet(MutableSet, Generic[E]):
+    __slots__ = ('_enum', '_members', '_index', '_mask')
+
+    def __init__(self, enum: type[E], iterable: Iterable[E] = ()):
+        self._enum = enum
+        self._members, self._index = ordinal_table(enum)
+        self._mask = 0
+        for member in iterable:
+            self.add(member)
+
+    def _from_iterable(self, iterable: Iterable[E]) -> 'EnumSet[E]':
+        return EnumSet(self._enum, iterable)
+
+    def _with_mask(self, mask: int) -> 'EnumSet[E]':
+        enum_set = EnumSet.__new__(EnumSet)
+        enum_set._enum = self._enum
+        enum_set._members = self._members
+        enum_set._index = self._index
+        enum_set._mask = mask
+        return enum_set
+
+    def _bits(self, member: Any) -> int:
+        if member.__class__ is not self._enum:
+            raise KeyError(member)
+        i = self._index.get(member._name_)
+        if i is not None:
+            return 1 << i
+        # Flag composite (SEAFOOD):  all of its canonical members
+        bits = 0
+        for m in member:
+            bits |= 1 << self._index[m._name_]
+        return bits
+
+    # hot path inlined
+    def __contains__(self, member: Any) -> bool:
+        if member.__class__ is not self._enum:
+            return False
+        try:
+            return self._mask >> self._index[member._name_] & 1 == 1
+        except KeyError:
+            bits = self._bits(member)
+            return self._mask & bits == bits
+
+    # bulk membership:  ordinals in C, then a list lookup per member
+    def contains_many(self, iterable: Iterable[E]) -> list[bool]:
+        mask = self._mask
+        table = [mask >> i & 1 == 1 for i in range(len(self._members))]
+        return list(map(table.__getitem__, ordinals(self._enum, iterable)))
+
+    def __iter__(self) -> Iterator[E]:
+        mask = self._mask
+        return (m for i, m in enumerate(self._members) if mask >> i & 1)
+
+    def __len__(self) -> int:
+        return self._mask.bit_count()
+
+    def __repr__(self) -> str:
+        return f'EnumSet({self._enum.__name__}, {set(self)!r})'
+
+    def add(self, member: E) -> None:
+        self._mask |= self._bits(member)
+
+    def discard(self, member: E) -> None:
+        try:
+            self._mask &= ~self._bits(member)
+        except KeyError:
+            pass
+
+    def clear(self) -> None:
+        self._mask = 0
+
+    def copy(self) -> 'EnumSet[E]':
+        return self._with_mask(self._mask)
+
+    # ----------
+    # same enum:  int operations, otherwise the generic Set versions
+    def __or__(self, other: Iterable) -> 'EnumSet[E]':
+        if other.__class__ is EnumSet and other._enum is self._enum:
+            return self._with_mask(self._mask | other._mask)
+        return super().__or__(other)
+
+    def __and__(self, other: Iterable) -> 'EnumSet[E]':
+        if other.__class__ is EnumSet and other._enum is self._enum:
+            return self._with_mask(self._mask & other._mask)
+        return super().__and__(other)
+
+    def __sub__(self, other: Iterable) -> 'EnumSet[E]':
+        if other.__class__ is EnumSet and other._enum is self._enum:
+            return self._with_mask(self._mask & ~other._mask)
+        return super().__sub__(other)
+
+    def __xor__(self, other: Iterable) -> 'EnumSet[E]':
+        if other.__class__ is EnumSet and other._enum is self._enum:
+            return self._with_mask(self._mask ^ other._mask)
+        return super().__xor__(other)
+
+    def __eq__(self, other: Any) -> bool:
+        if other.__class__ is EnumSet and other._enum is self._enum:
+            return self._mask == other._mask
+        return super().__eq__(other)
+
+    def __le__(self, other: Any) -> bool:
+        if other.__class__ is EnumSet and other._enum is self._enum:
+            return self._mask & ~other._mask == 0
+        return super().__le__(other)
+
+    __hash__ = None # type: ignore
+
+
+# ----------
+# EnumMap
+totals = EnumMap(ImperialMeasure)
+totals[ImperialMeasure.CUP] = 1.5
+totals[ImperialMeasure.TEASPOON] = 2
+
+assert totals == {ImperialMeasure.TEASPOON: 2, ImperialMeasure.CUP: 1.5}
+assert list(totals) == [ImperialMeasure.TEASPOON, ImperialMeasure.CUP]
+assert ImperialMeasure.TABLESPOON not in totals
+assert totals.get(ImperialMeasure.TABLESPOON, 0) == 0
+assert len(totals) == 2
+
+del totals[ImperialMeasure.CUP]
+assert dict(totals) == {ImperialMeasure.TEASPOON: 2}
+
+# only members of its own enum
+try:
+    totals[Broth.BEEF] = 1
+    assert False
+except KeyError as e:
+    pass
+
+try:
+    EnumMap(Broth)[MotherSauce.HOLLANDAISE]
+    assert False
+except KeyError as e:
+    pass
+
+tally = EnumMap.fromkeys(MotherSauce, 0)
+tally[MotherSauce.TOMATO] += 1
+assert tally[MotherSauce.TOMATO] == 1 and len(tally) == 5
+
+# fromkeys() as dict.fromkeys()
+some = [MotherSauce.TOMATO, MotherSauce.VELOUTÉ, MotherSauce.TOMATO]
+assert EnumMap.fromkeys(some, 0) == dict.fromkeys(some, 0)
+assert EnumMap.fromkeys(MotherSauce) == dict.fromkeys(MotherSauce)
+assert len(EnumMap.fromkeys([], enum=Broth)) == 0
+
+# members are not touched
+assert not any('_ordinal_' in vars(m) for m in MotherSauce)
+
+orders = [MotherSauce.TOMATO, MotherSauce.TOMATO, MotherSauce.VELOUTÉ]
+assert EnumMap.counts(MotherSauce, orders) == dict.fromkeys(MotherSauce, 0) | {MotherSauce.TOMATO: 2, MotherSauce.VELOUTÉ: 1}
+
+try:
+    EnumMap.counts(MotherSauce, [MotherSauce.TOMATO, Broth.BEEF])
+    assert False
+except KeyError as e:
+    pass
+
+
+# ----------
+# EnumSet
+allergens = EnumSet(Allergen, [Allergen.FISH, Allergen.SOY])
+
+assert allergens == {Allergen.FISH, Allergen.SOY}
+assert Allergen.FISH in allergens
+assert Allergen.SEAFOOD not in allergens
+
+# a Flag composite is all of its members
+allergens.add(Allergen.SEAFOOD)
+assert Allergen.SEAFOOD in allergens
+assert list(allergens) == [Allergen.FISH, Allergen.SHELLFISH, Allergen.SOY]
+assert len(allergens) == 3
+
+nuts = EnumSet(Allergen, [Allergen.ALL_NUTS])
+assert allergens | nuts == {Allergen.FISH, Allergen.SHELLFISH, Allergen.SOY, Allergen.TREE_NUTS, Allergen.PEANUTS}
+assert not allergens & nuts
+assert allergens - {Allergen.SOY} == {Allergen.FISH, Allergen.SHELLFISH}
+
+allergens.discard(Allergen.FISH)
+assert allergens == EnumSet(Allergen, [Allergen.SHELLFISH, Allergen.SOY])
+assert EnumSet(Broth, [Broth.BEEF]) <= EnumSet(Broth, Broth)
+assert EnumSet(Broth, [Broth.BEEF]).contains_many([Broth.BEEF, Broth.FISH]) == [True, False]
+assert Broth.BEEF not in allergens
+
+
+# ------------------------------------------------------------------------------
+# benchmark:  dict / set  vs  EnumMap / EnumSet
+#   tally:  counts[m] += 1 over 1M members, and the bulk EnumMap.counts()
+#   contains:  m in s over 1M members, and the bulk EnumSet.contains_many()
+#   union:  s | t, 100k times
+# ------------------------------------------------------------------------------
+
+def benchmark(n_rows: int = 1_000_000) -> None:
+    rng = random.Random(0)
+    print(f"{'':<30} {'dict/set ms':>12} {'EnumMap/Set ms':>15}")
+    for enum in (MotherSauce, Broth, Allergen):
+        rows = [rng.choice(members(enum)) for _ in range(n_rows)]
+        half = members(enum)[::2]
+
+        def dict_tally() -> dict:
+            counts = dict.fromkeys(enum, 0)
+            for m in rows:
+                counts[m] += 1
+            return counts
+
+        def enum_map_tally() -> EnumMap:
+            counts = EnumMap.fromkeys(enum, 0)
+            for m in rows:
+                counts[m] += 1
+            return counts
+
+        plain_set, enum_set = set(half), EnumSet(enum, half)
+        full_set, full_enum_set = set(enum), EnumSet(enum, enum)
+
+        assert dict_tally() == enum_map_tally() == EnumMap.counts(enum, rows)
+        assert [m in plain_set for m in rows] == enum_set.contains_many(rows)
+        cases = (
+            ('tally', dict_tally, enum_map_tally),
+            ('tally (bulk)', dict_tally, lambda: EnumMap.counts(enum, rows)),
+            ('contains', lambda: [m in plain_set for m in rows], lambda: [m in enum_set for m in rows]),
+            ('contains (bulk)', lambda: [m in plain_set for m in rows], lambda: enum_set.contains_many(rows)),
+            ('union x100k', lambda: [plain_set | full_set for _ in range(100_000)],
+                            lambda: [enum_set | full_enum_set for _ in range(100_000)]),
+        )
+        for label, builtin, ordinal in cases:
+            t_builtin = min(timeit.repeat(builtin, number=1, repeat=3))
+            t_ordinal = min(timeit.repeat(ordinal, number=1, repeat=3))
+            print(f'{enum.__name__ + " " + label:<30} {t_builtin * 1e3:>12.1f} {t_ordinal * 1e3:>15.1f}')
+
+
+benchmark()
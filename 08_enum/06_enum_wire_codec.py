@@ -0,0 +1,402 @@
+
+import json
+import os
+import random
+import struct
+import tempfile
+import threading
+import timeit
+
+from contextlib import contextmanager
+
+from enum import auto, Enum, Flag, IntEnum
+from typing import Generic, Iterable, Iterator, Optional, TypeVar
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    # not POSIX:  no registry lock, see EnumRegistry
+    fcntl = None
+
+
+# ------------------------------------------------------------------------------
+# same as 01_enum.py / 09_dataclass/01_dataclass.py
+# ------------------------------------------------------------------------------
+
+class MotherSauce(Enum):
+    BÉCHAMEL = "Béchamel"
+    VELOUTÉ = "Velouté"
+    ESPAGNOLE = "Espagnole"
+    TOMATO = "Tomato"
+    HOLLANDAISE = "Hollandaise"
+
+
+class Broth(Enum):
+    VEGETABLE = auto()
+    CHICKEN = auto()
+    BEEF = auto()
+    FISH = auto()
+
+
+class ImperialMeasure(Enum):
+    TEASPOON = auto()
+    TABLESPOON = auto()
+    CUP = auto()
+
+
+class Allergen(Flag):
+    FISH = auto()
+    SHELLFISH = auto()
+    TREE_NUTS = auto()
+    PEANUTS = auto()
+    GLUTEN = auto()
+    SOY = auto()
+    DAIRY = auto()
+    SEAFOOD = FISH | SHELLFISH
+    ALL_NUTS = TREE_NUTS | PEANUTS
+
+
+class ImperialLiquidMeasure(IntEnum):
+    CUP = 8
+    PINT = 16
+    QUART = 32
+    GALLON = 128
+
+
+class Kitchenware(IntEnum):
+    # Note to future programmers: these numbers are customer-defined
+    # and apt to change
+    PLATE = 7
+    CUP = 8
+    UTENSILS = 9
+
+
+# ------------------------------------------------------------------------------
+# wire codec
+#   .value is not stored:  it may be renumbered (Kitchenware), and
+#   ImperialLiquidMeasure.CUP == Kitchenware.CUP == 8.
+#   the registry gives every member a code BY NAME, per enum:
+#     - codes are append-only:  a new member gets the next code, a removed member
+#       keeps its code (retired), a code is never reused.
+#     - registry version is bumped on every change and recorded per enum:
+#       a block written with version N of an enum is decodable with every
+#       later version of that enum.
+#   Enum:  code is 0, 1, 2, ...      (uint8, uint16 beyond 256 members)
+#   Flag:  code is a bit mask, bit k = the canonical member with code k
+#          (uint8 for up to 8 flags, uint16 for up to 16)
+#   registry is persisted as JSON, written atomically (unique temp file + rename).
+#   register() holds an exclusive lock on '<path>.lock' (fcntl.flock), reloads the
+#   registry from disk, adds the new members and saves:  processes sharing a
+#   registry never give two members the same code.
+#   without fcntl (Windows) there is no lock:  one writer per registry file.
+# ------------------------------------------------------------------------------
+
+E = TypeVar('E', bound=Enum)
+
+REGISTRY_FORMAT_VERSION = 1
+
+# block header:  registry version, code width in bytes, number of codes
+_block_header = struct.Struct('>IBI')
+
+
+class EnumRegistry:
+
+    def __init__(self, path: str):
+        self.path = path
+        self.version = 0
+        # enum name -> member name -> code
+        self.codes: dict[str, dict[str, int]] = {}
+        # enum name -> registry version of its last change
+        self.versions: dict[str, int] = {}
+        self.load()
+
+    def load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as registry_file:
+            data = json.load(registry_file)
+        if data['format'] != REGISTRY_FORMAT_VERSION:
+            raise ValueError(f"unsupported registry format {data['format']}")
+        self.version = data['version']
+        self.codes = data['codes']
+        self.versions = data['versions']
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        if fcntl is None:
+            yield
+            return
+        with open(self.path + '.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def save(self) -> None:
+        data = {'format': REGISTRY_FORMAT_VERSION, 'version': self.version,
+                'codes': self.codes, 'versions': self.versions}
+        # write + rename:  reader never sees a half-written registry
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or '.',
+                                        prefix=os.path.basename(self.path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as registry_file:
+                json.dump(data, registry_file, ensure_ascii=False, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def register(self, enum: type[E]) -> 'EnumCodec[E]':
+        with self._locked():
+            # another process may have registered members since this one loaded
+            self.load()
+            codes = self.codes.setdefault(enum.__name__, {})
+            added = [m.name for m in enum if m.name not in codes]
+            for name in added:
+                codes[name] = len(codes)
+            if added:
+                self.version += 1
+                self.versions[enum.__name__] = self.version
+                self.save()
+        return EnumCodec(enum, dict(codes), self.versions[enum.__name__])
+
+
+class EnumCodec(Generic[E]):
+
+    def __init__(self, enum: type[E], codes: dict[str, int], version: int):
+        self.enum = enum
+        self.version = version
+        self.is_flag = issubclass(enum, Flag)
+        n_codes = len(codes)
+        if self.is_flag:
+            if n_codes > 16:
+                raise ValueError(f'{enum.__name__}: more than 16 flags')
+            self.dtype = np.dtype('>u1' if n_codes <= 8 else '>u2')
+        else:
+            self.dtype = np.dtype('>u1' if n_codes <= 256 else '>u2')
+
+        # code -> member (None:  retired)
+        by_name = enum.__members__
+        self._members: list[Optional[E]] = [None] * n_codes
+        self._retired: list[Optional[str]] = [None] * n_codes
+        for name, code in codes.items():
+            if name in by_name:
+                self._members[code] = by_name[name]
+            else:
+                self._retired[code] = name
+
+        if self.is_flag:
+            # member value bit -> code bit, every mask precomputed
+            self._bit_codes = {m.value: 1 << codes[m.name] for m in enum}
+            all_value = (~enum(0)).value
+            self._encode = {enum(v): self._flag_code(v) for v in range(all_value + 1)}
+            decoded = [self._flag_member(code) for code in range(1 << n_codes)]
+        else:
+            self._encode = {m: codes[m.name] for m in enum}
+            decoded = self._members
+
+        # filled one by one:  np.array() would iterate Flag members
+        self._decode_table = np.empty(len(decoded), dtype=object)
+        for code, member in enumerate(decoded):
+            self._decode_table[code] = member
+        self._is_retired = np.array([member is None for member in decoded], dtype=bool)
+
+    def _flag_code(self, value: int) -> int:
+        return sum(code for bit, code in self._bit_codes.items() if value & bit)
+
+    def _flag_member(self, code: int) -> Optional[Flag]:
+        value = 0
+        for k, member in enumerate(self._members):
+            if code >> k & 1:
+                if member is None:
+                    # a retired flag:  not representable by this enum any more
+                    return None
+                value |= member.value
+        return self.enum(value)
+
+    # ----------
+    # type checked:  IntEnum members hash / compare as int, without the check
+    # Kitchenware.CUP or a plain 8 would be encoded as ImperialLiquidMeasure.CUP
+    def encode(self, member: E) -> int:
+        if type(member) is not self.enum:
+            raise TypeError(f'{self.enum.__name__}: {member!r} is not a {self.enum.__name__} member')
+        return self._encode[member]
+
+    def decode(self, code: int) -> E:
+        if not 0 <= code < len(self._decode_table):
+            raise ValueError(f'{self.enum.__name__}: unknown code {code}')
+        member = self._decode_table[code]
+        if member is None:
+            raise ValueError(f'{self.enum.__name__}: code {code} is retired ({self._describe(code)})')
+        return member
+
+    def _describe(self, code: int) -> str:
+        if self.is_flag:
+            return '|'.join(self._retired[k] for k in range(len(self._retired)) if code >> k & 1 and self._retired[k])
+        return str(self._retired[code])
+
+    # ----------
+    # bulk:  one dict lookup per member, decoding is one numpy take()
+    def encode_many(self, members: Iterable[E]) -> bytes:
+        members = members if isinstance(members, (list, tuple)) else list(members)
+        # type check of every member in C
+        if not set(map(type, members)) <= {self.enum}:
+            self.encode(next(m for m in members if type(m) is not self.enum))
+        codes = np.fromiter(map(self._encode.__getitem__, members), dtype=self.dtype)
+        return _block_header.pack(self.version, self.dtype.itemsize, len(codes)) + codes.tobytes()
+
+    def decode_many(self, block: bytes) -> list[E]:
+        version, width, count = _block_header.unpack_from(block)
+        if version > self.version:
+            raise ValueError(f'{self.enum.__name__}: block written with registry version {version}, '
+                             f'this codec is version {self.version}')
+        codes = np.frombuffer(block, dtype=np.dtype(f'>u{width}'), count=count, offset=_block_header.size)
+        if codes.size and codes.max() >= len(self._decode_table):
+            raise ValueError(f'{self.enum.__name__}: unknown code {codes.max()}')
+        retired = self._is_retired[codes]
+        if retired.any():
+            code = int(codes[retired][0])
+            raise ValueError(f'{self.enum.__name__}: code {code} is retired ({self._describe(code)})')
+        return self._decode_table[codes].tolist()
+
+
+# ----------
+with tempfile.TemporaryDirectory() as registry_dir:
+    registry_path = os.path.join(registry_dir, 'enum_registry.json')
+    registry = EnumRegistry(registry_path)
+
+    codecs = {enum: registry.register(enum)
+              for enum in (MotherSauce, Broth, ImperialMeasure, Allergen, ImperialLiquidMeasure, Kitchenware)}
+
+    assert codecs[MotherSauce].encode(MotherSauce.TOMATO) == 3
+    assert codecs[MotherSauce].dtype.itemsize == 1
+
+    # same value, different enums, different codes
+    assert codecs[Kitchenware].encode(Kitchenware.CUP) == 1
+    assert codecs[ImperialLiquidMeasure].encode(ImperialLiquidMeasure.CUP) == 0
+
+    # Flag:  composites are masks of member codes
+    allergen_codec = codecs[Allergen]
+    assert allergen_codec.encode(Allergen.SEAFOOD) == 0b11
+    assert allergen_codec.decode(0b11) is Allergen.SEAFOOD
+    assert allergen_codec.decode(allergen_codec.encode(Allergen.SOY | Allergen.PEANUTS)) == Allergen.SOY | Allergen.PEANUTS
+
+    sauces = [MotherSauce.TOMATO, MotherSauce.BÉCHAMEL, MotherSauce.TOMATO]
+    assert codecs[MotherSauce].decode_many(codecs[MotherSauce].encode_many(sauces)) == sauces
+
+    kitchen_log = codecs[Kitchenware].encode_many([Kitchenware.PLATE, Kitchenware.UTENSILS, Kitchenware.CUP])
+
+    # equal as int is not enough:  only members of the codec's own enum
+    liquid_codec = codecs[ImperialLiquidMeasure]
+    for wrong in (Kitchenware.CUP, 8):
+        for encode in (liquid_codec.encode, lambda m: liquid_codec.encode_many([ImperialLiquidMeasure.CUP, m])):
+            try:
+                encode(wrong)
+                assert False
+            except TypeError:
+                pass
+
+    # codes outside the table
+    for code in (-1, len(ImperialLiquidMeasure)):
+        try:
+            liquid_codec.decode(code)
+            assert False
+        except ValueError as e:
+            assert 'unknown code' in str(e)
+
+    # registry is persisted, registering again changes nothing
+    version = registry.version
+    assert EnumRegistry(registry_path).register(Kitchenware).version == version
+
+
+    # ----------
+    # the customer renumbers Kitchenware and adds a member
+    class Kitchenware(IntEnum):
+        BOWL = 1
+        PLATE = 2
+        CUP = 3
+        UTENSILS = 4
+
+    registry = EnumRegistry(registry_path)
+    kitchen_codec = registry.register(Kitchenware)
+    assert registry.version == version + 1
+
+    # old log:  same members by name
+    assert kitchen_codec.decode_many(kitchen_log) == [Kitchenware.PLATE, Kitchenware.UTENSILS, Kitchenware.CUP]
+    assert kitchen_codec.encode(Kitchenware.BOWL) == 3
+
+    # other enums keep their version
+    assert registry.register(MotherSauce).version == codecs[MotherSauce].version == 1
+
+
+    # ----------
+    # a member is removed:  its code is retired, not reused
+    class Kitchenware(IntEnum):
+        BOWL = 1
+        PLATE = 2
+        UTENSILS = 4
+
+    kitchen_codec = EnumRegistry(registry_path).register(Kitchenware)
+    assert kitchen_codec.decode_many(kitchen_codec.encode_many([Kitchenware.BOWL])) == [Kitchenware.BOWL]
+    try:
+        kitchen_codec.decode_many(kitchen_log)
+        assert False
+    except ValueError as e:
+        assert 'CUP' in str(e)
+
+
+# ----------
+# writers sharing a registry file (a registry object each, as separate processes
+# would have):  every change is merged, no version or code is given twice
+with tempfile.TemporaryDirectory() as registry_dir:
+    registry_path = os.path.join(registry_dir, 'enum_registry.json')
+    enums = [Enum(f'Station{i}', [f'STATION_{k}' for k in range(i + 1)]) for i in range(8)]
+    writers = [EnumRegistry(registry_path) for _ in enums]
+    threads = [threading.Thread(target=writer.register, args=(enum,)) for writer, enum in zip(writers, enums)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    registry = EnumRegistry(registry_path)
+    assert registry.version == len(enums)
+    assert sorted(registry.versions.values()) == list(range(1, len(enums) + 1))
+    assert all(registry.codes[e.__name__] == {m.name: k for k, m in enumerate(e)} for e in enums)
+    assert not [f for f in os.listdir(registry_dir) if f.endswith('.tmp')]
+
+
+# ------------------------------------------------------------------------------
+# benchmark:  1M members in an event log
+#   raw .value as JSON  vs  codec block (size and encode / decode time)
+# ------------------------------------------------------------------------------
+
+def benchmark(n_rows: int = 1_000_000) -> None:
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as registry_dir:
+        registry = EnumRegistry(os.path.join(registry_dir, 'enum_registry.json'))
+        for enum in (MotherSauce, Allergen):
+            codec = registry.register(enum)
+            if enum is Allergen:
+                rows = [Allergen(rng.randrange(128)) for _ in range(n_rows)]
+            else:
+                rows = [rng.choice(list(enum)) for _ in range(n_rows)]
+
+            raw = json.dumps([m.value for m in rows]).encode()
+            block = codec.encode_many(rows)
+            assert codec.decode_many(block) == rows
+            assert [enum(v) for v in json.loads(raw)] == rows
+
+            t_raw_encode = min(timeit.repeat(lambda: json.dumps([m.value for m in rows]).encode(), number=1, repeat=3))
+            t_raw_decode = min(timeit.repeat(lambda: [enum(v) for v in json.loads(raw)], number=1, repeat=3))
+            t_encode = min(timeit.repeat(lambda: codec.encode_many(rows), number=1, repeat=3))
+            t_decode = min(timeit.repeat(lambda: codec.decode_many(block), number=1, repeat=3))
+            print(f'{enum.__name__:<12} raw .value:  {len(raw):>10,} bytes  '
+                  f'encode {t_raw_encode * 1e3:>7.1f} ms  decode {t_raw_decode * 1e3:>7.1f} ms')
+            print(f'{"":<12} codec:       {len(block):>10,} bytes  '
+                  f'encode {t_encode * 1e3:>7.1f} ms  decode {t_decode * 1e3:>7.1f} ms')
+
+
+benchmark()
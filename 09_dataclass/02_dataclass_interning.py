@@ -0,0 +1,141 @@
+
+import copy
+import pickle
+import timeit
+import tracemalloc
+import weakref
+
+from dataclasses import asdict, astuple, dataclass, fields, FrozenInstanceError
+from enum import auto, Enum
+
+
+# ------------------------------------------------------------------------------
+# same as 01_dataclass.py
+# ------------------------------------------------------------------------------
+
+class ImperialMeasure(Enum):
+    TEASPOON = auto()
+    TABLESPOON = auto()
+    CUP = auto()
+
+
+@dataclass(frozen=True)
+class Ingredient:
+    name: str
+    amount: float = 1
+    units: ImperialMeasure = ImperialMeasure.CUP
+
+
+# ------------------------------------------------------------------------------
+# flyweight:  interned frozen Ingredient
+#   - intern_ingredient() returns ONE shared instance for identical values
+#     (a frozen instance can be shared safely, nobody can modify it)
+#   - hash is computed once in __post_init__ and cached,
+#     so set[Ingredient] insert does not hash the field tuple again
+#   - pool holds weak references:  ingredient no recipe uses any more is freed
+#   - pickle / copy go through intern_ingredient():  the cached hash (salted
+#     by PYTHONHASHSEED) is not pickled, and the unpickled ingredient is shared
+# ------------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class InternedIngredient:
+    name: str
+    amount: float = 1
+    units: ImperialMeasure = ImperialMeasure.CUP
+
+    def __post_init__(self):
+        # frozen:  only object.__setattr__ can set the cache
+        # plain attribute, not a field:  stays out of fields() / asdict() / astuple()
+        object.__setattr__(self, '_hash', hash((self.name, self.amount, self.units)))
+
+    # explicit __hash__ is kept by @dataclass(frozen=True)
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __reduce__(self):
+        return intern_ingredient, (self.name, self.amount, self.units)
+
+
+_ingredient_pool: 'weakref.WeakValueDictionary[tuple, InternedIngredient]' = weakref.WeakValueDictionary()
+
+
+def intern_ingredient(name: str, amount: float = 1,
+                      units: ImperialMeasure = ImperialMeasure.CUP) -> InternedIngredient:
+    key = (name, amount, units)
+    ingredient = _ingredient_pool.get(key)
+    if ingredient is None:
+        ingredient = _ingredient_pool[key] = InternedIngredient(name, amount, units)
+    return ingredient
+
+
+# ----------
+garlic = intern_ingredient("Garlic", 2, ImperialMeasure.TEASPOON)
+
+# same value, same instance
+assert intern_ingredient("Garlic", 2, ImperialMeasure.TEASPOON) is garlic
+
+# still a value object
+assert garlic == InternedIngredient("Garlic", 2, ImperialMeasure.TEASPOON)
+assert hash(garlic) == hash(InternedIngredient("Garlic", 2, ImperialMeasure.TEASPOON))
+assert repr(garlic) == "InternedIngredient(name='Garlic', amount=2, units=<ImperialMeasure.TEASPOON: 1>)"
+
+try:
+    garlic.amount = 3 # type: ignore
+    assert False
+except FrozenInstanceError as e:
+    pass
+
+# same fields as Ingredient, the cached hash is not one of them
+assert [f.name for f in fields(garlic)] == [f.name for f in fields(Ingredient)]
+assert asdict(garlic) == asdict(Ingredient("Garlic", 2, ImperialMeasure.TEASPOON))
+assert astuple(garlic) == ("Garlic", 2, ImperialMeasure.TEASPOON)
+
+
+# ----------
+# 2 == 2.0 and hash(2) == hash(2.0):  same as dataclass equality, one instance
+assert intern_ingredient("Garlic", 2.0, ImperialMeasure.TEASPOON) is garlic
+
+
+# ----------
+# pickle / copy:  no stale hash, same shared instance
+payload = pickle.dumps(garlic)
+assert b'_hash' not in payload
+assert pickle.loads(payload) is garlic
+assert copy.copy(garlic) is garlic and copy.deepcopy(garlic) is garlic
+
+
+# ------------------------------------------------------------------------------
+# benchmark:  recipe catalog with many references to few distinct ingredients
+# ------------------------------------------------------------------------------
+
+NAMES = ["Pepper", "Garlic", "Carrots", "Celery", "Onions", "Parsley", "Noodles", "Chicken"]
+
+
+def ingredient_values(n_references: int) -> list[tuple]:
+    return [(NAMES[i % len(NAMES)], (i % 4) * .25 + .25, ImperialMeasure((i % 3) + 1))
+            for i in range(n_references)]
+
+
+def measure(func, values: list[tuple]) -> tuple[list, float]:
+    tracemalloc.start()
+    ingredients = func(values)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return ingredients, peak / 2**20
+
+
+def benchmark(n_references: int = 200_000) -> None:
+    values = ingredient_values(n_references)
+
+    plain, plain_mib = measure(lambda vs: [Ingredient(*v) for v in vs], values)
+    interned, interned_mib = measure(lambda vs: [intern_ingredient(*v) for v in vs], values)
+    print(f'memory   Ingredient()          {plain_mib:>8.1f} MiB  ({len(set(map(id, plain))):,} instances)')
+    print(f'memory   intern_ingredient()   {interned_mib:>8.1f} MiB  ({len(set(map(id, interned))):,} instances)')
+
+    plain_hash = timeit.timeit(lambda: set(plain), number=5) / 5
+    interned_hash = timeit.timeit(lambda: set(interned), number=5) / 5
+    print(f'set()    Ingredient            {plain_hash * 1e3:>8.1f} ms')
+    print(f'set()    InternedIngredient    {interned_hash * 1e3:>8.1f} ms')
+
+
+benchmark()
@@ -0,0 +1,210 @@
+
+import datetime
+import timeit
+import tracemalloc
+
+from dataclasses import dataclass, FrozenInstanceError
+from enum import auto, Enum
+from collections import namedtuple
+
+from copy import deepcopy
+
+
+# ------------------------------------------------------------------------------
+# slots=True (python 3.10+)
+#   dataclass generates __slots__ instead of a per-instance __dict__.
+#   frozen / eq / order behave the same, FrozenInstanceError and deepcopy still work.
+#   (but no new attribute can be added to the instance)
+# ------------------------------------------------------------------------------
+
+class ImperialMeasure(Enum):
+    TEASPOON = auto()
+    TABLESPOON = auto()
+    CUP = auto()
+
+
+class Broth(Enum):
+    VEGETABLE = auto()
+    CHICKEN = auto()
+    BEEF = auto()
+    FISH = auto()
+
+
+# ----------
+# dict-backed (same as 01_dataclass.py)
+@dataclass(frozen=True)
+class Ingredient:
+    name: str
+    amount: float = 1
+    units: ImperialMeasure = ImperialMeasure.CUP
+
+
+@dataclass(eq=True, order=True)
+class NutritionInformation:
+    calories: int
+    fat: int
+    carbohydrates: int
+
+
+# ----------
+# slotted variants
+@dataclass(frozen=True, slots=True)
+class SlottedIngredient:
+    name: str
+    amount: float = 1
+    units: ImperialMeasure = ImperialMeasure.CUP
+
+
+@dataclass(eq=True, slots=True)
+class SlottedRecipe:
+    aromatics: set[SlottedIngredient]
+    broth: Broth
+    vegetables: set[SlottedIngredient]
+    meats: set[SlottedIngredient]
+    starches: set[SlottedIngredient]
+    garnishes: set[SlottedIngredient]
+    time_to_cook: datetime.timedelta
+
+    def make_vegetarian(self):
+        self.meats.clear()
+        self.broth = Broth.VEGETABLE
+
+    def get_ingredient_names(self):
+        ingredients = (self.aromatics |
+                       self.vegetables |
+                       self.meats |
+                       self.starches |
+                       self.garnishes)
+
+        return ({i.name for i in ingredients} |
+                {self.broth.name.capitalize() + " Broth"})
+
+
+@dataclass(eq=True, order=True, slots=True)
+class SlottedNutritionInformation:
+    calories: int
+    fat: int
+    carbohydrates: int
+
+
+# custom order (fat, carbohydrates, calories) as in 01_dataclass.py, slotted
+@dataclass(eq=True, slots=True)
+class SlottedNutritionInformationByFat:
+    calories: int
+    fat: int
+    carbohydrates: int
+
+    def __lt__(self, rhs) -> bool:
+        return ((self.fat, self.carbohydrates, self.calories) <
+                (rhs.fat, rhs.carbohydrates, rhs.calories))
+
+    def __le__(self, rhs) -> bool:
+        return self < rhs or self == rhs
+
+    def __gt__(self, rhs) -> bool:
+        return not self <= rhs
+
+    def __ge__(self, rhs) -> bool:
+        return not self < rhs
+
+
+NutritionInformationTuple = namedtuple('NutritionInformationTuple', ['calories', 'fat', 'carbohydrates'])
+
+
+# ----------
+# no __dict__
+garlic = SlottedIngredient("Garlic", 2, ImperialMeasure.TEASPOON)
+
+assert not hasattr(garlic, '__dict__')
+assert SlottedIngredient.__slots__ == ('name', 'amount', 'units')
+
+# frozen
+try:
+    garlic.amount = 3 # type: ignore
+    assert False
+except FrozenInstanceError as e:
+    pass
+
+# hash / eq of frozen
+assert {garlic, SlottedIngredient("Garlic", 2, ImperialMeasure.TEASPOON)} == {garlic}
+
+
+# ----------
+# deepcopy + make_vegetarian, same as 01_dataclass.py
+pepper = SlottedIngredient("Pepper", 1, ImperialMeasure.TABLESPOON)
+chicken = SlottedIngredient("Chicken", 1.5, ImperialMeasure.CUP)
+noodles = SlottedIngredient("Noodles", 1.5, ImperialMeasure.CUP)
+
+chicken_noodle_soup = SlottedRecipe(
+    aromatics={pepper, garlic},
+    broth=Broth.CHICKEN,
+    vegetables=set(),
+    meats={chicken},
+    starches={noodles},
+    garnishes=set(),
+    time_to_cook=datetime.timedelta(minutes=60))
+
+noodle_soup = deepcopy(chicken_noodle_soup)
+noodle_soup.make_vegetarian()
+
+assert chicken_noodle_soup.meats == {chicken}
+assert noodle_soup.get_ingredient_names() == {'Garlic', 'Pepper', 'Noodles', 'Vegetable Broth'}
+assert chicken_noodle_soup != noodle_soup
+
+# no new attributes on slotted instance
+try:
+    noodle_soup.servings = 4 # type: ignore
+    assert False
+except AttributeError as e:
+    pass
+
+
+# ----------
+# order
+nutritionals = [SlottedNutritionInformation(calories=100, fat=1, carbohydrates=3),
+                SlottedNutritionInformation(calories=50, fat=6, carbohydrates=4),
+                SlottedNutritionInformation(calories=125, fat=12, carbohydrates=3)]
+
+assert [n.calories for n in sorted(nutritionals)] == [50, 100, 125]
+
+nutritionals = [SlottedNutritionInformationByFat(calories=100, fat=1, carbohydrates=3),
+                SlottedNutritionInformationByFat(calories=50, fat=6, carbohydrates=4),
+                SlottedNutritionInformationByFat(calories=125, fat=12, carbohydrates=3)]
+
+assert [n.fat for n in sorted(nutritionals)] == [1, 6, 12]
+
+
+# ------------------------------------------------------------------------------
+# benchmark:  memory and attribute access
+#   dict-backed dataclass / slotted dataclass / namedtuple
+# ------------------------------------------------------------------------------
+
+def measure_memory(factory, n_rows: int) -> float:
+    tracemalloc.start()
+    rows = [factory(i) for i in range(n_rows)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    return current / n_rows
+
+
+# bytes/row is measured by tracemalloc (sys.getsizeof() does not see the lazily created __dict__)
+def benchmark(n_rows: int = 200_000) -> None:
+    print(f"{'NutritionInformation':<30} {'bytes/row':>10} {'ns/access':>10}")
+    for label, cls in (('dataclass (__dict__)', NutritionInformation),
+                       ('dataclass (slots=True)', SlottedNutritionInformation),
+                       ('namedtuple', NutritionInformationTuple)):
+        row = cls(100, 5, 10)
+        access = timeit.timeit('row.calories; row.fat; row.carbohydrates',
+                               globals={'row': row}, number=1_000_000) / 3
+        memory = measure_memory(lambda i: cls(i, i % 20, i % 50), n_rows)
+        print(f'{label:<30} {memory:>10.1f} {access * 1e3:>10.1f}')
+
+    print(f"{'Ingredient':<30} {'bytes/row':>10}")
+    for label, cls in (('dataclass (__dict__)', Ingredient),
+                       ('dataclass (slots=True)', SlottedIngredient)):
+        memory = measure_memory(lambda i: cls('Garlic', i), n_rows)
+        print(f'{label:<30} {memory:>10.1f}')
+
+
+benchmark()
@@ -0,0 +1,356 @@
+
+import datetime
+import timeit
+import tracemalloc
+
+from collections.abc import Iterable, Iterator, MutableSet
+from dataclasses import dataclass, fields
+from enum import auto, Enum
+from typing import Any, Optional
+
+from copy import deepcopy
+
+
+# ------------------------------------------------------------------------------
+# same as 01_dataclass.py
+# ------------------------------------------------------------------------------
+
+class ImperialMeasure(Enum):
+    TEASPOON = auto()
+    TABLESPOON = auto()
+    CUP = auto()
+
+
+class Broth(Enum):
+    VEGETABLE = auto()
+    CHICKEN = auto()
+    BEEF = auto()
+    FISH = auto()
+
+
+@dataclass(frozen=True)
+class Ingredient:
+    name: str
+    amount: float = 1
+    units: ImperialMeasure = ImperialMeasure.CUP
+
+
+# ------------------------------------------------------------------------------
+# copy-on-write set
+#   share() returns a new CowSet on the SAME underlying set, both are marked shared.
+#   the first write to a shared CowSet copies the underlying set (clear() does not
+#   even copy), unchanged sets stay shared between recipe and its variants.
+#   the full set API:  reads go to the underlying set (results are plain sets, as
+#   from set), writes only copy if they change something.
+#   (a CowSet is a collections.abc.MutableSet, not a subclass of set:
+#   isinstance(recipe.meats, set) is False, check for collections.abc.Set)
+# ------------------------------------------------------------------------------
+
+class CowSet(MutableSet):
+    __slots__ = ('_data', '_shared')
+
+    def __init__(self, iterable: Iterable = (), *, _data: Optional[set] = None, _shared: bool = False):
+        self._data = set(iterable) if _data is None else _data
+        self._shared = _shared
+
+    @classmethod
+    def _from_iterable(cls, iterable: Iterable) -> 'CowSet':
+        return cls(iterable)
+
+    def share(self) -> 'CowSet':
+        self._shared = True
+        return CowSet(_data=self._data, _shared=True)
+
+    def _writable(self) -> set:
+        if self._shared:
+            self._data = set(self._data)
+            self._shared = False
+        return self._data
+
+    # ----------
+    # read:  no copy
+    def __contains__(self, item: Any) -> bool:
+        return item in self._data
+
+    def __iter__(self) -> Iterator:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return repr(self._data) if self._data else 'set()'
+
+    # ----------
+    # write:  copy first if shared
+    def add(self, item: Any) -> None:
+        if item not in self._data:
+            self._writable().add(item)
+
+    def discard(self, item: Any) -> None:
+        if item in self._data:
+            self._writable().discard(item)
+
+    def clear(self) -> None:
+        self._data = set()
+        self._shared = False
+
+    def __deepcopy__(self, memo: dict) -> 'CowSet':
+        return CowSet(deepcopy(self._data, memo))
+
+    # ----------
+    # rest of the set API
+    def copy(self) -> 'CowSet':
+        return self.share()
+
+    def union(self, *others: Iterable) -> set:
+        return self._data.union(*others)
+
+    def intersection(self, *others: Iterable) -> set:
+        return self._data.intersection(*others)
+
+    def difference(self, *others: Iterable) -> set:
+        return self._data.difference(*others)
+
+    def symmetric_difference(self, other: Iterable) -> set:
+        return self._data.symmetric_difference(other)
+
+    def issubset(self, other: Iterable) -> bool:
+        return self._data.issubset(other)
+
+    def issuperset(self, other: Iterable) -> bool:
+        return self._data.issuperset(other)
+
+    def isdisjoint(self, other: Iterable) -> bool:
+        return self._data.isdisjoint(other)
+
+    # the result is a new set anyway:  it replaces the (maybe shared) one, no copy
+    def _replace(self, data: set) -> None:
+        if data != self._data:
+            self._data = data
+            self._shared = False
+
+    def update(self, *others: Iterable) -> None:
+        self._replace(self._data.union(*others))
+
+    def intersection_update(self, *others: Iterable) -> None:
+        self._replace(self._data.intersection(*others))
+
+    def difference_update(self, *others: Iterable) -> None:
+        self._replace(self._data.difference(*others))
+
+    def symmetric_difference_update(self, other: Iterable) -> None:
+        self._replace(self._data.symmetric_difference(other))
+
+    def __ior__(self, other: Iterable) -> 'CowSet':
+        self.update(other)
+        return self
+
+    def __iand__(self, other: Iterable) -> 'CowSet':
+        self.intersection_update(other)
+        return self
+
+    def __isub__(self, other: Iterable) -> 'CowSet':
+        self.difference_update(other)
+        return self
+
+    def __ixor__(self, other: Iterable) -> 'CowSet':
+        self.symmetric_difference_update(other)
+        return self
+
+
+# ------------------------------------------------------------------------------
+# Recipe with copy-on-write derivation
+#   derive(**changes):  variant shares every ingredient set with this recipe,
+#   changes replace fields. cost is the size of the change, not of the recipe.
+# ------------------------------------------------------------------------------
+
+INGREDIENT_FIELDS = ('aromatics', 'vegetables', 'meats', 'starches', 'garnishes')
+
+
+@dataclass(eq=True)
+class Recipe:
+    aromatics: set[Ingredient]
+    broth: Broth
+    vegetables: set[Ingredient]
+    meats: set[Ingredient]
+    starches: set[Ingredient]
+    garnishes: set[Ingredient]
+    time_to_cook: datetime.timedelta
+
+    # on __init__ and on reassignment (recipe.meats = {...})
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in INGREDIENT_FIELDS and not isinstance(value, CowSet):
+            # take the given set as it is (no copy), like the plain dataclass does
+            value = CowSet(_data=value if isinstance(value, set) else set(value))
+        object.__setattr__(self, name, value)
+
+    def derive(self, **changes: Any) -> 'Recipe':
+        values = {}
+        for f in fields(self):
+            if f.name in changes:
+                values[f.name] = changes[f.name]
+            elif f.name in INGREDIENT_FIELDS:
+                values[f.name] = getattr(self, f.name).share()
+            else:
+                values[f.name] = getattr(self, f.name)
+        return Recipe(**values)
+
+    def make_vegetarian(self):
+        self.meats.clear()
+        self.broth = Broth.VEGETABLE
+
+    def get_ingredient_names(self):
+        ingredients = (self.aromatics |
+                       self.vegetables |
+                       self.meats |
+                       self.starches |
+                       self.garnishes)
+
+        return ({i.name for i in ingredients} |
+                {self.broth.name.capitalize() + " Broth"})
+
+    # ----------
+    # common variants
+    def vegetarian(self) -> 'Recipe':
+        recipe = self.derive()
+        recipe.make_vegetarian()
+        return recipe
+
+    def without_garnish(self) -> 'Recipe':
+        return self.derive(garnishes=CowSet())
+
+    def scaled(self, factor: float) -> 'Recipe':
+        return self.derive(**{name: CowSet(Ingredient(i.name, i.amount * factor, i.units)
+                                           for i in getattr(self, name))
+                              for name in INGREDIENT_FIELDS})
+
+
+# ----------
+pepper = Ingredient("Pepper", 1, ImperialMeasure.TABLESPOON)
+garlic = Ingredient("Garlic", 2, ImperialMeasure.TEASPOON)
+carrots = Ingredient("Carrots", .25, ImperialMeasure.CUP)
+celery = Ingredient("Celery", .25, ImperialMeasure.CUP)
+onions = Ingredient("Onions", .25, ImperialMeasure.CUP)
+parsley = Ingredient("Parsley", 2, ImperialMeasure.TABLESPOON)
+noodles = Ingredient("Noodles", 1.5, ImperialMeasure.CUP)
+chicken = Ingredient("Chicken", 1.5, ImperialMeasure.CUP)
+
+chicken_noodle_soup = Recipe(
+    aromatics={pepper, garlic},
+    broth=Broth.CHICKEN,
+    vegetables={celery, onions, carrots},
+    meats={chicken},
+    starches={noodles},
+    garnishes={parsley},
+    time_to_cook=datetime.timedelta(minutes=60))
+
+chicken_noodle_soup.garnishes.add(pepper)
+
+assert chicken_noodle_soup.garnishes == {parsley, pepper}
+
+
+# ----------
+# instead of deepcopy(chicken_noodle_soup).make_vegetarian()
+noodle_soup = chicken_noodle_soup.derive()
+noodle_soup.make_vegetarian()
+
+assert noodle_soup.get_ingredient_names() == {'Garlic', 'Pepper', 'Carrots', 'Celery', 'Onions', 'Noodles', 'Parsley', 'Vegetable Broth'}
+assert chicken_noodle_soup.meats == {chicken}
+assert chicken_noodle_soup.broth == Broth.CHICKEN
+
+assert noodle_soup == noodle_soup
+assert chicken_noodle_soup != noodle_soup
+
+# unchanged sets are shared, not copied
+assert noodle_soup.vegetables._data is chicken_noodle_soup.vegetables._data
+
+
+# ----------
+# write to a shared set:  copied at the first write, the other recipe is not touched
+noodle_soup.aromatics.add(onions)
+
+assert onions in noodle_soup.aromatics
+assert onions not in chicken_noodle_soup.aromatics
+
+# also the original can be modified without touching its variants
+chicken_noodle_soup.starches.discard(noodles)
+assert noodle_soup.starches == {noodles}
+chicken_noodle_soup.starches.add(noodles)
+
+
+# ----------
+assert chicken_noodle_soup.without_garnish().garnishes == set()
+assert {i.amount for i in chicken_noodle_soup.scaled(2).meats} == {3.0}
+
+# deepcopy still works
+assert deepcopy(chicken_noodle_soup) == chicken_noodle_soup
+
+# a reassigned set is copy-on-write too
+reassigned = chicken_noodle_soup.derive()
+reassigned.meats = {chicken}
+variant = reassigned.derive()
+variant.meats.clear()
+assert reassigned.meats == {chicken} and variant.meats == set()
+
+
+# ----------
+# the set API, writes are copy-on-write too
+variant = chicken_noodle_soup.derive()
+variant.meats.update({pepper}, [garlic])
+variant.garnishes |= {onions}
+variant.aromatics.intersection_update({pepper})
+variant.vegetables -= {celery}
+variant.starches.symmetric_difference_update({noodles, chicken})
+assert variant.meats == {chicken, pepper, garlic} and chicken_noodle_soup.meats == {chicken}
+assert variant.garnishes == {parsley, pepper, onions}
+assert variant.aromatics == {pepper}
+assert variant.vegetables == {onions, carrots}
+assert variant.starches == {chicken}
+assert chicken_noodle_soup.starches == {noodles} and noodles in chicken_noodle_soup.starches
+
+# a write that changes nothing keeps the set shared
+variant = chicken_noodle_soup.derive()
+variant.vegetables.update({celery})
+variant.vegetables.difference_update({chicken})
+assert variant.vegetables._data is chicken_noodle_soup.vegetables._data
+
+meats = chicken_noodle_soup.meats
+assert meats.union({pepper}) == {chicken, pepper} and type(meats.union()) is set
+assert meats.intersection({chicken, pepper}) == {chicken}
+assert meats.difference({chicken}) == set()
+assert meats.symmetric_difference({pepper}) == {chicken, pepper}
+assert meats.issubset({chicken, pepper}) and meats.issuperset(set()) and meats.isdisjoint({pepper})
+meats_copy = meats.copy()
+meats_copy.add(pepper)
+assert meats == {chicken} and meats_copy == {chicken, pepper}
+
+
+# ------------------------------------------------------------------------------
+# benchmark:  thousands of vegetarian variants
+#   deepcopy(recipe).make_vegetarian()  vs  recipe.vegetarian()
+# ------------------------------------------------------------------------------
+
+def measure(func, n_variants: int) -> tuple[float, float]:
+    tracemalloc.start()
+    variants = [func() for _ in range(n_variants)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del variants
+    seconds = timeit.timeit(func, number=n_variants)
+    return seconds / n_variants * 1e6, current / n_variants
+
+
+def benchmark(n_variants: int = 10_000) -> None:
+    def with_deepcopy() -> Recipe:
+        recipe = deepcopy(chicken_noodle_soup)
+        recipe.make_vegetarian()
+        return recipe
+
+    for label, func in (('deepcopy + make_vegetarian()', with_deepcopy),
+                        ('derive().make_vegetarian()', chicken_noodle_soup.vegetarian)):
+        us, size = measure(func, n_variants)
+        print(f'{label:<30} {us:>8.2f} us/variant {size:>10.0f} bytes/variant')
+
+
+benchmark()
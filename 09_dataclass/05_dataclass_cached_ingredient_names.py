@@ -0,0 +1,356 @@
+
+import datetime
+import timeit
+
+from collections.abc import Iterable, Iterator, MutableSet
+from dataclasses import dataclass
+from enum import auto, Enum
+from typing import Any, Callable, Optional
+
+from copy import copy, deepcopy
+
+
+# ------------------------------------------------------------------------------
+# same as 01_dataclass.py
+# ------------------------------------------------------------------------------
+
+class ImperialMeasure(Enum):
+    TEASPOON = auto()
+    TABLESPOON = auto()
+    CUP = auto()
+
+
+class Broth(Enum):
+    VEGETABLE = auto()
+    CHICKEN = auto()
+    BEEF = auto()
+    FISH = auto()
+
+
+@dataclass(frozen=True)
+class Ingredient:
+    name: str
+    amount: float = 1
+    units: ImperialMeasure = ImperialMeasure.CUP
+
+
+# ------------------------------------------------------------------------------
+# observed set
+#   ingredient sets are mutable in place (soup.aromatics.add(...)),
+#   so the set itself tells its owner when its content really changed.
+# ------------------------------------------------------------------------------
+
+class ObservedSet(MutableSet):
+    __slots__ = ('_data', '_on_change')
+
+    # a set is taken as it is (no copy), like a plain dataclass field:  the caller's
+    # reference sees the recipe's changes. changes made through that reference
+    # are not observed, change the recipe through its own field.
+    def __init__(self, iterable: Iterable = (), on_change: Optional[Callable[[], None]] = None):
+        self._data = iterable if type(iterable) is set else set(iterable)
+        self._on_change = on_change
+
+    @classmethod
+    def _from_iterable(cls, iterable: Iterable) -> set:
+        # result of |, &, - is a plain set, not observed
+        return set(iterable)
+
+    def __contains__(self, item: Any) -> bool:
+        return item in self._data
+
+    def __iter__(self) -> Iterator:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return repr(self._data) if self._data else 'set()'
+
+    def _changed(self) -> None:
+        if self._on_change is not None:
+            self._on_change()
+
+    # ----------
+    # adding an existing item / discarding a missing one is not a change
+    def add(self, item: Any) -> None:
+        if item not in self._data:
+            self._data.add(item)
+            self._changed()
+
+    def discard(self, item: Any) -> None:
+        if item in self._data:
+            self._data.discard(item)
+            self._changed()
+
+    def clear(self) -> None:
+        if self._data:
+            self._data.clear()
+            self._changed()
+
+    # ----------
+    # rest of the set API:  reads go to the plain set (results are plain sets),
+    # writes notify once, and only if the content changed
+    def copy(self) -> set:
+        return set(self._data)
+
+    def union(self, *others: Iterable) -> set:
+        return self._data.union(*others)
+
+    def intersection(self, *others: Iterable) -> set:
+        return self._data.intersection(*others)
+
+    def difference(self, *others: Iterable) -> set:
+        return self._data.difference(*others)
+
+    def symmetric_difference(self, other: Iterable) -> set:
+        return self._data.symmetric_difference(other)
+
+    def issubset(self, other: Iterable) -> bool:
+        return self._data.issubset(other)
+
+    def issuperset(self, other: Iterable) -> bool:
+        return self._data.issuperset(other)
+
+    def isdisjoint(self, other: Iterable) -> bool:
+        return self._data.isdisjoint(other)
+
+    # these only add or only remove:  a change is a change of size
+    def update(self, *others: Iterable) -> None:
+        size = len(self._data)
+        self._data.update(*others)
+        if len(self._data) != size:
+            self._changed()
+
+    def intersection_update(self, *others: Iterable) -> None:
+        size = len(self._data)
+        self._data.intersection_update(*others)
+        if len(self._data) != size:
+            self._changed()
+
+    def difference_update(self, *others: Iterable) -> None:
+        size = len(self._data)
+        self._data.difference_update(*others)
+        if len(self._data) != size:
+            self._changed()
+
+    def symmetric_difference_update(self, other: Iterable) -> None:
+        other = set(other)
+        if other:
+            self._data.symmetric_difference_update(other)
+            self._changed()
+
+    def __ior__(self, other: Iterable) -> 'ObservedSet':
+        self.update(other)
+        return self
+
+    def __iand__(self, other: Iterable) -> 'ObservedSet':
+        self.intersection_update(other)
+        return self
+
+    def __isub__(self, other: Iterable) -> 'ObservedSet':
+        self.difference_update(other)
+        return self
+
+    def __ixor__(self, other: Iterable) -> 'ObservedSet':
+        self.symmetric_difference_update(other)
+        return self
+
+    # deepcopy gives an unobserved copy, the new owner attaches itself
+    def __deepcopy__(self, memo: dict) -> 'ObservedSet':
+        return ObservedSet(deepcopy(self._data, memo))
+
+
+# ------------------------------------------------------------------------------
+# Recipe with cached get_ingredient_names()
+#   - cache is dropped when an ingredient set changes in place, when a set / broth
+#     is reassigned, or by make_vegetarian()
+#   - repeated calls return the cached frozenset:  O(1)
+#   - NOTE: returns a frozenset, 01_dataclass.py returns a set. the cached value
+#     is handed to every caller, so it must not be mutable. it still == the
+#     same set, use set(recipe.get_ingredient_names()) for a mutable copy.
+# ------------------------------------------------------------------------------
+
+INGREDIENT_FIELDS = frozenset({'aromatics', 'vegetables', 'meats', 'starches', 'garnishes'})
+
+
+@dataclass(eq=True)
+class Recipe:
+    aromatics: set[Ingredient]
+    broth: Broth
+    vegetables: set[Ingredient]
+    meats: set[Ingredient]
+    starches: set[Ingredient]
+    garnishes: set[Ingredient]
+    time_to_cook: datetime.timedelta
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in INGREDIENT_FIELDS:
+            value = ObservedSet(value, self._invalidate_names)
+            self._invalidate_names()
+        elif name == 'broth':
+            self._invalidate_names()
+        object.__setattr__(self, name, value)
+
+    def _invalidate_names(self) -> None:
+        object.__setattr__(self, '_ingredient_names', None)
+
+    # __setattr__ wraps the copied sets with the new recipe as observer
+    #   (a shallow copy gets its own sets too:  sharing an ObservedSet would
+    #   notify only the original recipe)
+    def __copy__(self) -> 'Recipe':
+        return Recipe(**{name: getattr(self, name) for name in self.__dataclass_fields__})
+
+    def __deepcopy__(self, memo: dict) -> 'Recipe':
+        return Recipe(**{name: deepcopy(getattr(self, name), memo)
+                         for name in self.__dataclass_fields__})
+
+    def make_vegetarian(self):
+        self.meats.clear()
+        self.broth = Broth.VEGETABLE
+
+    # frozenset, not set:  see above
+    def get_ingredient_names(self) -> frozenset[str]:
+        names = getattr(self, '_ingredient_names', None)
+        if names is None:
+            ingredients = (self.aromatics |
+                           self.vegetables |
+                           self.meats |
+                           self.starches |
+                           self.garnishes)
+
+            names = frozenset({i.name for i in ingredients} |
+                              {self.broth.name.capitalize() + " Broth"})
+            object.__setattr__(self, '_ingredient_names', names)
+        return names
+
+
+# ----------
+pepper = Ingredient("Pepper", 1, ImperialMeasure.TABLESPOON)
+garlic = Ingredient("Garlic", 2, ImperialMeasure.TEASPOON)
+carrots = Ingredient("Carrots", .25, ImperialMeasure.CUP)
+celery = Ingredient("Celery", .25, ImperialMeasure.CUP)
+onions = Ingredient("Onions", .25, ImperialMeasure.CUP)
+parsley = Ingredient("Parsley", 2, ImperialMeasure.TABLESPOON)
+noodles = Ingredient("Noodles", 1.5, ImperialMeasure.CUP)
+chicken = Ingredient("Chicken", 1.5, ImperialMeasure.CUP)
+
+chicken_noodle_soup = Recipe(
+    aromatics={pepper, garlic},
+    broth=Broth.CHICKEN,
+    vegetables={celery, onions, carrots},
+    meats={chicken},
+    starches={noodles},
+    garnishes={parsley},
+    time_to_cook=datetime.timedelta(minutes=60))
+
+
+# ----------
+names = chicken_noodle_soup.get_ingredient_names()
+
+assert names == {'Garlic', 'Pepper', 'Carrots', 'Celery', 'Onions', 'Noodles', 'Parsley', 'Chicken', 'Chicken Broth'}
+
+# cached:  same object
+assert chicken_noodle_soup.get_ingredient_names() is names
+
+# adding an ingredient already there is not a change
+chicken_noodle_soup.aromatics.add(pepper)
+assert chicken_noodle_soup.get_ingredient_names() is names
+
+# in-place change drops the cache
+chicken_noodle_soup.aromatics.add(Ingredient("Thyme", 1, ImperialMeasure.TEASPOON))
+assert 'Thyme' in chicken_noodle_soup.get_ingredient_names()
+
+
+# ----------
+noodle_soup = deepcopy(chicken_noodle_soup)
+noodle_soup.make_vegetarian()
+
+assert noodle_soup.get_ingredient_names() == {'Garlic', 'Pepper', 'Thyme', 'Carrots', 'Celery', 'Onions', 'Noodles', 'Parsley', 'Vegetable Broth'}
+
+# the original is not touched
+assert 'Chicken Broth' in chicken_noodle_soup.get_ingredient_names()
+
+assert chicken_noodle_soup != noodle_soup
+
+# shallow copy:  own sets and cache, the original is not touched
+soup_copy = copy(chicken_noodle_soup)
+soup_copy.meats.clear()
+assert 'Chicken' not in soup_copy.get_ingredient_names()
+assert 'Chicken' in chicken_noodle_soup.get_ingredient_names()
+
+
+# ----------
+# reassignment of a set also drops the cache
+noodle_soup.garnishes = {pepper}
+assert noodle_soup.garnishes == {pepper}
+noodle_soup.garnishes.add(chicken)
+assert 'Chicken' in noodle_soup.get_ingredient_names()
+
+# the assigned set is not copied
+garnishes = {parsley}
+noodle_soup.garnishes = garnishes
+noodle_soup.garnishes.add(pepper)
+assert garnishes == {parsley, pepper}
+
+
+# ----------
+# the rest of the set API drops the cache too
+names = noodle_soup.get_ingredient_names()
+noodle_soup.garnishes.update([parsley])
+assert noodle_soup.get_ingredient_names() is names
+
+dill = Ingredient("Dill", 1, ImperialMeasure.TEASPOON)
+chives = Ingredient("Chives", 1, ImperialMeasure.TEASPOON)
+noodle_soup.garnishes.update({dill}, [chives])
+assert {'Dill', 'Chives'} <= noodle_soup.get_ingredient_names()
+noodle_soup.garnishes -= {dill}
+assert 'Dill' not in noodle_soup.get_ingredient_names()
+noodle_soup.garnishes.intersection_update({parsley})
+assert 'Chives' not in noodle_soup.get_ingredient_names()
+noodle_soup.garnishes ^= {dill}
+assert 'Dill' in noodle_soup.get_ingredient_names()
+noodle_soup.garnishes.remove(dill)
+assert 'Dill' not in noodle_soup.get_ingredient_names()
+
+assert noodle_soup.garnishes.copy() == noodle_soup.garnishes and type(noodle_soup.garnishes.copy()) is set
+assert noodle_soup.meats.union({chicken}) == {chicken} and noodle_soup.meats.issubset({chicken})
+
+
+# ------------------------------------------------------------------------------
+# benchmark:  menu rendering calls get_ingredient_names() on every request
+# ------------------------------------------------------------------------------
+
+@dataclass(eq=True)
+class PlainRecipe:
+    aromatics: set[Ingredient]
+    broth: Broth
+    vegetables: set[Ingredient]
+    meats: set[Ingredient]
+    starches: set[Ingredient]
+    garnishes: set[Ingredient]
+    time_to_cook: datetime.timedelta
+
+    def get_ingredient_names(self):
+        ingredients = (self.aromatics |
+                       self.vegetables |
+                       self.meats |
+                       self.starches |
+                       self.garnishes)
+
+        return ({i.name for i in ingredients} |
+                {self.broth.name.capitalize() + " Broth"})
+
+
+def benchmark(number: int = 100_000) -> None:
+    plain = PlainRecipe(aromatics={pepper, garlic}, broth=Broth.CHICKEN,
+                        vegetables={celery, onions, carrots}, meats={chicken},
+                        starches={noodles}, garnishes={parsley},
+                        time_to_cook=datetime.timedelta(minutes=60))
+    uncached = timeit.timeit(plain.get_ingredient_names, number=number)
+    cached = timeit.timeit(chicken_noodle_soup.get_ingredient_names, number=number)
+    print(f'set union every call {uncached / number * 1e9:>8.0f} ns/call')
+    print(f'cached               {cached / number * 1e9:>8.0f} ns/call')
+
+
+benchmark()
@@ -0,0 +1,434 @@
+
+import datetime
+import pickle
+import time
+
+from collections.abc import Iterable, Iterator, MutableSet
+from copy import copy, deepcopy
+from dataclasses import dataclass
+from enum import auto, Enum
+from typing import Any, Callable, Optional
+
+
+# ------------------------------------------------------------------------------
+# same as 01_dataclass.py
+# ------------------------------------------------------------------------------
+
+class ImperialMeasure(Enum):
+    TEASPOON = auto()
+    TABLESPOON = auto()
+    CUP = auto()
+
+
+class Broth(Enum):
+    VEGETABLE = auto()
+    CHICKEN = auto()
+    BEEF = auto()
+    FISH = auto()
+
+
+@dataclass(frozen=True)
+class Ingredient:
+    name: str
+    amount: float = 1
+    units: ImperialMeasure = ImperialMeasure.CUP
+
+
+# ------------------------------------------------------------------------------
+# observed Recipe (as in 05_dataclass_cached_ingredient_names.py)
+#   in-place change of an ingredient set, reassignment and make_vegetarian()
+#   notify the observers of the recipe (e.g. RecipeIndex)
+#   observers are not copied or pickled:  a copy is a new, unobserved recipe
+# ------------------------------------------------------------------------------
+
+class ObservedSet(MutableSet):
+    __slots__ = ('_data', '_on_change')
+
+    # a set is taken as it is (no copy), like a plain dataclass field:  the caller's
+    # reference sees the recipe's changes. changes made through that reference
+    # are not observed, change the recipe through its own field.
+    def __init__(self, iterable: Iterable = (), on_change: Optional[Callable[[], None]] = None):
+        self._data = iterable if type(iterable) is set else set(iterable)
+        self._on_change = on_change
+
+    @classmethod
+    def _from_iterable(cls, iterable: Iterable) -> set:
+        return set(iterable)
+
+    def __contains__(self, item: Any) -> bool:
+        return item in self._data
+
+    def __iter__(self) -> Iterator:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return repr(self._data) if self._data else 'set()'
+
+    def _changed(self) -> None:
+        if self._on_change is not None:
+            self._on_change()
+
+    def add(self, item: Any) -> None:
+        if item not in self._data:
+            self._data.add(item)
+            self._changed()
+
+    def discard(self, item: Any) -> None:
+        if item in self._data:
+            self._data.discard(item)
+            self._changed()
+
+    def clear(self) -> None:
+        if self._data:
+            self._data.clear()
+            self._changed()
+
+    # ----------
+    # rest of the set API:  reads go to the plain set (results are plain sets),
+    # writes notify once, and only if the content changed
+    def copy(self) -> set:
+        return set(self._data)
+
+    def union(self, *others: Iterable) -> set:
+        return self._data.union(*others)
+
+    def intersection(self, *others: Iterable) -> set:
+        return self._data.intersection(*others)
+
+    def difference(self, *others: Iterable) -> set:
+        return self._data.difference(*others)
+
+    def symmetric_difference(self, other: Iterable) -> set:
+        return self._data.symmetric_difference(other)
+
+    def issubset(self, other: Iterable) -> bool:
+        return self._data.issubset(other)
+
+    def issuperset(self, other: Iterable) -> bool:
+        return self._data.issuperset(other)
+
+    def isdisjoint(self, other: Iterable) -> bool:
+        return self._data.isdisjoint(other)
+
+    # these only add or only remove:  a change is a change of size
+    def update(self, *others: Iterable) -> None:
+        size = len(self._data)
+        self._data.update(*others)
+        if len(self._data) != size:
+            self._changed()
+
+    def intersection_update(self, *others: Iterable) -> None:
+        size = len(self._data)
+        self._data.intersection_update(*others)
+        if len(self._data) != size:
+            self._changed()
+
+    def difference_update(self, *others: Iterable) -> None:
+        size = len(self._data)
+        self._data.difference_update(*others)
+        if len(self._data) != size:
+            self._changed()
+
+    def symmetric_difference_update(self, other: Iterable) -> None:
+        other = set(other)
+        if other:
+            self._data.symmetric_difference_update(other)
+            self._changed()
+
+    def __ior__(self, other: Iterable) -> 'ObservedSet':
+        self.update(other)
+        return self
+
+    def __iand__(self, other: Iterable) -> 'ObservedSet':
+        self.intersection_update(other)
+        return self
+
+    def __isub__(self, other: Iterable) -> 'ObservedSet':
+        self.difference_update(other)
+        return self
+
+    def __ixor__(self, other: Iterable) -> 'ObservedSet':
+        self.symmetric_difference_update(other)
+        return self
+
+    # a copy is not observed:  the recipe that holds it re-wraps it
+    def __deepcopy__(self, memo: dict) -> 'ObservedSet':
+        return ObservedSet(deepcopy(self._data, memo))
+
+
+INGREDIENT_FIELDS = ('aromatics', 'vegetables', 'meats', 'starches', 'garnishes')
+
+
+@dataclass(eq=True)
+class Recipe:
+    aromatics: set[Ingredient]
+    broth: Broth
+    vegetables: set[Ingredient]
+    meats: set[Ingredient]
+    starches: set[Ingredient]
+    garnishes: set[Ingredient]
+    time_to_cook: datetime.timedelta
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in INGREDIENT_FIELDS:
+            value = ObservedSet(value, self._changed)
+        object.__setattr__(self, name, value)
+        if name in INGREDIENT_FIELDS or name == 'broth':
+            self._changed()
+
+    def _changed(self) -> None:
+        for observer in self.__dict__.get('_observers', ()):
+            observer(self)
+
+    def observe(self, observer: Callable[['Recipe'], None]) -> None:
+        self.__dict__.setdefault('_observers', []).append(observer)
+
+    def unobserve(self, observer: Callable[['Recipe'], None]) -> None:
+        self.__dict__.get('_observers', []).remove(observer)
+
+    # __setattr__ wraps the copied sets with the new recipe as observer
+    def __copy__(self) -> 'Recipe':
+        return Recipe(**{name: getattr(self, name) for name in self.__dataclass_fields__})
+
+    def __deepcopy__(self, memo: dict) -> 'Recipe':
+        return Recipe(**{name: deepcopy(getattr(self, name), memo)
+                         for name in self.__dataclass_fields__})
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {name: set(value) if name in INGREDIENT_FIELDS else value
+                for name, value in self.__dict__.items() if name != '_observers'}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def ingredients(self) -> Iterator[Ingredient]:
+        for name in INGREDIENT_FIELDS:
+            yield from getattr(self, name)
+
+    def is_vegetarian(self) -> bool:
+        return not self.meats and self.broth == Broth.VEGETABLE
+
+    def make_vegetarian(self):
+        self.meats.clear()
+        self.broth = Broth.VEGETABLE
+
+
+# ------------------------------------------------------------------------------
+# inverted index:  key -> set of recipe ids
+#   ingredient name / Broth / ImperialMeasure / vegetarian
+#   query() intersects the posting sets, smallest first.
+#   index observes its recipes, a mutation re-indexes only that recipe.
+# ------------------------------------------------------------------------------
+
+class RecipeIndex:
+
+    def __init__(self, recipes: Iterable[Recipe] = ()):
+        self._recipes: dict[int, Recipe] = {}
+        self._keys: dict[int, tuple[frozenset, Broth, frozenset, bool]] = {}
+        self.by_name: dict[str, set[int]] = {}
+        self.by_broth: dict[Broth, set[int]] = {}
+        self.by_units: dict[ImperialMeasure, set[int]] = {}
+        self.vegetarian: set[int] = set()
+        for recipe in recipes:
+            self.add(recipe)
+
+    def __len__(self) -> int:
+        return len(self._recipes)
+
+    def __contains__(self, recipe: Recipe) -> bool:
+        return id(recipe) in self._recipes
+
+    @staticmethod
+    def _keys_of(recipe: Recipe) -> tuple[frozenset, Broth, frozenset, bool]:
+        ingredients = list(recipe.ingredients())
+        return (frozenset(i.name for i in ingredients),
+                recipe.broth,
+                frozenset(i.units for i in ingredients),
+                recipe.is_vegetarian())
+
+    def _post(self, recipe_id: int, keys: tuple[frozenset, Broth, frozenset, bool]) -> None:
+        names, broth, units, vegetarian = keys
+        for name in names:
+            self.by_name.setdefault(name, set()).add(recipe_id)
+        self.by_broth.setdefault(broth, set()).add(recipe_id)
+        for unit in units:
+            self.by_units.setdefault(unit, set()).add(recipe_id)
+        if vegetarian:
+            self.vegetarian.add(recipe_id)
+        self._keys[recipe_id] = keys
+
+    def _unpost(self, recipe_id: int) -> None:
+        names, broth, units, vegetarian = self._keys.pop(recipe_id)
+        for postings, keys in ((self.by_name, names), (self.by_broth, (broth,)), (self.by_units, units)):
+            for key in keys:
+                posting = postings[key]
+                posting.discard(recipe_id)
+                if not posting:
+                    del postings[key]
+        self.vegetarian.discard(recipe_id)
+
+    # ----------
+    def add(self, recipe: Recipe) -> None:
+        recipe_id = id(recipe)
+        if recipe_id in self._recipes:
+            return
+        self._recipes[recipe_id] = recipe
+        self._post(recipe_id, self._keys_of(recipe))
+        recipe.observe(self._reindex)
+
+    def remove(self, recipe: Recipe) -> None:
+        recipe_id = id(recipe)
+        del self._recipes[recipe_id]
+        self._unpost(recipe_id)
+        recipe.unobserve(self._reindex)
+
+    def _reindex(self, recipe: Recipe) -> None:
+        recipe_id = id(recipe)
+        keys = self._keys_of(recipe)
+        if keys != self._keys[recipe_id]:
+            self._unpost(recipe_id)
+            self._post(recipe_id, keys)
+
+    # ----------
+    # all conditions are AND-ed
+    def query(self, names: Iterable[str] = (), broth: Optional[Broth] = None,
+              units: Iterable[ImperialMeasure] = (), vegetarian: Optional[bool] = None) -> list[Recipe]:
+        postings: list[set[int]] = []
+        for name in names:
+            postings.append(self.by_name.get(name, set()))
+        if broth is not None:
+            postings.append(self.by_broth.get(broth, set()))
+        for unit in units:
+            postings.append(self.by_units.get(unit, set()))
+        if vegetarian:
+            postings.append(self.vegetarian)
+
+        if postings:
+            postings.sort(key=len)
+            ids = set(postings[0]).intersection(*postings[1:])
+        else:
+            ids = set(self._recipes)
+        if vegetarian is False:
+            ids -= self.vegetarian
+        return [self._recipes[i] for i in ids]
+
+
+# ----------
+pepper = Ingredient("Pepper", 1, ImperialMeasure.TABLESPOON)
+garlic = Ingredient("Garlic", 2, ImperialMeasure.TEASPOON)
+carrots = Ingredient("Carrots", .25, ImperialMeasure.CUP)
+celery = Ingredient("Celery", .25, ImperialMeasure.CUP)
+onions = Ingredient("Onions", .25, ImperialMeasure.CUP)
+parsley = Ingredient("Parsley", 2, ImperialMeasure.TABLESPOON)
+noodles = Ingredient("Noodles", 1.5, ImperialMeasure.CUP)
+chicken = Ingredient("Chicken", 1.5, ImperialMeasure.CUP)
+
+chicken_noodle_soup = Recipe(
+    aromatics={pepper, garlic},
+    broth=Broth.CHICKEN,
+    vegetables={celery, onions, carrots},
+    meats={chicken},
+    starches={noodles},
+    garnishes={parsley},
+    time_to_cook=datetime.timedelta(minutes=60))
+
+vegetable_soup = Recipe(
+    aromatics={garlic},
+    broth=Broth.VEGETABLE,
+    vegetables={celery, carrots},
+    meats=set(),
+    starches=set(),
+    garnishes={parsley},
+    time_to_cook=datetime.timedelta(minutes=30))
+
+index = RecipeIndex([chicken_noodle_soup, vegetable_soup])
+
+assert len(index.query(names=['Garlic'])) == 2
+assert index.query(broth=Broth.CHICKEN) == [chicken_noodle_soup]
+assert index.query(vegetarian=True) == [vegetable_soup]
+assert index.query(names=['Noodles'], units=[ImperialMeasure.TABLESPOON]) == [chicken_noodle_soup]
+
+
+# ----------
+# mutation is followed by the index
+chicken_noodle_soup.make_vegetarian()
+
+assert index.query(broth=Broth.CHICKEN) == []
+assert index.query(names=['Chicken']) == []
+assert len(index.query(vegetarian=True)) == 2
+
+vegetable_soup.starches.add(noodles)
+assert len(index.query(names=['Noodles'])) == 2
+
+index.remove(vegetable_soup)
+assert index.query(names=['Noodles']) == [chicken_noodle_soup]
+
+# the rest of the set API is followed too
+chicken_noodle_soup.garnishes.update({chicken})
+assert index.query(names=['Chicken']) == [chicken_noodle_soup]
+chicken_noodle_soup.garnishes -= {chicken}
+assert index.query(names=['Chicken']) == []
+
+
+# ----------
+# copies are not in the index, and are not followed by it
+for duplicate in (copy(chicken_noodle_soup), deepcopy(chicken_noodle_soup),
+                  pickle.loads(pickle.dumps(chicken_noodle_soup))):
+    assert duplicate == chicken_noodle_soup
+    assert duplicate not in index
+    assert '_observers' not in duplicate.__dict__
+    duplicate.meats.add(chicken)
+    duplicate.broth = Broth.CHICKEN
+    assert index.query(names=['Chicken']) == []
+    assert not chicken_noodle_soup.meats
+
+
+# ------------------------------------------------------------------------------
+# benchmark:  query latency, linear scan vs RecipeIndex
+#   (1M recipes:  benchmark(1_000_000), needs a few GB of memory)
+# ------------------------------------------------------------------------------
+
+INGREDIENTS = [Ingredient(f'Ingredient {i}', 1, ImperialMeasure((i % 3) + 1)) for i in range(500)]
+
+
+def make_recipe(i: int) -> Recipe:
+    return Recipe(
+        aromatics={INGREDIENTS[i % 500], INGREDIENTS[(i * 7) % 500]},
+        broth=Broth((i % 4) + 1),
+        vegetables={INGREDIENTS[(i * 13) % 500]},
+        meats=set() if i % 4 == 0 else {INGREDIENTS[(i * 31) % 500]},
+        starches=set(),
+        garnishes={INGREDIENTS[(i * 3) % 500]},
+        time_to_cook=datetime.timedelta(minutes=30))
+
+
+def benchmark(n_recipes: int = 100_000) -> None:
+    recipes = [make_recipe(i) for i in range(n_recipes)]
+
+    start = time.perf_counter()
+    index = RecipeIndex(recipes)
+    build = time.perf_counter() - start
+
+    def scan() -> list[Recipe]:
+        return [r for r in recipes
+                if r.broth == Broth.CHICKEN and
+                any(i.name == 'Ingredient 7' for i in r.ingredients())]
+
+    def indexed() -> list[Recipe]:
+        return index.query(names=['Ingredient 7'], broth=Broth.CHICKEN)
+
+    assert {id(r) for r in scan()} == {id(r) for r in indexed()}
+
+    for label, func, number in (('linear scan', scan, 3), ('RecipeIndex', indexed, 1000)):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        print(f'{label:<12} {(time.perf_counter() - start) / number * 1e3:>10.3f} ms/query ({n_recipes:,} recipes)')
+    print(f'index build  {build:>10.3f} s')
+
+
+benchmark()
@@ -0,0 +1,123 @@
+
+import heapq
+import random
+import timeit
+
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Iterable
+
+
+# ------------------------------------------------------------------------------
+# same as 01_dataclass.py:  custom order by dunder methods
+#   every comparison builds two tuples, __le__ / __gt__ may call 2-3 dunders
+# ------------------------------------------------------------------------------
+
+@dataclass(eq=True)
+class NutritionInformationByDunder:
+    calories: int
+    fat: int
+    carbohydrates: int
+
+    def __lt__(self, rhs) -> bool:
+        return ((self.fat, self.carbohydrates, self.calories) <
+                (rhs.fat, rhs.carbohydrates, rhs.calories))
+
+    def __le__(self, rhs) -> bool:
+        return self < rhs or self == rhs
+
+    def __gt__(self, rhs) -> bool:
+        return not self <= rhs
+
+    def __ge__(self, rhs) -> bool:
+        return not self < rhs
+
+
+# ------------------------------------------------------------------------------
+# sort key
+#   _sort_key = attrgetter('fat', 'carbohydrates', 'calories')
+#   -> sorted(rows, key=NutritionInformation.sort_key) builds each key tuple ONCE
+#      (in C) and compares tuples, no dunder call per comparison.
+#   dunders are kept (same order) and each is one tuple comparison.
+# ------------------------------------------------------------------------------
+
+# firstly 'fat', secondly 'carbohydrates' and the third 'calories'
+_sort_key = attrgetter('fat', 'carbohydrates', 'calories')
+
+
+@dataclass(eq=True)
+class NutritionInformation:
+    calories: int
+    fat: int
+    carbohydrates: int
+
+    # attrgetter is not a descriptor:  NutritionInformation.sort_key(row) -> key tuple
+    sort_key = _sort_key
+
+    def __lt__(self, rhs) -> bool:
+        return _sort_key(self) < _sort_key(rhs)
+
+    def __le__(self, rhs) -> bool:
+        return _sort_key(self) <= _sort_key(rhs)
+
+    def __gt__(self, rhs) -> bool:
+        return _sort_key(self) > _sort_key(rhs)
+
+    def __ge__(self, rhs) -> bool:
+        return _sort_key(self) >= _sort_key(rhs)
+
+
+# ----------
+# top-k without full sort:  heap of size k, O(n log k)
+def nsmallest(k: int, rows: Iterable[NutritionInformation]) -> list[NutritionInformation]:
+    return heapq.nsmallest(k, rows, key=NutritionInformation.sort_key)
+
+
+def top_k(k: int, rows: Iterable[NutritionInformation]) -> list[NutritionInformation]:
+    return heapq.nlargest(k, rows, key=NutritionInformation.sort_key)
+
+
+# ----------
+nutritionals = [NutritionInformation(calories=100, fat=1, carbohydrates=3),
+                NutritionInformation(calories=50, fat=6, carbohydrates=4),
+                NutritionInformation(calories=125, fat=12, carbohydrates=3)]
+
+assert sorted(nutritionals, key=NutritionInformation.sort_key) == sorted(nutritionals) == [
+    NutritionInformation(calories=100, fat=1, carbohydrates=3),
+    NutritionInformation(calories=50, fat=6, carbohydrates=4),
+    NutritionInformation(calories=125, fat=12, carbohydrates=3)]
+
+assert NutritionInformation.sort_key(nutritionals[0]) == (1, 3, 100)
+
+assert nsmallest(1, nutritionals) == [NutritionInformation(calories=100, fat=1, carbohydrates=3)]
+assert top_k(1, nutritionals) == [NutritionInformation(calories=125, fat=12, carbohydrates=3)]
+
+# dunders agree with the key
+a, b = nutritionals[0], nutritionals[1]
+assert a < b and a <= b and b > a and b >= a and a <= a and a >= a
+
+
+# ------------------------------------------------------------------------------
+# benchmark:  dunder-based sorted() vs key-based sorted() vs heap top-k
+# ------------------------------------------------------------------------------
+
+def benchmark(n_rows: int = 1_000_000, k: int = 10) -> None:
+    rng = random.Random(0)
+    values = [(rng.randrange(1000), rng.randrange(50), rng.randrange(100)) for _ in range(n_rows)]
+    dunder_rows = [NutritionInformationByDunder(*v) for v in values]
+    rows = [NutritionInformation(*v) for v in values]
+
+    cases = (
+        ('sorted() with dunders', lambda: sorted(dunder_rows)),
+        ('sorted(key=sort_key)', lambda: sorted(rows, key=NutritionInformation.sort_key)),
+        (f'nsmallest({k})', lambda: nsmallest(k, rows)),
+    )
+    for label, func in cases:
+        seconds = timeit.timeit(func, number=1)
+        print(f'{label:<24} {seconds * 1e3:>10.1f} ms ({n_rows:,} rows)')
+
+    assert ([(r.fat, r.carbohydrates, r.calories) for r in sorted(dunder_rows)[:k]] ==
+            [NutritionInformation.sort_key(r) for r in nsmallest(k, rows)])
+
+
+benchmark()
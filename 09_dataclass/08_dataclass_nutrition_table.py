@@ -0,0 +1,177 @@
+
+import random
+import timeit
+
+from collections import namedtuple
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Optional, Union
+
+import numpy as np
+
+
+# ------------------------------------------------------------------------------
+# same as 01_dataclass.py
+# ------------------------------------------------------------------------------
+
+NutritionInformationTuple = namedtuple('NutritionInformationTuple', ['calories', 'fat', 'carbohydrates'])
+
+
+@dataclass(eq=True)
+class NutritionInformation:
+    calories: int
+    fat: int
+    carbohydrates: int
+
+    def __lt__(self, rhs) -> bool:
+        return ((self.fat, self.carbohydrates, self.calories) <
+                (rhs.fat, rhs.carbohydrates, rhs.calories))
+
+    def __le__(self, rhs) -> bool:
+        return self < rhs or self == rhs
+
+    def __gt__(self, rhs) -> bool:
+        return not self <= rhs
+
+    def __ge__(self, rhs) -> bool:
+        return not self < rhs
+
+
+# ------------------------------------------------------------------------------
+# columnar store:  one structured numpy array, one column per field
+#   sum / mean / filter / argsort run in C over whole columns, no Python object
+#   per row. rows are converted to NutritionInformation / namedtuple at the edges.
+# ------------------------------------------------------------------------------
+
+NUTRITION_DTYPE = np.dtype([('calories', np.int64), ('fat', np.int64), ('carbohydrates', np.int64)])
+
+# fat -> carbohydrates -> calories, same as NutritionInformation.__lt__
+NUTRITION_ORDER = ('fat', 'carbohydrates', 'calories')
+
+Row = Union[NutritionInformation, NutritionInformationTuple, tuple]
+
+# dataclasses.astuple() deep-copies every field recursively:  a plain attrgetter does not
+_row_values = attrgetter(*NUTRITION_DTYPE.names)
+
+
+class NutritionTable:
+
+    def __init__(self, data: Optional[np.ndarray] = None):
+        self.data = np.empty(0, dtype=NUTRITION_DTYPE) if data is None else data
+        if self.data.dtype != NUTRITION_DTYPE:
+            raise TypeError(f'expected dtype {NUTRITION_DTYPE}, got {self.data.dtype}')
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Row]) -> 'NutritionTable':
+        return cls(np.fromiter((_row_values(r) if isinstance(r, NutritionInformation) else tuple(r)
+                                for r in rows), dtype=NUTRITION_DTYPE))
+
+    @classmethod
+    def from_columns(cls, calories: Iterable[int], fat: Iterable[int], carbohydrates: Iterable[int]) -> 'NutritionTable':
+        calories, fat, carbohydrates = (np.asarray(c) for c in (calories, fat, carbohydrates))
+        data = np.empty(len(calories), dtype=NUTRITION_DTYPE)
+        data['calories'], data['fat'], data['carbohydrates'] = calories, fat, carbohydrates
+        return cls(data)
+
+    # ----------
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, key: Union[int, slice, np.ndarray]) -> Union[NutritionInformation, 'NutritionTable']:
+        if isinstance(key, (int, np.integer)):
+            return NutritionInformation(*self.data[key].tolist())
+        return NutritionTable(self.data[key])
+
+    def __iter__(self) -> Iterator[NutritionInformation]:
+        return (NutritionInformation(*row) for row in self.data.tolist())
+
+    def __eq__(self, rhs) -> bool:
+        return isinstance(rhs, NutritionTable) and np.array_equal(self.data, rhs.data)
+
+    def __repr__(self) -> str:
+        return f'NutritionTable({len(self)} rows)'
+
+    def column(self, name: str) -> np.ndarray:
+        return self.data[name]
+
+    # ----------
+    # to the dataclass / namedtuple forms
+    def to_dataclasses(self) -> list[NutritionInformation]:
+        return list(self)
+
+    def to_namedtuples(self) -> list[NutritionInformationTuple]:
+        return [NutritionInformationTuple(*row) for row in self.data.tolist()]
+
+    # ----------
+    # aggregates
+    def sum(self) -> NutritionInformationTuple:
+        return NutritionInformationTuple(*(int(self.data[name].sum()) for name in NUTRITION_DTYPE.names))
+
+    def mean(self) -> NutritionInformationTuple:
+        return NutritionInformationTuple(*(float(self.data[name].mean()) for name in NUTRITION_DTYPE.names))
+
+    # ----------
+    # filter by boolean mask, e.g. table.filter(table.column('fat') < 10)
+    def filter(self, mask: np.ndarray) -> 'NutritionTable':
+        return NutritionTable(self.data[mask])
+
+    # keys in priority order, default is the order of NutritionInformation
+    def argsort(self, keys: Iterable[str] = NUTRITION_ORDER) -> np.ndarray:
+        # lexsort sorts by the LAST key first
+        return np.lexsort([self.data[name] for name in reversed(tuple(keys))])
+
+    def sorted(self, keys: Iterable[str] = NUTRITION_ORDER) -> 'NutritionTable':
+        return NutritionTable(self.data[self.argsort(keys)])
+
+
+# ----------
+nutritionals = [NutritionInformation(calories=100, fat=1, carbohydrates=3),
+                NutritionInformation(calories=50, fat=6, carbohydrates=4),
+                NutritionInformation(calories=125, fat=12, carbohydrates=3)]
+
+table = NutritionTable.from_rows(nutritionals)
+
+assert len(table) == 3
+assert table[1] == NutritionInformation(calories=50, fat=6, carbohydrates=4)
+assert table.to_dataclasses() == nutritionals
+assert table.to_namedtuples()[0] == NutritionInformationTuple(calories=100, fat=1, carbohydrates=3)
+
+# namedtuple in, same table
+assert NutritionTable.from_rows(table.to_namedtuples()) == table
+
+assert table.sum() == (275, 19, 10)
+assert table.mean().fat == 19 / 3
+
+assert table.filter(table.column('calories') >= 100).to_dataclasses() == [nutritionals[0], nutritionals[2]]
+
+# same order as sorted() with NutritionInformation dunders
+assert table.sorted().to_dataclasses() == sorted(nutritionals)
+assert table.sorted(keys=['calories']).column('calories').tolist() == [50, 100, 125]
+
+
+# ------------------------------------------------------------------------------
+# benchmark:  list of dataclasses vs NutritionTable
+# ------------------------------------------------------------------------------
+
+def benchmark(n_rows: int = 1_000_000) -> None:
+    rng = random.Random(0)
+    rows = [NutritionInformation(rng.randrange(1000), rng.randrange(50), rng.randrange(100)) for _ in range(n_rows)]
+    table = NutritionTable.from_rows(rows)
+
+    cases = (
+        ('sum', lambda: sum(r.calories for r in rows), lambda: table.sum()),
+        ('mean', lambda: sum(r.fat for r in rows) / len(rows), lambda: table.mean()),
+        ('filter', lambda: [r for r in rows if r.fat < 10], lambda: table.filter(table.column('fat') < 10)),
+        ('sort', lambda: sorted(rows), lambda: table.argsort()),
+    )
+    print(f"{'':<8} {'list':>12} {'NutritionTable':>16}   ({n_rows:,} rows)")
+    for label, loop, columnar in cases:
+        t_loop = timeit.timeit(loop, number=1)
+        t_columnar = timeit.timeit(columnar, number=1)
+        print(f'{label:<8} {t_loop * 1e3:>9.1f} ms {t_columnar * 1e3:>13.1f} ms')
+
+    assert table.sorted()[:10].to_dataclasses() == sorted(rows)[:10]
+
+
+benchmark()
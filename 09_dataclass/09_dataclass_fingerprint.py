@@ -0,0 +1,372 @@
+
+import datetime
+import hashlib
+import time
+
+from collections.abc import Iterable, Iterator, MutableSet
+from copy import copy, deepcopy
+from dataclasses import dataclass
+from enum import auto, Enum
+from typing import Any, Callable, Optional
+
+
+# ------------------------------------------------------------------------------
+# same as 01_dataclass.py
+# ------------------------------------------------------------------------------
+
+class ImperialMeasure(Enum):
+    TEASPOON = auto()
+    TABLESPOON = auto()
+    CUP = auto()
+
+
+class Broth(Enum):
+    VEGETABLE = auto()
+    CHICKEN = auto()
+    BEEF = auto()
+    FISH = auto()
+
+
+@dataclass(frozen=True)
+class Ingredient:
+    name: str
+    amount: float = 1
+    units: ImperialMeasure = ImperialMeasure.CUP
+
+
+# ------------------------------------------------------------------------------
+# observed set (as in 05_dataclass_cached_ingredient_names.py)
+# ------------------------------------------------------------------------------
+
+class ObservedSet(MutableSet):
+    __slots__ = ('_data', '_on_change')
+
+    # a set is taken as it is (no copy), like a plain dataclass field:  the caller's
+    # reference sees the recipe's changes. changes made through that reference
+    # are not observed, change the recipe through its own field.
+    def __init__(self, iterable: Iterable = (), on_change: Optional[Callable[[], None]] = None):
+        self._data = iterable if type(iterable) is set else set(iterable)
+        self._on_change = on_change
+
+    @classmethod
+    def _from_iterable(cls, iterable: Iterable) -> set:
+        return set(iterable)
+
+    def __contains__(self, item: Any) -> bool:
+        return item in self._data
+
+    def __iter__(self) -> Iterator:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return repr(self._data) if self._data else 'set()'
+
+    def _changed(self) -> None:
+        if self._on_change is not None:
+            self._on_change()
+
+    def add(self, item: Any) -> None:
+        if item not in self._data:
+            self._data.add(item)
+            self._changed()
+
+    def discard(self, item: Any) -> None:
+        if item in self._data:
+            self._data.discard(item)
+            self._changed()
+
+    def clear(self) -> None:
+        if self._data:
+            self._data.clear()
+            self._changed()
+
+    # ----------
+    # rest of the set API:  reads go to the plain set (results are plain sets),
+    # writes notify once, and only if the content changed
+    def copy(self) -> set:
+        return set(self._data)
+
+    def union(self, *others: Iterable) -> set:
+        return self._data.union(*others)
+
+    def intersection(self, *others: Iterable) -> set:
+        return self._data.intersection(*others)
+
+    def difference(self, *others: Iterable) -> set:
+        return self._data.difference(*others)
+
+    def symmetric_difference(self, other: Iterable) -> set:
+        return self._data.symmetric_difference(other)
+
+    def issubset(self, other: Iterable) -> bool:
+        return self._data.issubset(other)
+
+    def issuperset(self, other: Iterable) -> bool:
+        return self._data.issuperset(other)
+
+    def isdisjoint(self, other: Iterable) -> bool:
+        return self._data.isdisjoint(other)
+
+    # these only add or only remove:  a change is a change of size
+    def update(self, *others: Iterable) -> None:
+        size = len(self._data)
+        self._data.update(*others)
+        if len(self._data) != size:
+            self._changed()
+
+    def intersection_update(self, *others: Iterable) -> None:
+        size = len(self._data)
+        self._data.intersection_update(*others)
+        if len(self._data) != size:
+            self._changed()
+
+    def difference_update(self, *others: Iterable) -> None:
+        size = len(self._data)
+        self._data.difference_update(*others)
+        if len(self._data) != size:
+            self._changed()
+
+    def symmetric_difference_update(self, other: Iterable) -> None:
+        other = set(other)
+        if other:
+            self._data.symmetric_difference_update(other)
+            self._changed()
+
+    def __ior__(self, other: Iterable) -> 'ObservedSet':
+        self.update(other)
+        return self
+
+    def __iand__(self, other: Iterable) -> 'ObservedSet':
+        self.intersection_update(other)
+        return self
+
+    def __isub__(self, other: Iterable) -> 'ObservedSet':
+        self.difference_update(other)
+        return self
+
+    def __ixor__(self, other: Iterable) -> 'ObservedSet':
+        self.symmetric_difference_update(other)
+        return self
+
+    # a copy is not observed:  the recipe that holds it re-wraps it
+    def __deepcopy__(self, memo: dict) -> 'ObservedSet':
+        return ObservedSet(deepcopy(self._data, memo))
+
+
+# ------------------------------------------------------------------------------
+# content fingerprint
+#   blake2b (not hash()) over a canonical encoding:  the same on every process,
+#   PYTHONHASHSEED does not matter, so workers can shard by it.
+#   each ingredient set is encoded as the SORTED digests of its ingredients
+#   -> independent of the set iteration order.
+#   cached on the recipe, dropped on mutation (like get_ingredient_names()).
+# ------------------------------------------------------------------------------
+
+INGREDIENT_FIELDS = ('aromatics', 'vegetables', 'meats', 'starches', 'garnishes')
+
+FINGERPRINT_SIZE = 16
+
+
+def ingredient_digest(ingredient: Ingredient) -> bytes:
+    # amount as float:  2 == 2.0 (equal ingredients), so the digests must be equal too.
+    # repr() of a float is exact and the same on every platform
+    text = f'{ingredient.name}\x1f{float(ingredient.amount)!r}\x1f{ingredient.units.name}'
+    return hashlib.blake2b(text.encode(), digest_size=FINGERPRINT_SIZE).digest()
+
+
+@dataclass(eq=True)
+class Recipe:
+    aromatics: set[Ingredient]
+    broth: Broth
+    vegetables: set[Ingredient]
+    meats: set[Ingredient]
+    starches: set[Ingredient]
+    garnishes: set[Ingredient]
+    time_to_cook: datetime.timedelta
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in INGREDIENT_FIELDS:
+            value = ObservedSet(value, self._invalidate_fingerprint)
+            self._invalidate_fingerprint()
+        elif name in ('broth', 'time_to_cook'):
+            self._invalidate_fingerprint()
+        object.__setattr__(self, name, value)
+
+    def _invalidate_fingerprint(self) -> None:
+        object.__setattr__(self, '_fingerprint', None)
+
+    # __setattr__ wraps the copied sets with the new recipe as observer
+    #   (a shallow copy gets its own sets too:  a shared ObservedSet would drop
+    #   only the fingerprint of the original)
+    def __copy__(self) -> 'Recipe':
+        return Recipe(**{name: getattr(self, name) for name in self.__dataclass_fields__})
+
+    def __deepcopy__(self, memo: dict) -> 'Recipe':
+        return Recipe(**{name: deepcopy(getattr(self, name), memo)
+                         for name in self.__dataclass_fields__})
+
+    def make_vegetarian(self):
+        self.meats.clear()
+        self.broth = Broth.VEGETABLE
+
+    def fingerprint(self) -> bytes:
+        fingerprint = getattr(self, '_fingerprint', None)
+        if fingerprint is None:
+            h = hashlib.blake2b(digest_size=FINGERPRINT_SIZE)
+            for name in INGREDIENT_FIELDS:
+                digests = sorted(ingredient_digest(i) for i in getattr(self, name))
+                h.update(f'{name}:{len(digests)}:'.encode())
+                h.update(b''.join(digests))
+            h.update(f'broth:{self.broth.name}:time_to_cook:{self.time_to_cook // datetime.timedelta(microseconds=1)}'.encode())
+            fingerprint = h.digest()
+            object.__setattr__(self, '_fingerprint', fingerprint)
+        return fingerprint
+
+    def shard(self, n_shards: int) -> int:
+        return int.from_bytes(self.fingerprint()[:8], 'big') % n_shards
+
+
+# ----------
+# bulk dedup:  one hash-table pass, first recipe of each fingerprint is kept
+def dedup(recipes: Iterable[Recipe]) -> list[Recipe]:
+    seen: dict[bytes, Recipe] = {}
+    for recipe in recipes:
+        seen.setdefault(recipe.fingerprint(), recipe)
+    return list(seen.values())
+
+
+# ----------
+pepper = Ingredient("Pepper", 1, ImperialMeasure.TABLESPOON)
+garlic = Ingredient("Garlic", 2, ImperialMeasure.TEASPOON)
+carrots = Ingredient("Carrots", .25, ImperialMeasure.CUP)
+celery = Ingredient("Celery", .25, ImperialMeasure.CUP)
+onions = Ingredient("Onions", .25, ImperialMeasure.CUP)
+parsley = Ingredient("Parsley", 2, ImperialMeasure.TABLESPOON)
+noodles = Ingredient("Noodles", 1.5, ImperialMeasure.CUP)
+chicken = Ingredient("Chicken", 1.5, ImperialMeasure.CUP)
+
+
+def make_chicken_noodle_soup() -> Recipe:
+    return Recipe(
+        aromatics={pepper, garlic},
+        broth=Broth.CHICKEN,
+        vegetables={celery, onions, carrots},
+        meats={chicken},
+        starches={noodles},
+        garnishes={parsley},
+        time_to_cook=datetime.timedelta(minutes=60))
+
+
+chicken_noodle_soup = make_chicken_noodle_soup()
+fingerprint = chicken_noodle_soup.fingerprint()
+
+# equal recipes, equal fingerprints (set order does not matter)
+same_soup = make_chicken_noodle_soup()
+same_soup.vegetables = [carrots, onions, celery]
+assert same_soup == chicken_noodle_soup
+assert same_soup.fingerprint() == fingerprint
+
+# reproducible across processes:  no hash() involved
+assert fingerprint.hex() == '544c666ec1247feace2ea9c010ac775a'
+
+# cached
+assert chicken_noodle_soup.fingerprint() is fingerprint
+
+# same ingredient in another set is another recipe
+moved = make_chicken_noodle_soup()
+moved.aromatics.discard(pepper)
+moved.garnishes.add(pepper)
+assert moved.fingerprint() != fingerprint
+
+
+# ----------
+# mutation drops the cache
+noodle_soup = make_chicken_noodle_soup()
+noodle_soup.make_vegetarian()
+assert noodle_soup.fingerprint() != fingerprint
+
+noodle_soup.meats.add(chicken)
+noodle_soup.broth = Broth.CHICKEN
+assert noodle_soup.fingerprint() == fingerprint
+
+# the rest of the set API drops the cache too
+noodle_soup.garnishes.update({chicken})
+assert noodle_soup.fingerprint() != fingerprint
+noodle_soup.garnishes.difference_update({chicken})
+assert noodle_soup.fingerprint() == fingerprint
+
+noodle_soup.time_to_cook = datetime.timedelta(minutes=45)
+assert noodle_soup.fingerprint() != fingerprint
+
+assert dedup([chicken_noodle_soup, noodle_soup, same_soup]) == [chicken_noodle_soup, noodle_soup]
+assert 0 <= chicken_noodle_soup.shard(8) < 8
+
+# copies:  own sets, own fingerprint cache
+for duplicate in (copy(chicken_noodle_soup), deepcopy(chicken_noodle_soup)):
+    assert duplicate.fingerprint() == fingerprint
+    duplicate.meats.clear()
+    assert duplicate.fingerprint() != fingerprint
+    assert chicken_noodle_soup.fingerprint() == fingerprint
+    assert dedup([chicken_noodle_soup, duplicate]) == [chicken_noodle_soup, duplicate]
+
+
+# ----------
+# int and float amounts:  equal ingredients, equal fingerprints
+float_garlic = Ingredient("Garlic", 2.0, ImperialMeasure.TEASPOON)
+assert float_garlic == garlic and ingredient_digest(float_garlic) == ingredient_digest(garlic)
+
+float_soup = make_chicken_noodle_soup()
+float_soup.aromatics = {pepper, float_garlic}
+assert float_soup == chicken_noodle_soup
+assert float_soup.fingerprint() == fingerprint
+assert dedup([chicken_noodle_soup, float_soup]) == [chicken_noodle_soup]
+
+
+# ------------------------------------------------------------------------------
+# benchmark:  dedup of a catalog with duplicates
+#   pairwise Recipe.__eq__ (O(n^2))  vs  fingerprint hash table (O(n))
+# ------------------------------------------------------------------------------
+
+INGREDIENTS = [Ingredient(f'Ingredient {i}', 1, ImperialMeasure((i % 3) + 1)) for i in range(500)]
+
+
+def make_recipe(i: int) -> Recipe:
+    return Recipe(
+        aromatics={INGREDIENTS[i % 500], INGREDIENTS[(i * 7) % 500]},
+        broth=Broth((i % 4) + 1),
+        vegetables={INGREDIENTS[(i * 13) % 500]},
+        meats=set() if i % 4 == 0 else {INGREDIENTS[(i * 31) % 500]},
+        starches=set(),
+        garnishes={INGREDIENTS[(i * 3) % 500]},
+        time_to_cook=datetime.timedelta(minutes=30))
+
+
+def dedup_pairwise(recipes: list[Recipe]) -> list[Recipe]:
+    unique: list[Recipe] = []
+    for recipe in recipes:
+        if not any(recipe == u for u in unique):
+            unique.append(recipe)
+    return unique
+
+
+def benchmark(n_recipes: int = 4_000) -> None:
+    # every recipe twice
+    recipes = [make_recipe(i % (n_recipes // 2)) for i in range(n_recipes)]
+
+    start = time.perf_counter()
+    pairwise = dedup_pairwise(recipes)
+    t_pairwise = time.perf_counter() - start
+
+    start = time.perf_counter()
+    hashed = dedup(recipes)
+    t_hashed = time.perf_counter() - start
+
+    assert [id(r) for r in pairwise] == [id(r) for r in hashed]
+    print(f'pairwise __eq__  {t_pairwise * 1e3:>10.1f} ms ({n_recipes:,} recipes)')
+    print(f'fingerprint      {t_hashed * 1e3:>10.1f} ms ({n_recipes:,} recipes)')
+
+
+benchmark()
@@ -0,0 +1,286 @@
+
+import datetime
+import hashlib
+import random
+import time
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from enum import auto, Enum
+from typing import Optional
+
+from copy import deepcopy
+
+import numpy as np
+
+
+# ------------------------------------------------------------------------------
+# same as 01_dataclass.py
+# ------------------------------------------------------------------------------
+
+class ImperialMeasure(Enum):
+    TEASPOON = auto()
+    TABLESPOON = auto()
+    CUP = auto()
+
+
+class Broth(Enum):
+    VEGETABLE = auto()
+    CHICKEN = auto()
+    BEEF = auto()
+    FISH = auto()
+
+
+@dataclass(frozen=True)
+class Ingredient:
+    name: str
+    amount: float = 1
+    units: ImperialMeasure = ImperialMeasure.CUP
+
+
+@dataclass(eq=True)
+class Recipe:
+    aromatics: set[Ingredient]
+    broth: Broth
+    vegetables: set[Ingredient]
+    meats: set[Ingredient]
+    starches: set[Ingredient]
+    garnishes: set[Ingredient]
+    time_to_cook: datetime.timedelta
+
+    def make_vegetarian(self):
+        self.meats.clear()
+        self.broth = Broth.VEGETABLE
+
+    def get_ingredient_names(self):
+        ingredients = (self.aromatics |
+                       self.vegetables |
+                       self.meats |
+                       self.starches |
+                       self.garnishes)
+
+        return ({i.name for i in ingredients} |
+                {self.broth.name.capitalize() + " Broth"})
+
+
+def jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+# ------------------------------------------------------------------------------
+# MinHash signature
+#   num_perm hash functions h_i(x) = (a_i * x + b_i) mod p,  signature[i] = min h_i
+#   P(signature[i] of A == signature[i] of B) == jaccard(A, B)
+#   names are hashed by blake2b (stable across processes), the min is taken by numpy.
+# ------------------------------------------------------------------------------
+
+MERSENNE_PRIME = (1 << 31) - 1
+
+
+class MinHasher:
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self._name_hashes: dict[str, int] = {}
+
+    def _hash_name(self, name: str) -> int:
+        h = self._name_hashes.get(name)
+        if h is None:
+            digest = hashlib.blake2b(name.encode(), digest_size=8).digest()
+            h = self._name_hashes[name] = int.from_bytes(digest, 'big') % MERSENNE_PRIME
+        return h
+
+    def signature(self, names: Iterable[str]) -> np.ndarray:
+        x = np.fromiter((self._hash_name(n) for n in names), dtype=np.uint64)
+        if not len(x):
+            return np.full(self.num_perm, MERSENNE_PRIME, dtype=np.uint64)
+        # (a * x + b) < 2**62:  no uint64 overflow
+        return ((np.outer(x, self._a) + self._b) % MERSENNE_PRIME).min(axis=0)
+
+
+# ------------------------------------------------------------------------------
+# LSH index
+#   signature is cut into `bands` bands of `rows` rows, a recipe is a candidate
+#   if ANY band is equal:  P(candidate) = 1 - (1 - s ** rows) ** bands
+#   (bands, rows) minimizes the weighted false positive / false negative area
+#   around the threshold. candidates are verified by the exact Jaccard of the
+#   ingredient names, so a false positive only costs time -> false negatives
+#   weigh more.
+# ------------------------------------------------------------------------------
+
+def lsh_params(threshold: float, num_perm: int, false_negative_weight: float = 0.9) -> tuple[int, int]:
+    below = np.linspace(0, threshold, 100)
+    above = np.linspace(threshold, 1, 100)
+
+    def error(bands: int, rows: int) -> float:
+        false_positive = np.trapezoid(1 - (1 - below ** rows) ** bands, below)
+        false_negative = np.trapezoid((1 - above ** rows) ** bands, above)
+        return (1 - false_negative_weight) * false_positive + false_negative_weight * false_negative
+
+    pairs = [(bands, rows) for bands in range(1, num_perm + 1) for rows in range(1, num_perm // bands + 1)]
+    return min(pairs, key=lambda p: error(*p))
+
+
+class RecipeSimilarityIndex:
+
+    def __init__(self, threshold: float = 0.6, num_perm: int = 128, seed: int = 1):
+        if not 0 < threshold <= 1:
+            raise ValueError(f'threshold must be in (0, 1], got {threshold}')
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm, seed)
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        self._buckets: list[dict[bytes, list[int]]] = [{} for _ in range(self.bands)]
+        self._recipes: dict[int, tuple[Recipe, frozenset[str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._recipes)
+
+    def __contains__(self, recipe: Recipe) -> bool:
+        return id(recipe) in self._recipes
+
+    def _band_keys(self, names: Iterable[str]) -> list[bytes]:
+        signature = self.hasher.signature(names)
+        return [band.tobytes() for band in signature[:self.bands * self.rows].reshape(self.bands, self.rows)]
+
+    # ----------
+    # incremental:  no rebuild on insert
+    def add(self, recipe: Recipe) -> None:
+        recipe_id = id(recipe)
+        if recipe_id in self._recipes:
+            return
+        names = frozenset(recipe.get_ingredient_names())
+        self._recipes[recipe_id] = (recipe, names)
+        for buckets, key in zip(self._buckets, self._band_keys(names)):
+            buckets.setdefault(key, []).append(recipe_id)
+
+    def query(self, recipe: Recipe, threshold: Optional[float] = None) -> list[tuple[Recipe, float]]:
+        # similar recipes (not `recipe` itself), most similar first.
+        # a threshold far below the index threshold may miss recipes (no LSH candidate)
+        threshold = self.threshold if threshold is None else threshold
+        names = frozenset(recipe.get_ingredient_names())
+        candidates: set[int] = set()
+        for buckets, key in zip(self._buckets, self._band_keys(names)):
+            candidates.update(buckets.get(key, ()))
+        candidates.discard(id(recipe))
+
+        similar = []
+        for recipe_id in candidates:
+            other, other_names = self._recipes[recipe_id]
+            similarity = jaccard(names, other_names)
+            if similarity >= threshold:
+                similar.append((other, similarity))
+        similar.sort(key=lambda p: p[1], reverse=True)
+        return similar
+
+
+# ----------
+pepper = Ingredient("Pepper", 1, ImperialMeasure.TABLESPOON)
+garlic = Ingredient("Garlic", 2, ImperialMeasure.TEASPOON)
+carrots = Ingredient("Carrots", .25, ImperialMeasure.CUP)
+celery = Ingredient("Celery", .25, ImperialMeasure.CUP)
+onions = Ingredient("Onions", .25, ImperialMeasure.CUP)
+parsley = Ingredient("Parsley", 2, ImperialMeasure.TABLESPOON)
+noodles = Ingredient("Noodles", 1.5, ImperialMeasure.CUP)
+chicken = Ingredient("Chicken", 1.5, ImperialMeasure.CUP)
+beef = Ingredient("Beef", 1, ImperialMeasure.CUP)
+rice = Ingredient("Rice", 1, ImperialMeasure.CUP)
+cilantro = Ingredient("Cilantro", 1, ImperialMeasure.TABLESPOON)
+
+chicken_noodle_soup = Recipe(
+    aromatics={pepper, garlic},
+    broth=Broth.CHICKEN,
+    vegetables={celery, onions, carrots},
+    meats={chicken},
+    starches={noodles},
+    garnishes={parsley},
+    time_to_cook=datetime.timedelta(minutes=60))
+
+noodle_soup = deepcopy(chicken_noodle_soup)
+noodle_soup.make_vegetarian()
+
+beef_rice_soup = Recipe(
+    aromatics={onions},
+    broth=Broth.BEEF,
+    vegetables=set(),
+    meats={beef},
+    starches={rice},
+    garnishes={cilantro},
+    time_to_cook=datetime.timedelta(minutes=90))
+
+# 7 shared names of 10
+assert jaccard(chicken_noodle_soup.get_ingredient_names(), noodle_soup.get_ingredient_names()) == 0.7
+
+index = RecipeSimilarityIndex(threshold=0.6)
+for recipe in (chicken_noodle_soup, noodle_soup, beef_rice_soup):
+    index.add(recipe)
+
+assert len(index) == 3
+assert index.query(chicken_noodle_soup) == [(noodle_soup, 0.7)]
+assert index.query(beef_rice_soup) == []
+
+# stricter threshold, same index
+assert index.query(chicken_noodle_soup, threshold=0.8) == []
+
+assert lsh_params(0.6, 128) == (25, 5)
+
+
+# ------------------------------------------------------------------------------
+# benchmark:  query latency as the catalog grows
+#   exact Jaccard against every recipe  vs  LSH candidates + exact verification
+# ------------------------------------------------------------------------------
+
+NAMES = [f'Ingredient {i}' for i in range(2000)]
+
+
+def make_recipe(rng: random.Random) -> Recipe:
+    return Recipe(
+        aromatics={Ingredient(n) for n in rng.sample(NAMES, 3)},
+        broth=rng.choice(list(Broth)),
+        vegetables={Ingredient(n) for n in rng.sample(NAMES, 4)},
+        meats={Ingredient(n) for n in rng.sample(NAMES, 1)},
+        starches={Ingredient(n) for n in rng.sample(NAMES, 1)},
+        garnishes={Ingredient(n) for n in rng.sample(NAMES, 1)},
+        time_to_cook=datetime.timedelta(minutes=30))
+
+
+def benchmark(sizes: tuple[int, ...] = (1_000, 10_000, 100_000), n_queries: int = 100) -> None:
+    rng = random.Random(0)
+    catalog: list[Recipe] = []
+    index = RecipeSimilarityIndex(threshold=0.6)
+    queries = []
+    for _ in range(n_queries):
+        recipe = make_recipe(rng)
+        variant = deepcopy(recipe)
+        variant.make_vegetarian()
+        queries.append(recipe)
+        catalog.append(variant)
+        index.add(variant)
+
+    print(f"{'recipes':>10} {'scan ms/query':>15} {'LSH ms/query':>14} {'insert us':>10}")
+    for size in sizes:
+        new = [make_recipe(rng) for _ in range(size - len(catalog))]
+        start = time.perf_counter()
+        for recipe in new:
+            index.add(recipe)
+        insert = (time.perf_counter() - start) / max(len(new), 1)
+        catalog.extend(new)
+        names = [r.get_ingredient_names() for r in catalog]
+
+        start = time.perf_counter()
+        scanned = [[i for i, n in enumerate(names) if jaccard(q.get_ingredient_names(), n) >= 0.6]
+                   for q in queries[:10]]
+        scan = (time.perf_counter() - start) / 10
+
+        start = time.perf_counter()
+        found = [index.query(q) for q in queries]
+        lsh = (time.perf_counter() - start) / n_queries
+
+        recall = sum(bool(f) for f in found) / n_queries
+        assert all(s for s in scanned)
+        print(f'{size:>10,} {scan * 1e3:>15.3f} {lsh * 1e3:>14.3f} {insert * 1e6:>10.1f}   (recall {recall:.0%})')
+
+
+benchmark()
@@ -0,0 +1,304 @@
+
+import datetime
+import random
+import timeit
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from enum import auto, Enum, IntEnum
+from typing import Union
+
+import numpy as np
+
+
+# ------------------------------------------------------------------------------
+# same as 01_dataclass.py / 08_enum/01_enum.py
+# ------------------------------------------------------------------------------
+
+class ImperialMeasure(Enum):
+    TEASPOON = auto()
+    TABLESPOON = auto()
+    CUP = auto()
+
+
+# value:  fluid ounces
+class ImperialLiquidMeasure(IntEnum):
+    CUP = 8
+    PINT = 16
+    QUART = 32
+    GALLON = 128
+
+
+class Broth(Enum):
+    VEGETABLE = auto()
+    CHICKEN = auto()
+    BEEF = auto()
+    FISH = auto()
+
+
+Unit = Union[ImperialMeasure, ImperialLiquidMeasure]
+
+
+@dataclass(frozen=True)
+class Ingredient:
+    name: str
+    amount: float = 1
+    units: Unit = ImperialMeasure.CUP
+
+
+INGREDIENT_FIELDS = ('aromatics', 'vegetables', 'meats', 'starches', 'garnishes')
+
+
+@dataclass(eq=True)
+class Recipe:
+    aromatics: set[Ingredient]
+    broth: Broth
+    vegetables: set[Ingredient]
+    meats: set[Ingredient]
+    starches: set[Ingredient]
+    garnishes: set[Ingredient]
+    time_to_cook: datetime.timedelta
+
+
+# ------------------------------------------------------------------------------
+# conversion matrix
+#   both enums on one axis, ordinal = position in UNITS.
+#   CONVERSION[i, j]:  1 UNITS[i] is CONVERSION[i, j] UNITS[j]
+#   (ImperialMeasure.CUP and ImperialLiquidMeasure.CUP are both 8 fl oz)
+# ------------------------------------------------------------------------------
+
+UNITS: tuple[Unit, ...] = (*ImperialMeasure, *ImperialLiquidMeasure)
+
+# keyed by (enum, member):  IntEnum members hash / compare as int
+UNIT_ORDINAL: dict[tuple[type, Unit], int] = {(type(u), u): i for i, u in enumerate(UNITS)}
+
+TEASPOONS_PER_FLUID_OUNCE = 6
+
+TEASPOONS = np.array([{ImperialMeasure.TEASPOON: 1,
+                       ImperialMeasure.TABLESPOON: 3,
+                       ImperialMeasure.CUP: 48}[u] if isinstance(u, ImperialMeasure)
+                      else u.value * TEASPOONS_PER_FLUID_OUNCE for u in UNITS], dtype=np.float64)
+
+CONVERSION = TEASPOONS[:, np.newaxis] / TEASPOONS[np.newaxis, :]
+CONVERSION.flags.writeable = False
+
+
+# by id():  Enum.__hash__ is a Python call, id() is not (members are singletons)
+_UNIT_ORDINAL_BY_ID: dict[int, int] = {id(u): i for i, u in enumerate(UNITS)}
+
+
+def ordinal(unit: Unit) -> int:
+    return UNIT_ORDINAL[type(unit), unit]
+
+
+# vectorized:  amounts / from_units / to_units are arrays (or scalars) of ordinals
+def convert(amounts: np.ndarray, from_units: np.ndarray, to_units: Union[np.ndarray, int]) -> np.ndarray:
+    return amounts * CONVERSION[from_units, to_units]
+
+
+# ------------------------------------------------------------------------------
+# ingredient batch:  every ingredient of many recipes as flat columns
+#   amounts (float64), units (ordinal), name (index into `names`) and where it
+#   came from (recipe, field), so scaled / normalized columns can be turned back
+#   into recipes.
+# ------------------------------------------------------------------------------
+
+class IngredientBatch:
+
+    def __init__(self, recipes: Sequence[Recipe], names: list[str], name: np.ndarray, amounts: np.ndarray,
+                 units: np.ndarray, recipe: np.ndarray, field: np.ndarray):
+        self.recipes = recipes
+        self.names = names
+        self.name = name
+        self.amounts = amounts
+        self.units = units
+        self.recipe = recipe
+        self.field = field
+
+    @classmethod
+    def from_recipes(cls, recipes: Sequence[Recipe]) -> 'IngredientBatch':
+        name_codes: dict[str, int] = {}
+        code_of = name_codes.setdefault
+        rows = [(code_of(i.name, len(name_codes)), i.amount, _UNIT_ORDINAL_BY_ID[id(i.units)], r, f)
+                for r, recipe in enumerate(recipes)
+                for f, field in enumerate(INGREDIENT_FIELDS)
+                for i in getattr(recipe, field)]
+        name, amounts, units, recipe, field = zip(*rows) if rows else ((), (), (), (), ())
+        return cls(recipes, list(name_codes),
+                   np.array(name, dtype=np.int64),
+                   np.array(amounts, dtype=np.float64),
+                   np.array(units, dtype=np.int64),
+                   np.array(recipe, dtype=np.int64),
+                   np.array(field, dtype=np.int64))
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    def _with(self, amounts: np.ndarray, units: np.ndarray) -> 'IngredientBatch':
+        return IngredientBatch(self.recipes, self.names, self.name, amounts, units, self.recipe, self.field)
+
+    # ----------
+    # factor:  one for all, or one per recipe
+    def scale(self, factor: Union[float, Sequence[float], np.ndarray]) -> 'IngredientBatch':
+        factor = np.asarray(factor, dtype=np.float64)
+        return self._with(self.amounts * (factor if factor.ndim == 0 else factor[self.recipe]), self.units)
+
+    def normalize(self, units: Unit = ImperialMeasure.CUP) -> 'IngredientBatch':
+        target = ordinal(units)
+        return self._with(convert(self.amounts, self.units, target), np.full_like(self.units, target))
+
+    # ----------
+    # rows that would be EQUAL Ingredients in one set are summed:  after normalize()
+    # "Salt 3 TEASPOON" and "Salt 1 TABLESPOON" are both "Salt 3 TEASPOON", the set
+    # would keep one, so they become "Salt 6 TEASPOON". other rows are kept as they are.
+    # merge=True:  also sum rows of the same name and unit with different amounts
+    # ("Salt 1 TEASPOON" + "Salt 2 TEASPOON" -> "Salt 3 TEASPOON").
+    #   numpy:  one int key per row (+ amount), np.unique + np.bincount
+    def to_recipes(self, merge: bool = False) -> list[Recipe]:
+        n_units, n_fields = len(UNITS), len(INGREDIENT_FIELDS)
+        keys = ((self.recipe * n_fields + self.field) * len(self.names) + self.name) * n_units + self.units
+        if not merge:
+            rows = np.empty(len(keys), dtype=[('key', np.int64), ('amount', np.float64)])
+            rows['key'], rows['amount'] = keys, self.amounts
+            keys = rows
+        keys, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        amounts = np.bincount(inverse, weights=self.amounts, minlength=len(keys))
+
+        sets = [[set() for _ in INGREDIENT_FIELDS] for _ in self.recipes]
+        names = self.names
+        for amount, name, unit, r, f in zip(amounts.tolist(), self.name[first].tolist(), self.units[first].tolist(),
+                                            self.recipe[first].tolist(), self.field[first].tolist()):
+            sets[r][f].add(Ingredient(names[name], amount, UNITS[unit]))
+        return [Recipe(**dict(zip(INGREDIENT_FIELDS, s)), broth=recipe.broth, time_to_cook=recipe.time_to_cook)
+                for recipe, s in zip(self.recipes, sets)]
+
+
+# ----------
+def scale(recipes: Sequence[Recipe], factor: Union[float, Sequence[float], np.ndarray]) -> list[Recipe]:
+    return IngredientBatch.from_recipes(recipes).scale(factor).to_recipes()
+
+
+def normalize(recipes: Sequence[Recipe], units: Unit = ImperialMeasure.CUP, merge: bool = False) -> list[Recipe]:
+    return IngredientBatch.from_recipes(recipes).normalize(units).to_recipes(merge)
+
+
+# ----------
+assert CONVERSION[ordinal(ImperialMeasure.CUP), ordinal(ImperialMeasure.TABLESPOON)] == 16
+assert CONVERSION[ordinal(ImperialMeasure.TABLESPOON), ordinal(ImperialMeasure.TEASPOON)] == 3
+assert CONVERSION[ordinal(ImperialLiquidMeasure.GALLON), ordinal(ImperialLiquidMeasure.CUP)] == 16
+assert CONVERSION[ordinal(ImperialMeasure.CUP), ordinal(ImperialLiquidMeasure.CUP)] == 1
+assert ordinal(ImperialMeasure.CUP) != ordinal(ImperialLiquidMeasure.CUP)
+
+pepper = Ingredient("Pepper", 1, ImperialMeasure.TABLESPOON)
+garlic = Ingredient("Garlic", 2, ImperialMeasure.TEASPOON)
+carrots = Ingredient("Carrots", .25, ImperialMeasure.CUP)
+noodles = Ingredient("Noodles", 1.5, ImperialMeasure.CUP)
+chicken = Ingredient("Chicken", 1.5, ImperialMeasure.CUP)
+stock = Ingredient("Stock", 1, ImperialLiquidMeasure.QUART)
+
+chicken_noodle_soup = Recipe(
+    aromatics={pepper, garlic},
+    broth=Broth.CHICKEN,
+    vegetables={carrots, stock},
+    meats={chicken},
+    starches={noodles},
+    garnishes=set(),
+    time_to_cook=datetime.timedelta(minutes=60))
+
+# x40 for production
+batch, = scale([chicken_noodle_soup], 40)
+assert batch.meats == {Ingredient("Chicken", 60, ImperialMeasure.CUP)}
+assert batch.aromatics == {Ingredient("Pepper", 40, ImperialMeasure.TABLESPOON),
+                           Ingredient("Garlic", 80, ImperialMeasure.TEASPOON)}
+assert batch.broth == Broth.CHICKEN
+
+# everything in gallons
+in_gallons, = normalize([batch], units=ImperialLiquidMeasure.GALLON)
+assert in_gallons.vegetables == {Ingredient("Carrots", 10 / 16, ImperialLiquidMeasure.GALLON),
+                                 Ingredient("Stock", 10, ImperialLiquidMeasure.GALLON)}
+
+# per-recipe factor
+one, two = scale([chicken_noodle_soup, chicken_noodle_soup], [1, 2])
+assert one == chicken_noodle_soup
+assert two.starches == {Ingredient("Noodles", 3, ImperialMeasure.CUP)}
+
+# same ingredient in two units, equal after normalize():  merged, no quantity lost
+salted = Recipe(aromatics={Ingredient("Salt", 3, ImperialMeasure.TEASPOON),
+                           Ingredient("Salt", 1, ImperialMeasure.TABLESPOON)},
+                broth=Broth.VEGETABLE, vegetables=set(), meats=set(), starches=set(), garnishes=set(),
+                time_to_cook=datetime.timedelta(minutes=10))
+in_teaspoons, = normalize([salted], units=ImperialMeasure.TEASPOON)
+assert in_teaspoons.aromatics == {Ingredient("Salt", 6, ImperialMeasure.TEASPOON)}
+
+# different amounts are kept apart, unless merge=True
+salted.aromatics = {Ingredient("Salt", 1, ImperialMeasure.TEASPOON), Ingredient("Salt", 2, ImperialMeasure.TEASPOON)}
+assert scale([salted], 2)[0].aromatics == {Ingredient("Salt", 2, ImperialMeasure.TEASPOON),
+                                           Ingredient("Salt", 4, ImperialMeasure.TEASPOON)}
+assert normalize([salted], ImperialMeasure.TEASPOON)[0].aromatics == salted.aromatics
+assert normalize([salted], ImperialMeasure.TEASPOON, merge=True)[0].aromatics == {Ingredient("Salt", 3, ImperialMeasure.TEASPOON)}
+
+
+# ------------------------------------------------------------------------------
+# benchmark:  scale x40 and normalize to cups, 20k recipes (200k ingredients)
+#   public API (Recipe in, Recipe out):  per-ingredient Python loop  vs
+#   IngredientBatch (from_recipes / numpy / to_recipes), and the numpy part alone
+#   (both sum same-name rows per field:  to_recipes(merge=True))
+#   Recipe in / Recipe out, IngredientBatch is no faster than the loop:  both
+#   build one Ingredient per row, the batch also flattens the recipes first.
+#   the numpy part alone is ~500x faster:  keep recipes as a batch between steps and
+#   convert at the edges only once.
+# ------------------------------------------------------------------------------
+
+TO_TEASPOONS = {(type(u), u): float(t) for u, t in zip(UNITS, TEASPOONS)}
+
+
+def scale_and_normalize_loop(recipes: Sequence[Recipe], factor: float, units: Unit) -> list[Recipe]:
+    target = TO_TEASPOONS[type(units), units]
+    scaled = []
+    for recipe in recipes:
+        fields = {}
+        for name in INGREDIENT_FIELDS:
+            merged: dict[str, float] = {}
+            for i in getattr(recipe, name):
+                merged[i.name] = merged.get(i.name, 0) + i.amount * factor * TO_TEASPOONS[type(i.units), i.units] / target
+            fields[name] = {Ingredient(n, a, units) for n, a in merged.items()}
+        scaled.append(Recipe(**fields, broth=recipe.broth, time_to_cook=recipe.time_to_cook))
+    return scaled
+
+
+def benchmark(n_recipes: int = 20_000) -> None:
+    rng = random.Random(0)
+
+    def ingredients(n: int) -> set[Ingredient]:
+        return {Ingredient(f'Ingredient {rng.randrange(500)}', rng.randrange(1, 16) / 4, rng.choice(UNITS))
+                for _ in range(n)}
+
+    recipes = [Recipe(aromatics=ingredients(2), broth=Broth.CHICKEN, vegetables=ingredients(3),
+                      meats=ingredients(2), starches=ingredients(1), garnishes=ingredients(2),
+                      time_to_cook=datetime.timedelta(minutes=30))
+               for _ in range(n_recipes)]
+    cup = ImperialMeasure.CUP
+
+    def vectorized() -> list[Recipe]:
+        return IngredientBatch.from_recipes(recipes).scale(40).normalize(cup).to_recipes(merge=True)
+
+    batch = IngredientBatch.from_recipes(recipes)
+    n_ingredients = len(batch)
+
+    expected = scale_and_normalize_loop(recipes, 40, cup)
+    for got, want in zip(vectorized(), expected):
+        for name in INGREDIENT_FIELDS:
+            got_amounts = {i.name: i.amount for i in getattr(got, name)}
+            want_amounts = {i.name: i.amount for i in getattr(want, name)}
+            assert got_amounts.keys() == want_amounts.keys()
+            assert np.allclose([got_amounts[n] for n in want_amounts], list(want_amounts.values()))
+
+    cases = (('python loop', lambda: scale_and_normalize_loop(recipes, 40, cup)),
+             ('IngredientBatch', vectorized),
+             ('  numpy part only', lambda: batch.scale(40).normalize(cup)))
+    for label, func in cases:
+        seconds = min(timeit.repeat(func, number=1, repeat=3))
+        print(f'{label:<18} {seconds * 1e3:>10.1f} ms ({n_recipes:,} recipes, {n_ingredients:,} ingredients)')
+
+
+benchmark()
@@ -0,0 +1,184 @@
+
+import os
+import tempfile
+import tracemalloc
+import yaml
+from typing import Iterator, Literal, Optional, Union
+
+from pydantic.dataclasses import dataclass
+
+
+# ----------
+fpath_restaurant = '14_pydantic_runtime_check/restaurant.yaml'
+fpath_restaurant_missing = '14_pydantic_runtime_check/missing.yaml'
+
+
+# ------------------------------------------------------------------------------
+# same models as 01_pydantic_runtime_check.py (pydantic.dataclasses.dataclass)
+# ------------------------------------------------------------------------------
+
+@dataclass
+class AccountAndRoutingNumber:
+    account_number: str
+    routing_number: str
+
+
+@dataclass
+class BankDetails:
+    bank_details: AccountAndRoutingNumber
+
+
+@dataclass
+class Address:
+    address: str
+
+
+AddressOrBankDetails = Union[Address, BankDetails]
+
+
+Position = Literal['Chef', 'Sous Chef', 'Host',
+                   'Server', 'Delivery Driver']
+
+
+@dataclass
+class Dish:
+    name: str
+    price_in_cents: int
+    description: str
+    picture: Optional[str] = None
+
+
+@dataclass
+class Employee:
+    name: str
+    position: Position
+    payment_details: AddressOrBankDetails
+
+
+@dataclass
+class Restaurant:
+    name: str
+    owner: str
+    address: str
+    employees: list[Employee]
+    dishes: list[Dish]
+    number_of_seats: int
+    to_go: bool
+    delivery: bool
+
+
+# ------------------------------------------------------------------------------
+# load_restaurant():  whole file is parsed and then whole tree is validated.
+# peak memory = parsed tree + validated tree
+# ------------------------------------------------------------------------------
+
+def load_restaurant(filename: str) -> Restaurant:
+    with open(filename) as yaml_file:
+        data = yaml.safe_load(yaml_file)
+        return Restaurant(**data)
+
+
+# ------------------------------------------------------------------------------
+# streaming loader
+#   - feed is multi-document YAML (one restaurant per '---' document)
+#   - yaml.safe_load_all() composes only one document at a time
+#   - each document is validated and yielded, then dropped
+#   -> memory is bounded by one record
+# ------------------------------------------------------------------------------
+
+def iter_restaurants(filename: str) -> Iterator[Restaurant]:
+    with open(filename) as yaml_file:
+        for data in yaml.safe_load_all(yaml_file):
+            # empty document (e.g. trailing '---') is skipped
+            if data is None:
+                continue
+            yield Restaurant(**data)
+
+
+# ----------
+# single-document file is also one record
+restaurants = list(iter_restaurants(fpath_restaurant))
+
+assert len(restaurants) == 1
+assert restaurants[0] == load_restaurant(fpath_restaurant)
+
+
+# ----------
+# ValidationError is raised at the bad document, records before it are already yielded
+# (dish of Caprese Salad does not have description)
+try:
+    for restaurant in iter_restaurants(fpath_restaurant_missing):
+        pass
+    assert False
+except ValueError as e:
+    pass
+
+
+# ------------------------------------------------------------------------------
+# benchmark:  peak memory against file size
+#   eager:  list of all validated restaurants (what load_restaurant() does, per file)
+#   stream: iter_restaurants(), one record alive at a time
+# peak is measured by tracemalloc (python heap of this process)
+# ------------------------------------------------------------------------------
+
+def make_restaurant(i: int, n_employees: int = 50, n_dishes: int = 50) -> dict:
+    return {
+        'name': f'Restaurant {i}',
+        'owner': 'Pat Viafore',
+        'address': '123 Fake St. Fakington, FA 01234',
+        'employees': [{'name': f'Employee {j}',
+                       'position': 'Chef' if j % 2 else 'Server',
+                       'payment_details': {'bank_details': {
+                           'routing_number': '123456789',
+                           'account_number': '123456789012'}}}
+                      for j in range(n_employees)],
+        'dishes': [{'name': f'Dish {j}',
+                    'price_in_cents': 100 + j,
+                    'description': 'Spaghetti with a rich Tomato and Beef Sauce'}
+                   for j in range(n_dishes)],
+        'number_of_seats': 12,
+        'to_go': True,
+        'delivery': False,
+    }
+
+
+def write_feed(filename: str, n_restaurants: int) -> None:
+    with open(filename, 'w') as yaml_file:
+        yaml.safe_dump_all((make_restaurant(i) for i in range(n_restaurants)),
+                           yaml_file, explicit_start=True)
+
+
+def load_all_eager(filename: str) -> list[Restaurant]:
+    with open(filename) as yaml_file:
+        return [Restaurant(**data) for data in yaml.safe_load_all(yaml_file)]
+
+
+def consume_stream(filename: str) -> int:
+    count = 0
+    for _ in iter_restaurants(filename):
+        count += 1
+    return count
+
+
+def measure_peak(func, filename: str) -> float:
+    tracemalloc.start()
+    func(filename)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2**20
+
+
+def benchmark(sizes: tuple[int, ...] = (4, 8, 16)) -> None:
+    print(f"{'restaurants':>11} {'file MiB':>9} {'eager MiB':>10} {'stream MiB':>11}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for n_restaurants in sizes:
+            filename = os.path.join(tmpdir, f'feed_{n_restaurants}.yaml')
+            write_feed(filename, n_restaurants)
+            file_mib = os.path.getsize(filename) / 2**20
+            eager_mib = measure_peak(load_all_eager, filename)
+            stream_mib = measure_peak(consume_stream, filename)
+            print(f'{n_restaurants:>11} {file_mib:>9.1f} {eager_mib:>10.1f} {stream_mib:>11.1f}')
+
+
+# eager peak grows with file size, stream peak stays flat (one record)
+benchmark()
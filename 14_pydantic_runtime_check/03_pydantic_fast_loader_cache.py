@@ -0,0 +1,175 @@
+
+import hashlib
+import os
+import timeit
+import yaml
+from typing import Literal, Optional, Union
+
+from pydantic.dataclasses import dataclass
+
+
+# ----------
+fpath_restaurant = '14_pydantic_runtime_check/restaurant.yaml'
+fpath_restaurant_missing = '14_pydantic_runtime_check/missing.yaml'
+fpath_restaurant_wrongtype = '14_pydantic_runtime_check/wrong_type.yaml'
+
+
+# ------------------------------------------------------------------------------
+# same models as 01_pydantic_runtime_check.py (pydantic.dataclasses.dataclass)
+# ------------------------------------------------------------------------------
+
+@dataclass
+class AccountAndRoutingNumber:
+    account_number: str
+    routing_number: str
+
+
+@dataclass
+class BankDetails:
+    bank_details: AccountAndRoutingNumber
+
+
+@dataclass
+class Address:
+    address: str
+
+
+AddressOrBankDetails = Union[Address, BankDetails]
+
+
+Position = Literal['Chef', 'Sous Chef', 'Host',
+                   'Server', 'Delivery Driver']
+
+
+@dataclass
+class Dish:
+    name: str
+    price_in_cents: int
+    description: str
+    picture: Optional[str] = None
+
+
+@dataclass
+class Employee:
+    name: str
+    position: Position
+    payment_details: AddressOrBankDetails
+
+
+@dataclass
+class Restaurant:
+    name: str
+    owner: str
+    address: str
+    employees: list[Employee]
+    dishes: list[Dish]
+    number_of_seats: int
+    to_go: bool
+    delivery: bool
+
+
+# ------------------------------------------------------------------------------
+# libyaml C loader
+#   yaml.CSafeLoader exists only when PyYAML is built with libyaml.
+#   if not, fall back to pure-python yaml.SafeLoader (same result, slower)
+# ------------------------------------------------------------------------------
+
+try:
+    from yaml import CSafeLoader as FastSafeLoader
+except ImportError:
+    from yaml import SafeLoader as FastSafeLoader
+
+
+# use_libyaml=False is same as yaml.safe_load()
+def load_restaurant(filename: str, use_libyaml: bool = True) -> Restaurant:
+    loader = FastSafeLoader if use_libyaml else yaml.SafeLoader
+    with open(filename) as yaml_file:
+        data = yaml.load(yaml_file, Loader=loader)
+        return Restaurant(**data)
+
+
+# both loaders give same Restaurant
+assert load_restaurant(fpath_restaurant) == load_restaurant(fpath_restaurant, use_libyaml=False)
+
+
+# ------------------------------------------------------------------------------
+# parsed-file cache
+#   key = path + (mtime, size) from os.stat():  no read at all on hit
+#   key = path + sha256 of content:  read but no parse, survives touch / same-second edits
+#   value = already validated Restaurant
+#
+# NOTE: the cached Restaurant is shared between callers, do not mutate it
+# ------------------------------------------------------------------------------
+
+CacheKey = Literal['stat', 'hash']
+
+_restaurant_cache: dict[str, tuple[object, Restaurant]] = {}
+
+
+def _file_signature(filename: str, key: CacheKey) -> object:
+    if key == 'stat':
+        stat = os.stat(filename)
+        return (stat.st_mtime_ns, stat.st_size)
+    with open(filename, 'rb') as yaml_file:
+        return hashlib.sha256(yaml_file.read()).hexdigest()
+
+
+def load_restaurant_cached(filename: str, key: CacheKey = 'stat') -> Restaurant:
+    path = os.path.abspath(filename)
+    signature = _file_signature(path, key)
+    cached = _restaurant_cache.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    # invalid file raises ValidationError here and is not cached
+    restaurant = load_restaurant(path)
+    _restaurant_cache[path] = (signature, restaurant)
+    return restaurant
+
+
+def clear_restaurant_cache() -> None:
+    _restaurant_cache.clear()
+
+
+# ----------
+restaurant = load_restaurant_cached(fpath_restaurant)
+
+# same object, not parsed again
+assert load_restaurant_cached(fpath_restaurant) is restaurant
+
+
+# ----------
+# missing.yaml and wrong_type.yaml still raise every time
+for fpath in (fpath_restaurant_missing, fpath_restaurant_wrongtype):
+    try:
+        load_restaurant_cached(fpath)
+        assert False
+    except ValueError as e:
+        pass
+
+
+# ----------
+# content hash key
+clear_restaurant_cache()
+restaurant = load_restaurant_cached(fpath_restaurant, key='hash')
+assert load_restaurant_cached(fpath_restaurant, key='hash') is restaurant
+
+
+# ------------------------------------------------------------------------------
+# benchmark:  config-reload loop on the same file
+# ------------------------------------------------------------------------------
+
+def benchmark(number: int = 200) -> None:
+    cases = {
+        'yaml.safe_load (pure python)': lambda: load_restaurant(fpath_restaurant, use_libyaml=False),
+        f'{FastSafeLoader.__name__}': lambda: load_restaurant(fpath_restaurant),
+        'cache (stat key)': lambda: load_restaurant_cached(fpath_restaurant, key='stat'),
+        'cache (hash key)': lambda: load_restaurant_cached(fpath_restaurant, key='hash'),
+    }
+    for label, func in cases.items():
+        clear_restaurant_cache()
+        seconds = timeit.timeit(func, number=number)
+        print(f'{label:<30} {seconds / number * 1e6:>10.1f} us/load')
+
+
+benchmark()
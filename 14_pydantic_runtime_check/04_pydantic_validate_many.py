@@ -0,0 +1,201 @@
+
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass as std_dataclass
+from itertools import islice
+from typing import Any, Iterable, Iterator, Literal, Optional, Union
+
+from pydantic import ValidationError
+from pydantic.dataclasses import dataclass
+
+
+# ------------------------------------------------------------------------------
+# same models as 01_pydantic_runtime_check.py (pydantic.dataclasses.dataclass)
+# ------------------------------------------------------------------------------
+
+@dataclass
+class AccountAndRoutingNumber:
+    account_number: str
+    routing_number: str
+
+
+@dataclass
+class BankDetails:
+    bank_details: AccountAndRoutingNumber
+
+
+@dataclass
+class Address:
+    address: str
+
+
+AddressOrBankDetails = Union[Address, BankDetails]
+
+
+Position = Literal['Chef', 'Sous Chef', 'Host',
+                   'Server', 'Delivery Driver']
+
+
+@dataclass
+class Dish:
+    name: str
+    price_in_cents: int
+    description: str
+    picture: Optional[str] = None
+
+
+@dataclass
+class Employee:
+    name: str
+    position: Position
+    payment_details: AddressOrBankDetails
+
+
+@dataclass
+class Restaurant:
+    name: str
+    owner: str
+    address: str
+    employees: list[Employee]
+    dishes: list[Dish]
+    number_of_seats: int
+    to_go: bool
+    delivery: bool
+
+
+# ------------------------------------------------------------------------------
+# validate_many()
+#   - does not stop at the first failure
+#   - valid models and per-record errors are returned together
+#   - errors are kept as ValidationError.errors() (plain list of dict),
+#     so they can be sent back from worker processes
+# ------------------------------------------------------------------------------
+
+@std_dataclass
+class RecordError:
+    index: int
+    errors: list[dict[str, Any]]
+
+
+@std_dataclass
+class ValidationResult:
+    valid: list[Restaurant]
+    errors: list[RecordError]
+
+
+def _validate_chunk(start: int, records: list[dict]) -> ValidationResult:
+    valid: list[Restaurant] = []
+    errors: list[RecordError] = []
+    for index, record in enumerate(records, start):
+        try:
+            valid.append(Restaurant(**record))
+        except ValidationError as e:
+            errors.append(RecordError(index, e.errors()))
+        except TypeError as e:
+            # unexpected / missing keyword for Restaurant(**record)
+            errors.append(RecordError(index, [{'loc': ('__root__',),
+                                               'msg': str(e),
+                                               'type': 'type_error'}]))
+    return ValidationResult(valid, errors)
+
+
+def _chunks(records: Iterable[dict], chunk_size: int) -> Iterator[tuple[int, list[dict]]]:
+    iterator = iter(records)
+    start = 0
+    while chunk := list(islice(iterator, chunk_size)):
+        yield start, chunk
+        start += len(chunk)
+
+
+# workers=None or 1:  validate in this process
+# workers>1:  chunks are spread over a process pool, results are kept in input order.
+#   at most 2 * workers chunks are in flight (a sliding window):  records are read
+#   lazily and memory does not grow with the input, workers are never idle.
+def validate_many(records: Iterable[dict],
+                  workers: Optional[int] = None,
+                  chunk_size: int = 1000) -> ValidationResult:
+    result = ValidationResult([], [])
+    if workers is None or workers <= 1:
+        for start, chunk in _chunks(records, chunk_size):
+            chunk_result = _validate_chunk(start, chunk)
+            result.valid.extend(chunk_result.valid)
+            result.errors.extend(chunk_result.errors)
+        return result
+
+    def collect(future: Future) -> None:
+        chunk_result = future.result()
+        result.valid.extend(chunk_result.valid)
+        result.errors.extend(chunk_result.errors)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight: deque[Future] = deque()
+        for start, chunk in _chunks(records, chunk_size):
+            if len(in_flight) >= 2 * workers:
+                # oldest first:  keeps input order
+                collect(in_flight.popleft())
+            in_flight.append(executor.submit(_validate_chunk, start, chunk))
+        while in_flight:
+            collect(in_flight.popleft())
+    return result
+
+
+# ----------
+def make_restaurant(i: int) -> dict:
+    restaurant = {
+        'name': f'Restaurant {i}',
+        'owner': 'Pat Viafore',
+        'address': '123 Fake St. Fakington, FA 01234',
+        'employees': [{'name': 'Pat Viafore', 'position': 'Chef',
+                       'payment_details': {'bank_details': {
+                           'routing_number': '123456789',
+                           'account_number': '123456789012'}}},
+                      {'name': 'Made-up McGee', 'position': 'Server',
+                       'payment_details': {'address': '123 Fake St.'}}],
+        'dishes': [{'name': 'Pasta Bolognese', 'price_in_cents': 1495,
+                    'description': 'Spaghetti with a rich Tomato and Beef Sauce'},
+                   {'name': 'Caprese Salad', 'price_in_cents': 795,
+                    'description': 'Tomato, Buffalo Mozzarella, and Basil',
+                    'picture': 'caprese.png'}],
+        'number_of_seats': 12,
+        'to_go': True,
+        'delivery': False,
+    }
+    # every 100th record is broken (same as missing.yaml:  dish without description)
+    if i % 100 == 0:
+        del restaurant['dishes'][1]['description']
+    return restaurant
+
+
+records = [make_restaurant(i) for i in range(300)]
+
+result = validate_many(records)
+
+assert len(result.valid) == 297
+assert [e.index for e in result.errors] == [0, 100, 200]
+assert result.errors[0].errors[0]['loc'] == ('dishes', 1)
+
+
+# ------------------------------------------------------------------------------
+# benchmark:  throughput for 1 core vs N cores on 100k synthetic restaurants
+# (guarded, because process pool may re-import this script with 'spawn')
+# ------------------------------------------------------------------------------
+
+def benchmark(n_records: int = 100_000) -> None:
+    records = [make_restaurant(i) for i in range(n_records)]
+    n_cores = os.cpu_count() or 1
+    for workers in sorted({1, 2, n_cores}):
+        start = time.perf_counter()
+        result = validate_many(records, workers=workers, chunk_size=5000)
+        elapsed = time.perf_counter() - start
+        assert len(result.valid) + len(result.errors) == n_records
+        print(f'workers={workers:<3} {elapsed:>7.2f} s  {n_records / elapsed:>10,.0f} records/s')
+
+
+if __name__ == '__main__':
+    # process pool:  same result as in this process, from a generator
+    parallel = validate_many((make_restaurant(i) for i in range(300)), workers=2, chunk_size=7)
+    assert parallel == result
+
+    benchmark()
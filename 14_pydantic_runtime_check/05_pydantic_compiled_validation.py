@@ -0,0 +1,361 @@
+
+import re
+import timeit
+from typing import Any, Callable, Literal, Optional, Union, get_args, get_origin, get_type_hints
+
+from pydantic import conlist, constr, PositiveInt, ValidationError
+from pydantic import validator
+from pydantic.class_validators import make_generic_validator
+from pydantic.dataclasses import dataclass
+from pydantic.types import ConstrainedInt, ConstrainedList, ConstrainedStr
+
+
+# ------------------------------------------------------------------------------
+# constrained models (same as 01_pydantic_runtime_check.py, @validator section)
+# ------------------------------------------------------------------------------
+
+@dataclass
+class AccountAndRoutingNumber:
+    account_number: constr(min_length=9, max_length=9)
+    routing_number: constr(min_length=8, max_length=12)
+
+
+@dataclass
+class BankDetails:
+    bank_details: AccountAndRoutingNumber
+
+
+@dataclass
+class Address:
+    address: constr(min_length=1)
+
+
+AddressOrBankDetails = Union[Address, BankDetails]
+
+
+Position = Literal['Chef', 'Sous Chef', 'Host',
+                   'Server', 'Delivery Driver']
+
+
+@dataclass
+class Employee:
+    name: str
+    position: Position
+    payment_details: AddressOrBankDetails
+
+
+@dataclass
+class Dish:
+    name: constr(min_length=1, max_length=16)
+    price_in_cents: PositiveInt
+    description: constr(min_length=1, max_length=80)
+    picture: Optional[str] = None
+
+
+@dataclass
+class Restaurant:
+    name: constr(regex=r'^[a-zA-Z0-9 ]*$',
+                 min_length=1, max_length=16)
+    owner: constr(min_length=1)
+    address: constr(min_length=1)
+    employees: conlist(Employee, min_items=2)
+    dishes: conlist(Dish, min_items=3)
+    number_of_seats: PositiveInt
+    to_go: bool
+    delivery: bool
+
+    @validator('employees')
+    def check_chef_and_server(cls, employees):
+        if (any(e for e in employees if e.position == 'Chef') and
+            any(e for e in employees if e.position == 'Server')):
+                return employees
+        raise ValueError('Must have at least one chef and one server')
+
+
+# ------------------------------------------------------------------------------
+# compiled validation plan
+#   - the constraints of a class are read once and turned into python source of
+#     ONE function per class (regex compiled once, length / positivity inlined)
+#   - the function only accepts exact types (str, int, bool, dict for nested class).
+#     anything else (coercion like "123" -> 123, or any failure) returns _MISS
+#     and the stock pydantic constructor is called instead.
+#     -> same result and same ValidationError as the stock path
+#   - fields the compiler does not understand are validated by pydantic's
+#     ModelField.validate() inside the plan
+# ------------------------------------------------------------------------------
+
+_MISS = object()
+
+
+class _Unsupported(Exception):
+    pass
+
+
+def _is_pydantic_dataclass(tp: Any) -> bool:
+    return isinstance(tp, type) and hasattr(tp, '__pydantic_model__')
+
+
+class _PlanCompiler:
+
+    def __init__(self, cls: type):
+        self.cls = cls
+        self.namespace: dict[str, Any] = {'_MISS': _MISS, '_new': object.__new__, '_cls': cls}
+        self.counter = 0
+
+    def _name(self, prefix: str, value: Any) -> str:
+        self.counter += 1
+        name = f'_{prefix}{self.counter}'
+        self.namespace[name] = value
+        return name
+
+    def _tmp(self) -> str:
+        self.counter += 1
+        return f'_t{self.counter}'
+
+    # statements which check `var` (and may rebind it), 'return _MISS' on failure
+    def emit(self, tp: Any, var: str, pad: str) -> list[str]:
+        origin = get_origin(tp)
+
+        if tp is str:
+            return [f'{pad}if type({var}) is not str: return _MISS']
+
+        if tp is bool:
+            return [f'{pad}if type({var}) is not bool: return _MISS']
+
+        if tp is int:
+            return [f'{pad}if type({var}) is not int: return _MISS']
+
+        if isinstance(tp, type) and issubclass(tp, ConstrainedStr):
+            if tp.strip_whitespace or tp.to_upper or tp.to_lower or tp.curtail_length:
+                raise _Unsupported(tp)
+            lines = [f'{pad}if type({var}) is not str: return _MISS']
+            if tp.min_length is not None:
+                lines.append(f'{pad}if len({var}) < {tp.min_length}: return _MISS')
+            if tp.max_length is not None:
+                lines.append(f'{pad}if len({var}) > {tp.max_length}: return _MISS')
+            if tp.regex is not None:
+                pattern = self._name('re', re.compile(tp.regex))
+                lines.append(f'{pad}if {pattern}.match({var}) is None: return _MISS')
+            return lines
+
+        if isinstance(tp, type) and issubclass(tp, ConstrainedInt):
+            lines = [f'{pad}if type({var}) is not int: return _MISS']
+            for attr, op in (('gt', '<='), ('ge', '<'), ('lt', '>='), ('le', '>')):
+                limit = getattr(tp, attr)
+                if limit is not None:
+                    lines.append(f'{pad}if {var} {op} {limit}: return _MISS')
+            if tp.multiple_of is not None:
+                lines.append(f'{pad}if {var} % {tp.multiple_of}: return _MISS')
+            return lines
+
+        if isinstance(tp, type) and issubclass(tp, ConstrainedList):
+            if tp.unique_items:
+                raise _Unsupported(tp)
+            return self._emit_list(tp.item_type, var, pad, tp.min_items, tp.max_items)
+
+        if origin is list:
+            (item_type,) = get_args(tp) or (Any,)
+            return self._emit_list(item_type, var, pad, None, None)
+
+        if origin is Literal:
+            choices = self._name('lit', frozenset(get_args(tp)))
+            types = self._name('littypes', frozenset(type(c) for c in get_args(tp)))
+            return [f'{pad}if type({var}) not in {types} or {var} not in {choices}: return _MISS']
+
+        if origin is Union:
+            members = [a for a in get_args(tp) if a is not type(None)]
+            if len(members) < len(get_args(tp)):
+                # Optional[X]
+                inner = self.emit(Union[tuple(members)], var, pad + '    ')
+                return [f'{pad}if {var} is not None:'] + inner
+            if not all(_is_pydantic_dataclass(m) for m in members):
+                raise _Unsupported(tp)
+            return self._emit_dataclass_union(members, var, pad)
+
+        if _is_pydantic_dataclass(tp):
+            return self._emit_dataclass_union([tp], var, pad)
+
+        raise _Unsupported(tp)
+
+    def _emit_list(self, item_type: Any, var: str, pad: str,
+                   min_items: Optional[int], max_items: Optional[int]) -> list[str]:
+        items, item = self._tmp(), self._tmp()
+        lines = [f'{pad}if type({var}) is not list: return _MISS']
+        if min_items is not None:
+            lines.append(f'{pad}if len({var}) < {min_items}: return _MISS')
+        if max_items is not None:
+            lines.append(f'{pad}if len({var}) > {max_items}: return _MISS')
+        lines.append(f'{pad}{items} = []')
+        lines.append(f'{pad}for {item} in {var}:')
+        lines.extend(self.emit(item_type, item, pad + '    '))
+        lines.append(f'{pad}    {items}.append({item})')
+        lines.append(f'{pad}{var} = {items}')
+        return lines
+
+    # union members are tried in order, like pydantic does, but without exceptions
+    def _emit_dataclass_union(self, members: list[type], var: str, pad: str) -> list[str]:
+        result = self._tmp()
+        classes = self._name('classes', tuple(members))
+        lines = [f'{pad}{result} = _MISS',
+                 f'{pad}if type({var}) is dict:']
+        for i, member in enumerate(members):
+            plan = self._name('plan', _fast_plan(member))
+            if i == 0:
+                lines.append(f'{pad}    {result} = {plan}({var})')
+            else:
+                lines.append(f'{pad}    if {result} is _MISS: {result} = {plan}({var})')
+        lines.append(f'{pad}elif isinstance({var}, {classes}): {result} = {var}')
+        lines.append(f'{pad}if {result} is _MISS: return _MISS')
+        lines.append(f'{pad}{var} = {result}')
+        return lines
+
+    def compile(self) -> Callable[[dict], Any]:
+        cls = self.cls
+        model = cls.__pydantic_model__
+        if (model.__pre_root_validators__ or model.__post_root_validators__ or
+                hasattr(cls, '__post_init_post_parse__')):
+            return lambda data: _MISS
+
+        hints = get_type_hints(cls, include_extras=True)
+        fields = model.__fields__
+        keys = self._name('keys', frozenset(fields))
+        func_name = f'_validate_{cls.__name__}'
+        body: list[str] = [f'    if not {keys}.issuperset(data): return _MISS',
+                           '    _values = {}']
+
+        for name, field in fields.items():
+            var = f'v_{name}'
+            field_ref = self._name('field', field)
+            if field.required:
+                body.append(f"    {var} = data.get({name!r}, _MISS)")
+                body.append(f'    if {var} is _MISS: return _MISS')
+            else:
+                body.append(f"    {var} = data.get({name!r}, _MISS)")
+                body.append(f'    if {var} is _MISS: {var} = {field_ref}.get_default()')
+
+            # conlist() adds its own length check as a 'pre' validator, it is inlined by emit()
+            type_validators = list(getattr(hints[name], '__get_validators__', list)())
+            class_validators = [v for v in field.class_validators.values()
+                                if v.func not in type_validators]
+            try:
+                if any(v.pre or v.each_item for v in class_validators):
+                    raise _Unsupported(name)
+                body.extend(self.emit(hints[name], var, '    '))
+                for class_validator in class_validators:
+                    func = self._name('validator', make_generic_validator(class_validator.func))
+                    body.append('    try:')
+                    body.append(f'        {var} = {func}(_cls, {var}, _values, {field_ref}, {field_ref}.model_config)')
+                    body.append('    except (ValueError, TypeError, AssertionError): return _MISS')
+            except _Unsupported:
+                errors = self._tmp()
+                body.append(f'    {var}, {errors} = {field_ref}.validate({var}, _values, loc={name!r}, cls=_cls)')
+                body.append(f'    if {errors}: return _MISS')
+            body.append(f'    _values[{name!r}] = {var}')
+
+        # build instance without running pydantic validation again
+        body.append('    _obj = _new(_cls)')
+        body.append('    _obj.__dict__.update(_values)')
+        body.append("    _obj.__dict__['__pydantic_initialised__'] = True")
+        body.append('    return _obj')
+
+        source = '\n'.join([f'def {func_name}(data):'] + body)
+        exec(source, self.namespace)
+        plan = self.namespace[func_name]
+        plan.__source__ = source
+        return plan
+
+
+_fast_plans: dict[type, Callable[[dict], Any]] = {}
+
+
+def _fast_plan(cls: type) -> Callable[[dict], Any]:
+    plan = _fast_plans.get(cls)
+    if plan is None:
+        plan = _fast_plans[cls] = _PlanCompiler(cls).compile()
+    return plan
+
+
+# opt-in:  compiled(Restaurant)(data) instead of Restaurant(**data)
+def compiled(cls: type) -> Callable[[dict], Any]:
+    plan = _fast_plan(cls)
+
+    def validate(data: dict) -> Any:
+        result = plan(data)
+        if result is _MISS:
+            # slow path:  coercion or error, exactly as stock pydantic
+            return cls(**data)
+        return result
+
+    validate.__source__ = getattr(plan, '__source__', None)
+    return validate
+
+
+# ----------
+validate_dish = compiled(Dish)
+
+# one specialized function per class
+print(validate_dish.__source__)
+
+
+# ----------
+data = {
+    'name': 'Viafores',
+    'owner': 'Pat Viafore',
+    'address': '123 Fake St. Fakington, FA 01234',
+    'employees': [{'name': 'Pat Viafore', 'position': 'Chef',
+                   'payment_details': {'bank_details': {
+                       'account_number': '123456789',
+                       'routing_number': '123456789012'}}},
+                  {'name': 'Made-up McGee', 'position': 'Server',
+                   'payment_details': {'address': '123 Fake St.'}}],
+    'dishes': [{'name': 'Pasta Sausage', 'price_in_cents': 1295,
+                'description': 'Rigatoni and Sausage with a Tomato-Garlic-Basil Sauce'},
+               {'name': 'Pasta Bolognese', 'price_in_cents': 1495,
+                'description': 'Spaghetti with a rich Tomato and Beef Sauce'},
+               {'name': 'Caprese Salad', 'price_in_cents': 795,
+                'description': 'Tomato, Buffalo Mozzarella, and Basil',
+                'picture': 'caprese.png'}],
+    'number_of_seats': 12,
+    'to_go': True,
+    'delivery': False,
+}
+
+validate_restaurant = compiled(Restaurant)
+
+assert validate_restaurant(data) == Restaurant(**data)
+
+
+# ----------
+# coercion goes through the stock path:  "12" -> 12
+assert validate_restaurant({**data, 'number_of_seats': '12'}).number_of_seats == 12
+
+
+# ----------
+# same ValidationError as stock pydantic
+def error_of(func: Callable[[], Any]) -> str:
+    try:
+        func()
+    except ValidationError as e:
+        return str(e)
+    assert False
+
+
+for bad in ({**data, 'name': "Viafore's"},
+            {**data, 'number_of_seats': -5},
+            {**data, 'dishes': data['dishes'][:2]},
+            {**data, 'employees': [data['employees'][0], data['employees'][0]]}):
+    assert error_of(lambda: validate_restaurant(bad)) == error_of(lambda: Restaurant(**bad))
+
+
+# ------------------------------------------------------------------------------
+# benchmark:  stock pydantic.dataclasses.dataclass vs compiled plan, same inputs
+# ------------------------------------------------------------------------------
+
+def benchmark(number: int = 2000) -> None:
+    stock = timeit.timeit(lambda: Restaurant(**data), number=number)
+    fast = timeit.timeit(lambda: validate_restaurant(data), number=number)
+    print(f'stock    {stock / number * 1e6:>8.1f} us/restaurant')
+    print(f'compiled {fast / number * 1e6:>8.1f} us/restaurant  (x{stock / fast:.1f})')
+
+
+benchmark()
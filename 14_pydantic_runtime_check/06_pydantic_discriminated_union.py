@@ -0,0 +1,158 @@
+
+import timeit
+from typing import Any, Callable, Literal, Union
+
+from pydantic import BaseConfig, constr, ValidationError
+from pydantic.dataclasses import dataclass
+from pydantic.fields import ModelField, Required
+
+
+# ------------------------------------------------------------------------------
+# constrained models (same as 01_pydantic_runtime_check.py)
+# ------------------------------------------------------------------------------
+
+@dataclass
+class AccountAndRoutingNumber:
+    account_number: constr(min_length=9, max_length=9)
+    routing_number: constr(min_length=8, max_length=12)
+
+
+@dataclass
+class BankDetails:
+    bank_details: AccountAndRoutingNumber
+
+
+@dataclass
+class Address:
+    address: constr(min_length=1)
+
+
+AddressOrBankDetails = Union[Address, BankDetails]
+
+
+Position = Literal['Chef', 'Sous Chef', 'Host',
+                   'Server', 'Delivery Driver']
+
+
+@dataclass
+class Employee:
+    name: str
+    position: Position
+    payment_details: AddressOrBankDetails
+
+
+# ------------------------------------------------------------------------------
+# Union[Address, BankDetails]:  pydantic tries Address first.
+# for every employee paid by bank, Address(**data) fails with TypeError
+# (exception overhead), then BankDetails is tried.
+#
+# discriminated by key:
+#   'address'      -> Address only
+#   'bank_details' -> BankDetails only
+# if the matching member fails (or no key / both keys), the whole Union is validated
+# as before, so the error messages are exactly the same as today.
+# ------------------------------------------------------------------------------
+
+def keyed_union(members: dict[str, type], name: str = 'KeyedUnion') -> type:
+    classes = tuple(members.values())
+    union_field = ModelField.infer(name=name, value=Required,
+                                   annotation=Union[classes],
+                                   class_validators=None, config=BaseConfig)
+
+    def validate_union(v: Any) -> Any:
+        value, errors = union_field.validate(v, {}, loc=())
+        if errors:
+            raise ValidationError([errors], union_field.type_)
+        return value
+
+    def validate(v: Any) -> Any:
+        if isinstance(v, classes):
+            return v
+        if type(v) is dict:
+            keys = [key for key in v if key in members]
+            if len(keys) == 1:
+                try:
+                    return members[keys[0]].__validate__(v)
+                except (ValueError, TypeError, AssertionError):
+                    pass
+        # slow path only on error (or ambiguous input)
+        return validate_union(v)
+
+    def __get_validators__(cls) -> Any:
+        yield validate
+
+    return type(name, (), {'__get_validators__': classmethod(__get_validators__),
+                           'members': members})
+
+
+AddressOrBankDetailsByKey = keyed_union({'address': Address,
+                                         'bank_details': BankDetails},
+                                        name='AddressOrBankDetailsByKey')
+
+
+@dataclass
+class EmployeeByKey:
+    name: str
+    position: Position
+    payment_details: AddressOrBankDetailsByKey
+
+
+# ----------
+bank = {'bank_details': {'account_number': '123456789', 'routing_number': '123456789012'}}
+address = {'address': '123 Fake St.'}
+
+assert EmployeeByKey('Pat', 'Chef', bank).payment_details == Employee('Pat', 'Chef', bank).payment_details
+assert EmployeeByKey('Pat', 'Chef', address).payment_details == Address('123 Fake St.')
+
+# both keys:  ambiguous, whole Union as today (Address wins, extra key is ignored)
+both = {**address, 'bank_details': {}}
+assert EmployeeByKey('Pat', 'Chef', both).payment_details == Employee('Pat', 'Chef', both).payment_details
+
+# instance is passed through
+assert EmployeeByKey('Pat', 'Chef', Address('123 Fake St.')).payment_details == Address('123 Fake St.')
+
+
+# ----------
+# same error messages as Union[Address, BankDetails]
+def errors_of(func: Callable[[], Any]) -> list[dict]:
+    try:
+        func()
+    except ValidationError as e:
+        return e.errors()
+    assert False
+
+
+for bad in ({'bank_details': {'account_number': '1', 'routing_number': '123456789'}},
+            {'address': ''},
+            {'foo': 1},
+            5):
+    assert (errors_of(lambda: EmployeeByKey('Pat', 'Chef', bad)) ==
+            errors_of(lambda: Employee('Pat', 'Chef', bad)))
+
+
+# ------------------------------------------------------------------------------
+# benchmark:  employee-heavy payload (most employees paid by bank)
+# ------------------------------------------------------------------------------
+
+@dataclass
+class Staff:
+    employees: list[Employee]
+
+
+@dataclass
+class StaffByKey:
+    employees: list[EmployeeByKey]
+
+
+def benchmark(n_employees: int = 1000, number: int = 20) -> None:
+    employees = [{'name': f'Employee {i}', 'position': 'Server',
+                  'payment_details': address if i % 10 == 0 else bank}
+                 for i in range(n_employees)]
+    union = timeit.timeit(lambda: Staff(employees), number=number)
+    keyed = timeit.timeit(lambda: StaffByKey(employees), number=number)
+    print(f'Union[Address, BankDetails] {union / number * 1e3:>8.2f} ms / {n_employees} employees')
+    print(f'keyed by dict key           {keyed / number * 1e3:>8.2f} ms / {n_employees} employees'
+          f'  (x{union / keyed:.1f})')
+
+
+benchmark()
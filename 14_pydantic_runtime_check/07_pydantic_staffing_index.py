@@ -0,0 +1,254 @@
+
+import timeit
+from collections import Counter
+from types import MappingProxyType
+from typing import Literal, Mapping, Optional, Union, get_args
+
+from pydantic import conlist, constr, PositiveInt, ValidationError
+from pydantic import validator
+from pydantic.dataclasses import dataclass
+
+
+# ------------------------------------------------------------------------------
+# constrained models (same as 01_pydantic_runtime_check.py, @validator section)
+# ------------------------------------------------------------------------------
+
+@dataclass
+class AccountAndRoutingNumber:
+    account_number: constr(min_length=9, max_length=9)
+    routing_number: constr(min_length=8, max_length=12)
+
+
+@dataclass
+class BankDetails:
+    bank_details: AccountAndRoutingNumber
+
+
+@dataclass
+class Address:
+    address: constr(min_length=1)
+
+
+AddressOrBankDetails = Union[Address, BankDetails]
+
+
+Position = Literal['Chef', 'Sous Chef', 'Host',
+                   'Server', 'Delivery Driver']
+
+
+@dataclass
+class Employee:
+    name: str
+    position: Position
+
+
+@dataclass
+class Dish:
+    name: constr(min_length=1, max_length=16)
+    price_in_cents: PositiveInt
+    description: constr(min_length=1, max_length=80)
+    picture: Optional[str] = None
+
+
+# ------------------------------------------------------------------------------
+# staffing index
+#   check_chef_and_server scans employees twice by any() on every validation.
+#   Restaurant keeps position -> count (Counter), built once after validation,
+#   and add_employee() / pop_employee() / remove_employee() update it in O(1).
+#   the roster list itself still costs what a list costs:  append and pop() of the
+#   last employee are O(1), pop(i) shifts the n - i employees behind i, and
+#   remove_employee() also looks the employee up with list.index(), O(n).
+#   (swap-with-last would make removal O(1) but reorder the roster)
+#   assigning a new roster (r.employees = [...]) checks and rebuilds it.
+#   staffing rules are checked against the index, not the roster.
+#   (edit the roster through these methods:  r.employees.append() bypasses the index)
+# ------------------------------------------------------------------------------
+
+# position -> minimum headcount
+STAFFING_RULES: dict[Position, int] = {'Chef': 1, 'Server': 1}
+
+STAFFING_ERROR = 'Must have at least one chef and one server'
+
+
+def check_staffing(staffing: Counter) -> None:
+    for position, minimum in STAFFING_RULES.items():
+        if staffing[position] < minimum:
+            raise ValueError(STAFFING_ERROR)
+
+
+@dataclass
+class Restaurant:
+    name: constr(regex=r'^[a-zA-Z0-9 ]*$',
+                 min_length=1, max_length=16)
+    owner: constr(min_length=1)
+    address: constr(min_length=1)
+    employees: conlist(Employee, min_items=2)
+    dishes: conlist(Dish, min_items=3)
+    number_of_seats: PositiveInt
+    to_go: bool
+    delivery: bool
+
+    # one pass over the roster (instead of two any() scans)
+    @validator('employees')
+    def check_chef_and_server(cls, employees):
+        check_staffing(Counter(e.position for e in employees))
+        return employees
+
+    # runs after validation:  index is not a field, so == and repr are unchanged
+    def __post_init_post_parse__(self):
+        self._staffing = Counter(e.position for e in self.employees)
+
+    # a new roster:  staffing rules checked before it is assigned, index rebuilt
+    def __setattr__(self, name, value):
+        if name == 'employees' and '_staffing' in self.__dict__:
+            staffing = Counter(e.position for e in value)
+            check_staffing(staffing)
+            super().__setattr__(name, value)
+            self._staffing = staffing
+            return
+        super().__setattr__(name, value)
+
+    # read-only:  the index is changed through the roster methods only
+    @property
+    def staffing(self) -> Mapping[Position, int]:
+        return MappingProxyType(self._staffing)
+
+    def add_employee(self, employee: Employee) -> None:
+        if not isinstance(employee, Employee):
+            raise TypeError(f'Employee expected, got {type(employee).__name__}')
+        if employee.position not in get_args(Position):
+            raise ValueError(f'unknown position {employee.position!r}')
+        self.employees.append(employee)
+        self._staffing[employee.position] += 1
+
+    # roster is left unchanged if removing the employee breaks a staffing rule
+    # index update O(1), del employees[index] O(n - index)
+    def pop_employee(self, index: int = -1) -> Employee:
+        employee = self.employees[index]
+        self._staffing[employee.position] -= 1
+        try:
+            check_staffing(self._staffing)
+        except ValueError:
+            self._staffing[employee.position] += 1
+            raise
+        del self.employees[index]
+        return employee
+
+    # O(n):  list.index() lookup + pop_employee()
+    def remove_employee(self, employee: Employee) -> None:
+        self.pop_employee(self.employees.index(employee))
+
+    # re-validation after roster edits, O(number of rules)
+    def check_staffing(self) -> None:
+        check_staffing(self._staffing)
+
+
+# ----------
+data = {
+    'name': 'Dine n Dash',
+    'owner': 'Pat Viafore',
+    'address': '123 Fake St.',
+    'employees': [Employee('Pat', 'Chef'), Employee('Joe', 'Server')],
+    'dishes': [Dish('abc', 100, 'abc'), Dish('def', 100, 'def'), Dish('ghi', 100, 'ghi')],
+    'number_of_seats': 5,
+    'to_go': False,
+    'delivery': True
+}
+
+restaurant = Restaurant(**data)
+
+assert restaurant.staffing == Counter({'Chef': 1, 'Server': 1})
+
+
+# ----------
+sam = Employee('Sam', 'Server')
+restaurant.add_employee(sam)
+assert restaurant.staffing['Server'] == 2
+
+restaurant.remove_employee(sam)
+restaurant.check_staffing()
+
+
+# ----------
+# last chef can not be removed, roster and index are unchanged
+try:
+    restaurant.remove_employee(restaurant.employees[0])
+    assert False
+except ValueError as e:
+    assert str(e) == STAFFING_ERROR
+
+assert restaurant.staffing == Counter({'Chef': 1, 'Server': 1})
+assert len(restaurant.employees) == 2
+
+
+# ----------
+# index is read-only
+try:
+    restaurant.staffing['Chef'] += 1
+    assert False
+except TypeError:
+    pass
+
+# a new roster rebuilds the index
+restaurant.employees = [Employee('Pat', 'Chef'), Employee('Joe', 'Server'), Employee('Sam', 'Server')]
+assert restaurant.staffing == Counter({'Chef': 1, 'Server': 2})
+assert restaurant.pop_employee() == Employee('Sam', 'Server')
+assert restaurant.staffing == Counter({'Chef': 1, 'Server': 1})
+
+# ... and is rejected, roster and index unchanged, if it breaks a staffing rule
+try:
+    restaurant.employees = [Employee('Joe', 'Server'), Employee('Sam', 'Server')]
+    assert False
+except ValueError as e:
+    assert str(e) == STAFFING_ERROR
+
+assert restaurant.staffing == Counter({'Chef': 1, 'Server': 1})
+assert len(restaurant.employees) == 2
+
+
+# ----------
+# construction still raises ValidationError with the same message
+try:
+    Restaurant(**{**data,
+                  'employees': [Employee('Pat', 'Chef'), Employee('Joe', 'Chef')]})
+    assert False
+except ValidationError as e:
+    assert e.errors()[0]['msg'] == STAFFING_ERROR
+
+
+# ------------------------------------------------------------------------------
+# benchmark:  roster edit + staffing check
+#   scan:  two any() over the roster, as check_chef_and_server did
+#   index: staffing index
+#   edits append / pop the last employee (the O(1) case for the list)
+# ------------------------------------------------------------------------------
+
+def scan_chef_and_server(employees: list[Employee]) -> bool:
+    return (any(e for e in employees if e.position == 'Chef') and
+            any(e for e in employees if e.position == 'Server'))
+
+
+def benchmark(n_employees: int = 10_000, number: int = 1000) -> None:
+    # chef and server at the end:  worst case for any()
+    roster = [Employee(f'Host {i}', 'Host') for i in range(n_employees)]
+    roster += [Employee('Pat', 'Chef'), Employee('Joe', 'Server')]
+    big = Restaurant(**{**data, 'employees': roster})
+    new_hire = Employee('Sam', 'Sous Chef')
+
+    def edit_and_scan() -> None:
+        big.employees.append(new_hire)
+        scan_chef_and_server(big.employees)
+        big.employees.pop()
+
+    def edit_and_check() -> None:
+        big.add_employee(new_hire)
+        big.check_staffing()
+        big.pop_employee()
+
+    scan = timeit.timeit(edit_and_scan, number=number)
+    index = timeit.timeit(edit_and_check, number=number)
+    print(f'any() scan     {scan / number * 1e6:>10.1f} us / edit ({n_employees} employees)')
+    print(f'staffing index {index / number * 1e6:>10.1f} us / edit')
+
+
+benchmark()
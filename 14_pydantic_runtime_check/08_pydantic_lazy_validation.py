@@ -0,0 +1,254 @@
+
+import timeit
+import yaml
+from typing import Any, Literal, Optional, Union
+
+from pydantic import ValidationError
+from pydantic import validator
+from pydantic.dataclasses import dataclass
+
+
+# ----------
+fpath_restaurant = '14_pydantic_runtime_check/restaurant.yaml'
+fpath_restaurant_missing = '14_pydantic_runtime_check/missing.yaml'
+
+
+# ------------------------------------------------------------------------------
+# same models as 01_pydantic_runtime_check.py (with check_chef_and_server)
+# ------------------------------------------------------------------------------
+
+@dataclass
+class AccountAndRoutingNumber:
+    account_number: str
+    routing_number: str
+
+
+@dataclass
+class BankDetails:
+    bank_details: AccountAndRoutingNumber
+
+
+@dataclass
+class Address:
+    address: str
+
+
+AddressOrBankDetails = Union[Address, BankDetails]
+
+
+Position = Literal['Chef', 'Sous Chef', 'Host',
+                   'Server', 'Delivery Driver']
+
+
+@dataclass
+class Dish:
+    name: str
+    price_in_cents: int
+    description: str
+    picture: Optional[str] = None
+
+
+@dataclass
+class Employee:
+    name: str
+    position: Position
+    payment_details: AddressOrBankDetails
+
+
+@dataclass
+class Restaurant:
+    name: str
+    owner: str
+    address: str
+    employees: list[Employee]
+    dishes: list[Dish]
+    number_of_seats: int
+    to_go: bool
+    delivery: bool
+
+    @validator('employees')
+    def check_chef_and_server(cls, employees):
+        if (any(e for e in employees if e.position == 'Chef') and
+            any(e for e in employees if e.position == 'Server')):
+                return employees
+        raise ValueError('Must have at least one chef and one server')
+
+
+# ------------------------------------------------------------------------------
+# lazy validation
+#   - top-level scalar fields are validated eagerly
+#   - lazy fields (dishes, employees) are kept as raw data until first access
+#   - every field is validated by the ModelField of the real model (Restaurant),
+#     so validators run and the ValidationError is the same as Restaurant(**data)
+#   - validated value is stored in the instance __dict__:
+#     LazyField is a non-data descriptor, so 2nd access does not call it at all
+#   - assignment to a field replaces the pending raw value (no validation on
+#     assignment, same as Restaurant)
+# ------------------------------------------------------------------------------
+
+class LazyField:
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, obj: Any, objtype: Optional[type] = None) -> Any:
+        if obj is None:
+            return self
+        return obj._validate_field(self.name)
+
+
+class LazyModel:
+    __model__: type
+
+    def __init__(self, **data: Any):
+        model = self.__model__
+        fields = model.__pydantic_model__.__fields__
+        missing = [name for name, field in fields.items()
+                   if field.required and name not in data]
+        if missing:
+            raise TypeError(f'{model.__name__}.__init__() missing required arguments: '
+                            + ', '.join(repr(name) for name in missing))
+
+        values: dict[str, Any] = {}
+        raw: dict[str, Any] = {}
+        errors = []
+        for name, field in fields.items():
+            value = data[name] if name in data else field.get_default()
+            if isinstance(getattr(type(self), name, None), LazyField):
+                raw[name] = value
+                continue
+            value, error = field.validate(value, values, loc=name, cls=model)
+            if error:
+                errors.append(error)
+            else:
+                values[name] = value
+        if errors:
+            raise ValidationError(errors, model)
+
+        self.__dict__.update(values)
+        self._values = values
+        self._raw = raw
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in self.__model__.__pydantic_model__.__fields__:
+            self._raw.pop(name, None)
+            self._values[name] = value
+        object.__setattr__(self, name, value)
+
+    def _validate_field(self, name: str) -> Any:
+        model = self.__model__
+        field = model.__pydantic_model__.__fields__[name]
+        value, error = field.validate(self._raw[name], self._values, loc=name, cls=model)
+        if error:
+            raise ValidationError([error], model)
+        del self._raw[name]
+        self._values[name] = value
+        self.__dict__[name] = value
+        return value
+
+    # force full validation, all errors of pending fields are reported together
+    def validate_all(self) -> 'LazyModel':
+        model = self.__model__
+        errors = []
+        for name in list(self._raw):
+            try:
+                self._validate_field(name)
+            except ValidationError as e:
+                errors.extend(e.raw_errors)
+        if errors:
+            raise ValidationError(errors, model)
+        return self
+
+    def is_validated(self, name: str) -> bool:
+        return name not in self._raw
+
+    def __repr__(self) -> str:
+        fields = self.__model__.__pydantic_model__.__fields__
+        items = ', '.join(f'{name}=<lazy>' if name in self._raw else f'{name}={self.__dict__[name]!r}'
+                          for name in fields)
+        return f'{type(self).__name__}({items})'
+
+
+class LazyRestaurant(LazyModel):
+    __model__ = Restaurant
+
+    employees = LazyField()
+    dishes = LazyField()
+
+
+def load_restaurant_lazy(filename: str) -> LazyRestaurant:
+    with open(filename) as yaml_file:
+        data = yaml.safe_load(yaml_file)
+        return LazyRestaurant(**data)
+
+
+# ----------
+restaurant = load_restaurant_lazy(fpath_restaurant)
+
+# scalar fields are ready, nested ones are not validated yet
+assert restaurant.number_of_seats == 12
+assert not restaurant.is_validated('dishes')
+
+# first access validates
+assert restaurant.dishes[2].picture == 'caprese.png'
+assert restaurant.is_validated('dishes')
+
+# assignment wins over the pending raw value
+restaurant.employees = []
+assert restaurant.is_validated('employees')
+restaurant.validate_all()
+assert restaurant.employees == []
+
+
+# ----------
+# missing.yaml loads (scalars are OK) and raises on access
+restaurant = load_restaurant_lazy(fpath_restaurant_missing)
+
+assert restaurant.name == "Viafore's"
+
+
+def errors_of(func) -> list[dict]:
+    try:
+        func()
+    except ValidationError as e:
+        return e.errors()
+    assert False
+
+
+with open(fpath_restaurant_missing) as yaml_file:
+    data = yaml.safe_load(yaml_file)
+
+# same ValidationError as Restaurant(**data)
+assert errors_of(lambda: restaurant.dishes) == errors_of(lambda: Restaurant(**data))
+assert errors_of(lambda: restaurant.validate_all()) == errors_of(lambda: Restaurant(**data))
+
+
+# ----------
+# validators on lazy fields run on access
+try:
+    LazyRestaurant(**{**data, 'employees': data['employees'][2:]}).employees
+    assert False
+except ValidationError as e:
+    assert e.errors()[0]['msg'] == 'Must have at least one chef and one server'
+
+
+# ------------------------------------------------------------------------------
+# benchmark:  load and read only name / number_of_seats / to_go / delivery
+# ------------------------------------------------------------------------------
+
+def benchmark(n_items: int = 500, number: int = 100) -> None:
+    with open(fpath_restaurant) as yaml_file:
+        data = yaml.safe_load(yaml_file)
+    data['employees'] = data['employees'] * n_items
+    data['dishes'] = data['dishes'] * n_items
+
+    def read_header(restaurant: Any) -> None:
+        restaurant.name, restaurant.number_of_seats, restaurant.to_go, restaurant.delivery
+
+    eager = timeit.timeit(lambda: read_header(Restaurant(**data)), number=number)
+    lazy = timeit.timeit(lambda: read_header(LazyRestaurant(**data)), number=number)
+    print(f'eager {eager / number * 1e3:>8.3f} ms / restaurant')
+    print(f'lazy  {lazy / number * 1e3:>8.3f} ms / restaurant')
+
+
+benchmark()
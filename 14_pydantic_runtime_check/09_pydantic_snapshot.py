@@ -0,0 +1,256 @@
+
+import copy
+import hashlib
+import json
+import os
+import pickle
+import struct
+import tempfile
+import timeit
+import yaml
+from typing import Literal, Optional, Union
+
+from pydantic import validator
+from pydantic.dataclasses import dataclass
+
+
+# ----------
+fpath_restaurant = '14_pydantic_runtime_check/restaurant.yaml'
+
+
+# ------------------------------------------------------------------------------
+# same models as 01_pydantic_runtime_check.py (with check_chef_and_server)
+# ------------------------------------------------------------------------------
+
+@dataclass
+class AccountAndRoutingNumber:
+    account_number: str
+    routing_number: str
+
+
+@dataclass
+class BankDetails:
+    bank_details: AccountAndRoutingNumber
+
+
+@dataclass
+class Address:
+    address: str
+
+
+AddressOrBankDetails = Union[Address, BankDetails]
+
+
+Position = Literal['Chef', 'Sous Chef', 'Host',
+                   'Server', 'Delivery Driver']
+
+
+@dataclass
+class Dish:
+    name: str
+    price_in_cents: int
+    description: str
+    picture: Optional[str] = None
+
+
+@dataclass
+class Employee:
+    name: str
+    position: Position
+    payment_details: AddressOrBankDetails
+
+
+@dataclass
+class Restaurant:
+    name: str
+    owner: str
+    address: str
+    employees: list[Employee]
+    dishes: list[Dish]
+    number_of_seats: int
+    to_go: bool
+    delivery: bool
+
+    @validator('employees')
+    def check_chef_and_server(cls, employees):
+        if (any(e for e in employees if e.position == 'Chef') and
+            any(e for e in employees if e.position == 'Server')):
+                return employees
+        raise ValueError('Must have at least one chef and one server')
+
+
+def load_restaurant(filename: str) -> Restaurant:
+    with open(filename) as yaml_file:
+        data = yaml.safe_load(yaml_file)
+        return Restaurant(**data)
+
+
+# ------------------------------------------------------------------------------
+# validated snapshot
+#   header:  magic | format version | schema hash (32 bytes) | source hash (32 bytes)
+#            | body hash (32 bytes)
+#   body:    pickle of the validated Restaurant graph
+#
+#   pickle does not call __init__, so instances come back without validation.
+#   schema hash = SCHEMA_VERSION + JSON schema of the models, changes when a field / constraint changes.
+#   source hash = sha256 of the YAML file.
+#   body hash = sha256 of the body, checked before unpickling:  a truncated or
+#   corrupted body is never handed to pickle.
+#   if any does not match, or the pickle can not be loaded (a class was renamed),
+#   YAML is parsed and validated again and snapshot is rewritten.
+#   snapshot is a cache:  if it can not be written (directory missing, read-only),
+#   the validated restaurant is returned all the same.
+#   snapshot is written to a unique temp file and renamed:  concurrent writers
+#   do not write into the same file, the last rename wins.
+#
+# NOTE: snapshot is a local cache written by this process.
+#       never load snapshot files from untrusted places (pickle).
+# ------------------------------------------------------------------------------
+
+SNAPSHOT_MAGIC = b'RSNP'
+SNAPSHOT_FORMAT_VERSION = 2
+
+# bump when a validator changes (JSON schema does not see validator code)
+SCHEMA_VERSION = 1
+
+_header = struct.Struct('>4sH32s32s32s')
+
+
+def schema_hash(model: type) -> bytes:
+    schema = json.dumps([SCHEMA_VERSION, model.__pydantic_model__.schema()], sort_keys=True)
+    return hashlib.sha256(schema.encode()).digest()
+
+
+def source_hash(filename: str) -> bytes:
+    with open(filename, 'rb') as source_file:
+        return hashlib.sha256(source_file.read()).digest()
+
+
+def write_snapshot(restaurant: Restaurant, snapshot_path: str, source: bytes) -> None:
+    body = pickle.dumps(restaurant, protocol=pickle.HIGHEST_PROTOCOL)
+    header = _header.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, schema_hash(Restaurant), source,
+                          hashlib.sha256(body).digest())
+    # write + rename:  reader never sees a half-written snapshot
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(snapshot_path) or '.',
+                                    prefix=os.path.basename(snapshot_path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as snapshot_file:
+            snapshot_file.write(header)
+            snapshot_file.write(body)
+        os.replace(tmp_path, snapshot_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+# None if snapshot does not exist, is stale or is unreadable
+def read_snapshot(snapshot_path: str, source: bytes) -> Optional[Restaurant]:
+    try:
+        with open(snapshot_path, 'rb') as snapshot_file:
+            header = snapshot_file.read(_header.size)
+            if len(header) != _header.size:
+                return None
+            magic, version, schema, stored_source, body_hash = _header.unpack(header)
+            if (magic != SNAPSHOT_MAGIC or version != SNAPSHOT_FORMAT_VERSION or
+                    schema != schema_hash(Restaurant) or stored_source != source):
+                return None
+            body = snapshot_file.read()
+    except FileNotFoundError:
+        return None
+    if hashlib.sha256(body).digest() != body_hash:
+        return None
+    try:
+        restaurant = pickle.loads(body)
+    except Exception:
+        # intact body, but not loadable by this code (a class was renamed / moved)
+        return None
+    return restaurant if isinstance(restaurant, Restaurant) else None
+
+
+def load_restaurant_snapshot(filename: str, snapshot_dir: Optional[str] = None) -> Restaurant:
+    snapshot_dir = snapshot_dir or os.path.dirname(os.path.abspath(filename))
+    snapshot_path = os.path.join(snapshot_dir, os.path.basename(filename) + '.snapshot')
+    source = source_hash(filename)
+
+    restaurant = read_snapshot(snapshot_path, source)
+    if restaurant is None:
+        restaurant = load_restaurant(filename)
+        try:
+            write_snapshot(restaurant, snapshot_path, source)
+        except OSError:
+            pass
+    return restaurant
+
+
+# ----------
+with tempfile.TemporaryDirectory() as snapshot_dir:
+
+    # first start:  YAML path, snapshot is written
+    restaurant = load_restaurant_snapshot(fpath_restaurant, snapshot_dir)
+
+    # restart:  from snapshot, same graph
+    assert load_restaurant_snapshot(fpath_restaurant, snapshot_dir) == restaurant
+
+    # source changed:  snapshot is ignored and rewritten
+    fpath_copy = os.path.join(snapshot_dir, 'restaurant.yaml')
+    with open(fpath_restaurant) as src, open(fpath_copy, 'w') as dst:
+        dst.write(src.read().replace('number_of_seats: 12', 'number_of_seats: 20'))
+    assert load_restaurant_snapshot(fpath_copy, snapshot_dir).number_of_seats == 20
+
+    with open(fpath_copy, 'a') as dst:
+        dst.write('\n# comment only\n')
+    assert read_snapshot(fpath_copy + '.snapshot', source_hash(fpath_copy)) is None
+    assert load_restaurant_snapshot(fpath_copy, snapshot_dir).number_of_seats == 20
+
+    # truncated pickle:  falls back to YAML and rewrites the snapshot
+    snapshot_path = fpath_copy + '.snapshot'
+    with open(snapshot_path, 'r+b') as snapshot_file:
+        snapshot_file.truncate(os.path.getsize(snapshot_path) - 10)
+    assert read_snapshot(snapshot_path, source_hash(fpath_copy)) is None
+    assert load_restaurant_snapshot(fpath_copy, snapshot_dir).number_of_seats == 20
+    assert read_snapshot(snapshot_path, source_hash(fpath_copy)) is not None
+
+    # flipped bytes in the body:  rejected by the body hash, before pickle sees them
+    with open(snapshot_path, 'rb') as snapshot_file:
+        snapshot = snapshot_file.read()
+    for position in range(_header.size, len(snapshot), 997):
+        corrupted = bytearray(snapshot)
+        corrupted[position] ^= 0xff
+        with open(snapshot_path, 'wb') as snapshot_file:
+            snapshot_file.write(corrupted)
+        assert read_snapshot(snapshot_path, source_hash(fpath_copy)) is None
+    assert load_restaurant_snapshot(fpath_copy, snapshot_dir).number_of_seats == 20
+
+    # no temp files left behind
+    assert not [f for f in os.listdir(snapshot_dir) if f.endswith('.tmp')]
+
+    # snapshot can not be written:  the validated restaurant is still returned
+    missing_dir = os.path.join(snapshot_dir, 'does_not_exist')
+    assert load_restaurant_snapshot(fpath_copy, missing_dir).number_of_seats == 20
+
+
+# ------------------------------------------------------------------------------
+# benchmark:  cold start, YAML + validation vs snapshot
+# ------------------------------------------------------------------------------
+
+def benchmark(n_items: int = 250, number: int = 20) -> None:
+    with open(fpath_restaurant) as yaml_file:
+        data = yaml.safe_load(yaml_file)
+    # distinct copies, so YAML can not use anchors
+    data['employees'] = [copy.deepcopy(e) for e in data['employees'] * n_items]
+    data['dishes'] = [copy.deepcopy(d) for d in data['dishes'] * n_items]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fpath_big = os.path.join(tmpdir, 'big.yaml')
+        with open(fpath_big, 'w') as yaml_file:
+            yaml.safe_dump(data, yaml_file)
+        load_restaurant_snapshot(fpath_big, tmpdir)
+
+        from_yaml = timeit.timeit(lambda: load_restaurant(fpath_big), number=number)
+        from_snapshot = timeit.timeit(lambda: load_restaurant_snapshot(fpath_big, tmpdir), number=number)
+        print(f'yaml + validation {from_yaml / number * 1e3:>8.2f} ms  ({os.path.getsize(fpath_big):,} bytes)')
+        print(f'snapshot          {from_snapshot / number * 1e3:>8.2f} ms  '
+              f'({os.path.getsize(fpath_big + ".snapshot"):,} bytes)')
+
+
+benchmark()
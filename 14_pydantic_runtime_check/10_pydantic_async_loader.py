@@ -0,0 +1,205 @@
+
+import asyncio
+import os
+import tempfile
+import time
+import yaml
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass as std_dataclass
+from typing import AsyncIterator, Iterable, Literal, Optional, Union
+
+from pydantic import ValidationError
+from pydantic.dataclasses import dataclass
+
+
+# ----------
+fpath_restaurant = '14_pydantic_runtime_check/restaurant.yaml'
+fpath_restaurant_missing = '14_pydantic_runtime_check/missing.yaml'
+fpath_restaurant_wrongtype = '14_pydantic_runtime_check/wrong_type.yaml'
+
+
+# ------------------------------------------------------------------------------
+# same models as 01_pydantic_runtime_check.py (pydantic.dataclasses.dataclass)
+# ------------------------------------------------------------------------------
+
+@dataclass
+class AccountAndRoutingNumber:
+    account_number: str
+    routing_number: str
+
+
+@dataclass
+class BankDetails:
+    bank_details: AccountAndRoutingNumber
+
+
+@dataclass
+class Address:
+    address: str
+
+
+AddressOrBankDetails = Union[Address, BankDetails]
+
+
+Position = Literal['Chef', 'Sous Chef', 'Host',
+                   'Server', 'Delivery Driver']
+
+
+@dataclass
+class Dish:
+    name: str
+    price_in_cents: int
+    description: str
+    picture: Optional[str] = None
+
+
+@dataclass
+class Employee:
+    name: str
+    position: Position
+    payment_details: AddressOrBankDetails
+
+
+@dataclass
+class Restaurant:
+    name: str
+    owner: str
+    address: str
+    employees: list[Employee]
+    dishes: list[Dish]
+    number_of_seats: int
+    to_go: bool
+    delivery: bool
+
+
+def load_restaurant(filename: str) -> Restaurant:
+    with open(filename) as yaml_file:
+        data = yaml.safe_load(yaml_file)
+        return Restaurant(**data)
+
+
+# ------------------------------------------------------------------------------
+# asyncio loader
+#   - at most `concurrency` files are in flight
+#   - file read runs in a thread (asyncio.to_thread), parse + validation in `executor`
+#     (None = default thread pool, or pass a ProcessPoolExecutor for CPU-bound work)
+#   - results are yielded as they finish, a slow or bad file does not block the batch
+#   - errors (ValidationError, YAML error, OSError, bad encoding, ...) are reported
+#     per file, not raised:  any Exception, one file never aborts the batch
+# ------------------------------------------------------------------------------
+
+@std_dataclass
+class LoadResult:
+    path: str
+    restaurant: Optional[Restaurant] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _read_text(path: str) -> str:
+    with open(path, encoding='utf-8') as yaml_file:
+        return yaml_file.read()
+
+
+def _parse_restaurant(text: str) -> Restaurant:
+    data = yaml.safe_load(text)
+    return Restaurant(**data)
+
+
+async def _load_one(path: str, semaphore: asyncio.Semaphore,
+                    executor: Optional[Executor]) -> LoadResult:
+    async with semaphore:
+        try:
+            text = await asyncio.to_thread(_read_text, path)
+            loop = asyncio.get_running_loop()
+            restaurant = await loop.run_in_executor(executor, _parse_restaurant, text)
+        except Exception as e:
+            return LoadResult(path, error=e)
+        return LoadResult(path, restaurant=restaurant)
+
+
+async def load_restaurants_async(paths: Iterable[str],
+                                 concurrency: int = 32,
+                                 executor: Optional[Executor] = None) -> AsyncIterator[LoadResult]:
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = [asyncio.create_task(_load_one(path, semaphore, executor)) for path in paths]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # consumer stopped early:  do not leave tasks running
+        for task in tasks:
+            task.cancel()
+
+
+# ----------
+async def load_samples(*extra_paths: str, executor: Optional[Executor] = None) -> dict[str, LoadResult]:
+    paths = [fpath_restaurant, fpath_restaurant_missing, fpath_restaurant_wrongtype,
+             '14_pydantic_runtime_check/does_not_exist.yaml', *extra_paths]
+    return {result.path: result async for result in load_restaurants_async(paths, executor=executor)}
+
+
+# ------------------------------------------------------------------------------
+# benchmark:  directory of restaurant files, sequential load_restaurant() vs async
+# ------------------------------------------------------------------------------
+
+def benchmark(n_files: int = 500) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with open(fpath_restaurant) as yaml_file:
+            text = yaml_file.read()
+        paths = []
+        for i in range(n_files):
+            path = os.path.join(tmpdir, f'restaurant_{i}.yaml')
+            with open(path, 'w') as yaml_file:
+                yaml_file.write(text)
+            paths.append(path)
+
+        start = time.perf_counter()
+        for path in paths:
+            load_restaurant(path)
+        sequential = time.perf_counter() - start
+
+        async def consume() -> int:
+            return sum([1 async for result in load_restaurants_async(paths) if result.ok])
+
+        start = time.perf_counter()
+        assert asyncio.run(consume()) == n_files
+        concurrent = time.perf_counter() - start
+
+        print(f'sequential load_restaurant() {sequential:>7.2f} s / {n_files} files')
+        print(f'load_restaurants_async()     {concurrent:>7.2f} s / {n_files} files')
+
+
+# guarded, because a process pool may re-import this script with 'spawn'
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # not UTF-8:  reported for this file, the others still load
+        fpath_latin1 = os.path.join(tmpdir, 'latin1.yaml')
+        with open(fpath_latin1, 'wb') as yaml_file:
+            yaml_file.write('name: Caf\xe9\n'.encode('latin-1'))
+        results = asyncio.run(load_samples(fpath_latin1))
+
+    assert isinstance(results[fpath_latin1].error, UnicodeDecodeError)
+
+    assert results[fpath_restaurant].restaurant == load_restaurant(fpath_restaurant)
+
+    # same error as load_restaurant(fpath_restaurant_missing)
+    try:
+        load_restaurant(fpath_restaurant_missing)
+        assert False
+    except ValidationError as e:
+        assert str(results[fpath_restaurant_missing].error) == str(e)
+
+    assert isinstance(results[fpath_restaurant_wrongtype].error, ValidationError)
+    assert isinstance(results['14_pydantic_runtime_check/does_not_exist.yaml'].error, FileNotFoundError)
+
+    # parse + validation in a process pool:  same results
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        pooled = asyncio.run(load_samples(executor=pool))
+    assert pooled[fpath_restaurant].restaurant == results[fpath_restaurant].restaurant
+    assert isinstance(pooled[fpath_restaurant_wrongtype].error, ValidationError)
+
+    benchmark()
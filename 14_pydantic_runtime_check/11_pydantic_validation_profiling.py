@@ -0,0 +1,293 @@
+
+import time
+import timeit
+from dataclasses import dataclass as std_dataclass
+from typing import Any, Callable, Literal, Optional, Union
+
+from pydantic import conlist, constr, PositiveInt, ValidationError
+from pydantic import validator
+from pydantic.dataclasses import dataclass
+from pydantic.fields import ModelField
+
+
+# ------------------------------------------------------------------------------
+# constrained models (same as 01_pydantic_runtime_check.py, @validator section)
+# ------------------------------------------------------------------------------
+
+@dataclass
+class AccountAndRoutingNumber:
+    account_number: constr(min_length=9, max_length=9)
+    routing_number: constr(min_length=8, max_length=12)
+
+
+@dataclass
+class BankDetails:
+    bank_details: AccountAndRoutingNumber
+
+
+@dataclass
+class Address:
+    address: constr(min_length=1)
+
+
+AddressOrBankDetails = Union[Address, BankDetails]
+
+
+Position = Literal['Chef', 'Sous Chef', 'Host',
+                   'Server', 'Delivery Driver']
+
+
+@dataclass
+class Employee:
+    name: str
+    position: Position
+    payment_details: AddressOrBankDetails
+
+
+@dataclass
+class Dish:
+    name: constr(min_length=1, max_length=16)
+    price_in_cents: PositiveInt
+    description: constr(min_length=1, max_length=80)
+    picture: Optional[str] = None
+
+
+@dataclass
+class Restaurant:
+    name: constr(regex=r'^[a-zA-Z0-9 ]*$',
+                 min_length=1, max_length=16)
+    owner: constr(min_length=1)
+    address: constr(min_length=1)
+    employees: conlist(Employee, min_items=2)
+    dishes: conlist(Dish, min_items=3)
+    number_of_seats: PositiveInt
+    to_go: bool
+    delivery: bool
+
+    @validator('employees')
+    def check_chef_and_server(cls, employees):
+        if (any(e for e in employees if e.position == 'Chef') and
+            any(e for e in employees if e.position == 'Server')):
+                return employees
+        raise ValueError('Must have at least one chef and one server')
+
+
+# ------------------------------------------------------------------------------
+# validation profiler
+#   - per field:      ModelField.validate()  (includes nested models / union members)
+#   - per validator:  each entry of field.pre_validators / validators / post_validators
+#                     (constr_length_validator, str_validator, check_chef_and_server, ...)
+#   - records call count, cumulative time and failure count
+#
+#   enable():  fields of the instrumented models are switched to _ProfiledModelField
+#              and their validator lists are replaced by timing wrappers
+#   disable(): original class and lists are put back
+#   -> when off, pydantic runs exactly the original objects (no overhead)
+#   one profiler per field at a time:  enable() over a field another profiler is
+#   instrumenting raises RuntimeError and changes nothing (otherwise disabling one
+#   would restore the other's wrappers, or drop the stats they still use)
+# ------------------------------------------------------------------------------
+
+@std_dataclass
+class ProfileStat:
+    name: str
+    calls: int = 0
+    seconds: float = 0.0
+    failures: int = 0
+
+
+# field -> its ProfileStat while profiling is on (ModelField has __slots__)
+_field_stats: dict[int, ProfileStat] = {}
+
+
+class _ProfiledModelField(ModelField):
+    __slots__ = ()
+
+    def validate(self, *args: Any, **kwargs: Any) -> Any:
+        stat = _field_stats[id(self)]
+        start = time.perf_counter()
+        value, errors = super().validate(*args, **kwargs)
+        stat.seconds += time.perf_counter() - start
+        stat.calls += 1
+        if errors:
+            stat.failures += 1
+        return value, errors
+
+
+def _timed_validator(func: Callable, stat: ProfileStat) -> Callable:
+    def timed(*args: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        except Exception:
+            stat.failures += 1
+            raise
+        finally:
+            stat.seconds += time.perf_counter() - start
+            stat.calls += 1
+    return timed
+
+
+_VALIDATOR_LISTS = ('pre_validators', 'validators', 'post_validators')
+
+
+class ValidationProfiler:
+
+    def __init__(self, *models: type):
+        self.stats: dict[str, ProfileStat] = {}
+        self._fields: list[tuple[str, ModelField]] = []
+        self._saved: list[tuple[ModelField, type, dict[str, Any]]] = []
+        seen: set[type] = set()
+        for model in models:
+            self._collect(model, seen)
+
+    # fields of the model, its sub fields (list items, union members) and nested models
+    def _collect(self, model: type, seen: set[type]) -> None:
+        if model in seen:
+            return
+        seen.add(model)
+        for name, field in model.__pydantic_model__.__fields__.items():
+            self._collect_field(f'{model.__name__}.{name}', field, seen)
+
+    def _collect_field(self, label: str, field: ModelField, seen: set[type]) -> None:
+        self._fields.append((label, field))
+        sub_fields = field.sub_fields or ()
+        for sub_field in sub_fields:
+            # union members by name, list items as []
+            if len(sub_fields) > 1:
+                sub_label = f'{label}[{getattr(sub_field.type_, "__name__", sub_field.name)}]'
+            else:
+                sub_label = f'{label}[]'
+            self._collect_field(sub_label, sub_field, seen)
+        if hasattr(field.type_, '__pydantic_model__'):
+            self._collect(field.type_, seen)
+
+    def _stat(self, name: str) -> ProfileStat:
+        stat = self.stats.get(name)
+        if stat is None:
+            stat = self.stats[name] = ProfileStat(name)
+        return stat
+
+    def enable(self) -> None:
+        if self._saved:
+            return
+        for label, field in self._fields:
+            if id(field) in _field_stats:
+                raise RuntimeError(f'{label} is already profiled by another ValidationProfiler')
+        for label, field in self._fields:
+            saved = {attr: getattr(field, attr) for attr in _VALIDATOR_LISTS}
+            self._saved.append((field, field.__class__, saved))
+            _field_stats[id(field)] = self._stat(label)
+            field.__class__ = _ProfiledModelField
+            for attr, validators in saved.items():
+                if validators:
+                    setattr(field, attr, [
+                        _timed_validator(v, self._stat(f'{label}:{getattr(v, "__name__", repr(v))}'))
+                        for v in validators])
+
+    def disable(self) -> None:
+        for field, cls, saved in self._saved:
+            field.__class__ = cls
+            for attr, validators in saved.items():
+                setattr(field, attr, validators)
+            _field_stats.pop(id(field), None)
+        self._saved.clear()
+
+    # counters are zeroed in place:  wrappers keep their ProfileStat while enabled
+    def reset(self) -> None:
+        for stat in self.stats.values():
+            stat.calls, stat.seconds, stat.failures = 0, 0.0, 0
+
+    def __enter__(self) -> 'ValidationProfiler':
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.disable()
+
+    # sorted by cumulative time (field rows include their validators)
+    def report(self, sort_by: str = 'seconds') -> list[ProfileStat]:
+        return sorted((s for s in self.stats.values() if s.calls),
+                      key=lambda s: getattr(s, sort_by), reverse=True)
+
+    def print_report(self, limit: int = 20) -> None:
+        print(f"{'name':<60} {'calls':>8} {'total ms':>10} {'us/call':>9} {'failures':>9}")
+        for stat in self.report()[:limit]:
+            print(f'{stat.name:<60} {stat.calls:>8} {stat.seconds * 1e3:>10.2f} '
+                  f'{stat.seconds / stat.calls * 1e6:>9.2f} {stat.failures:>9}')
+
+
+# ----------
+data = {
+    'name': 'Viafores',
+    'owner': 'Pat Viafore',
+    'address': '123 Fake St. Fakington, FA 01234',
+    'employees': [{'name': 'Pat Viafore', 'position': 'Chef',
+                   'payment_details': {'bank_details': {
+                       'account_number': '123456789',
+                       'routing_number': '123456789012'}}},
+                  {'name': 'Made-up McGee', 'position': 'Server',
+                   'payment_details': {'address': '123 Fake St.'}}] * 50,
+    'dishes': [{'name': 'Pasta Sausage', 'price_in_cents': 1295,
+                'description': 'Rigatoni and Sausage with a Tomato-Garlic-Basil Sauce'},
+               {'name': 'Pasta Bolognese', 'price_in_cents': 1495,
+                'description': 'Spaghetti with a rich Tomato and Beef Sauce'},
+               {'name': 'Caprese Salad', 'price_in_cents': 795,
+                'description': 'Tomato, Buffalo Mozzarella, and Basil',
+                'picture': 'caprese.png'}] * 50,
+    'number_of_seats': 12,
+    'to_go': True,
+    'delivery': False,
+}
+
+profiler = ValidationProfiler(Restaurant)
+
+with profiler:
+    for _ in range(20):
+        Restaurant(**data)
+    try:
+        Restaurant(**{**data, 'name': "Viafore's"})
+    except ValidationError as e:
+        pass
+
+profiler.print_report()
+
+stats = profiler.stats
+assert stats['Restaurant.employees:check_chef_and_server'].calls == 21
+assert stats['Restaurant.name'].failures == 1
+# every employee paid by bank fails Address first
+assert stats['Employee.payment_details[Address]'].failures == 21 * 50
+
+
+# ----------
+# overlapping profilers (Employee is inside Restaurant):  the second one is refused
+with profiler:
+    try:
+        ValidationProfiler(Employee).enable()
+        assert False
+    except RuntimeError as e:
+        assert 'Employee.' in str(e)
+    Restaurant(**data)
+
+with ValidationProfiler(Employee):
+    try:
+        profiler.enable()
+        assert False
+    except RuntimeError:
+        pass
+    # nothing was changed by the refused enable()
+    assert type(Restaurant.__pydantic_model__.__fields__['name']) is ModelField
+    Restaurant(**data)
+
+
+# ------------------------------------------------------------------------------
+# overhead when off:  pydantic runs the original objects again
+# ------------------------------------------------------------------------------
+
+assert all(type(field) is ModelField for _, field in profiler._fields)
+
+off = timeit.timeit(lambda: Restaurant(**data), number=50)
+with profiler:
+    on = timeit.timeit(lambda: Restaurant(**data), number=50)
+print(f'profiling off {off / 50 * 1e3:>8.3f} ms / restaurant')
+print(f'profiling on  {on / 50 * 1e3:>8.3f} ms / restaurant')